@@ -0,0 +1,297 @@
+"""
+NLP Chatbot
+---------------------------------------------------------
+Rule-based chatbot from NLP_Notebook.ipynb as an importable module. User
+input is tokenized with spaCy, the Matcher-style LOWER keyword_patterns are
+resolved by an IntentIndex (see intent_index.py) and the canned answer of
+the best-ranked intent from response_dict is returned.
+
+Intent matching only looks at token text, so the tagger, parser, NER and
+lemmatizer of en_core_web_sm are never needed to answer. By default the bot
+therefore uses a tokenizer-only spacy.blank("en") pipeline (the English
+tokenizer rules are the same), and classify_batch() sends many utterances
+through nlp.pipe() with every pipeline component disabled:
+
+    bot = Chatbot()
+    bot.get_response("How does a for loop work?")
+    bot.respond_batch(utterances, batch_size=256, n_process=2)
+
+With an UtteranceCache, repeated utterances are answered from a memo of
+earlier classifications (see utterance_cache.py). With an artifact directory
+(see chatbot_artifact.py) the trimmed pipeline and the compiled intent index
+are loaded from disk on first use, and rebuilt there if the patterns changed:
+
+    bot = Chatbot(artifact=chatbot_artifact.DEFAULT_PATH)
+"""
+
+import logging
+import threading
+import time
+
+from intent_index import IntentIndex
+from utterance_cache import fingerprint, token_key
+
+DEFAULT_MODEL = "en_core_web_sm"
+
+response_dict = {
+    # Generic responses
+    "greet": "Hello! How can I help you today?",
+    "bye": "Goodbye! Have a great day!",
+    "help": "I can answer your questions. Try asking about something more specific!",
+    "default": "I'm sorry, I didn't understand that. Could you rephrase?",
+    # Java Keyword/Statement responses
+    "for": "A for loop is a loop that allows you to iterate over a sequence of items. It is used to repeat a block of code a certain number of times. For example, you can use a for loop to iterate over a list of numbers and print each number to the console.",
+    "while": "A while loop is a loop that allows you to repeat a block of code as long as a certain condition is true. It is used to repeat a block of code until a condition is met. For example, you can use a while loop to repeat a block of code until a user enters a specific input.",
+    "if": "An if statement is a conditional statement that allows you to execute a block of code only if a certain condition is true. It is used to make decisions in your code. For example, you can use an if statement to check if a number is greater than 10 and print a message to the console if it is.",
+    "else": "An else statement is used in conjunction with an if statement to execute a block of code if the if condition is false. It is used to provide an alternative block of code to execute when the if condition is not met. For example, you can use an else statement to print a message to the console if a number is not greater than 10.",
+    "switch": "A switch statement is a conditional statement that allows you to execute different blocks of code based on the value of a variable. It is used to make decisions in your code with multiple possible outcomes. For example, you can use a switch statement to check the value of a variable and execute different blocks of code based on the value.",
+    "break": "A break statement is used to exit a loop or switch statement. It is used to terminate the execution of a loop or switch statement and continue with the next statement in the program. For example, you can use a break statement to exit a loop when a certain condition is met.",
+    "continue": "A continue statement is used to skip the current iteration of a loop and continue with the next iteration. It is used to skip over certain iterations of a loop based on a condition. For example, you can use a continue statement to skip over even numbers in a loop and only process odd numbers.",
+    "return": "A return statement is used to exit a function and return a value to the caller. It is used to pass a value back to the caller of a function. For example, you can use a return statement to return the result of a calculation from a function to the main program.",
+}
+
+# Create pattern for matching
+keyword_patterns = {
+    "for": [{"LOWER": "for"}],
+    "while": [{"LOWER": "while"}],
+    "if": [{"LOWER": "if"}],
+    "else": [{"LOWER": "else"}],
+    "switch": [{"LOWER": {"FUZZY": "switch"}}],
+    "break": [{"LOWER": {"FUZZY": "break"}}],
+    "continue": [{"LOWER": {"FUZZY": "continue"}}],
+    "return": [{"LOWER": "return"}],
+}
+
+
+def load_pipeline(model=DEFAULT_MODEL, full_pipeline=False):
+    """
+    Load the spaCy pipeline the chatbot tokenizes with.
+
+    Args:
+        model (str): Trained pipeline to load when full_pipeline is set
+        full_pipeline (bool): Load every component of model (the notebook's
+            behavior) instead of a tokenizer-only blank English pipeline
+
+    Returns:
+        Language: The loaded pipeline
+    """
+    import spacy
+
+    if not full_pipeline:
+        return spacy.blank("en")
+    try:
+        return spacy.load(model)
+    except OSError as e:
+        logging.warning(f"Could not load {model}, using a blank English pipeline: {str(e)}")
+        return spacy.blank("en")
+
+
+def build_index(patterns, responses, priorities=None):
+    """IntentIndex over the intents that have an answer (the others can never be the response)."""
+    return IntentIndex({intent: pattern for intent, pattern in patterns.items() if intent in responses}, priorities)
+
+
+class Chatbot:
+    """Keyword-matching chatbot answering from response_dict."""
+
+    def __init__(self, nlp=None, model=DEFAULT_MODEL, full_pipeline=False, patterns=None, responses=None,
+                 priorities=None, cache=None, check_interval=1.0, artifact=None):
+        """
+        Args:
+            nlp (Language, optional): Pipeline to use, loaded with load_pipeline() if omitted
+            model (str): Trained pipeline to load when full_pipeline is set
+            full_pipeline (bool): Run every pipeline component on each input, as the notebook did
+            patterns (dict, optional): Intent -> Matcher pattern, defaults to keyword_patterns
+            responses (dict, optional): Intent -> answer, defaults to response_dict
+            priorities (dict, optional): Intent -> priority when several intents match (higher wins)
+            cache (UtteranceCache, optional): Memo of classifications by lower-cased tokens
+            check_interval (float): Seconds between checks whether patterns, intents or
+                priorities were changed in place (which rebuilds the index and empties the cache)
+            artifact (str, optional): Directory of a serialized pipeline and index (see
+                chatbot_artifact.py), loaded on first use and rebuilt if it is stale; the
+                artifact keeps only the tokenizer, also with full_pipeline
+        """
+        self.patterns = keyword_patterns if patterns is None else patterns
+        self.responses = response_dict if responses is None else responses
+        self.priorities = priorities or {}
+        self.cache = cache
+        self.check_interval = check_interval
+        self.artifact = artifact
+        self.index = None
+        self._nlp = nlp
+        self._model = model
+        self._full_pipeline = full_pipeline
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._load_lock = threading.Lock()
+        if artifact is None:
+            if self._nlp is None:
+                self._nlp = load_pipeline(model, full_pipeline)
+            self._build_index()
+
+    @property
+    def nlp(self):
+        """The spaCy pipeline (loading the artifact if it was not needed yet)."""
+        if self._nlp is None:
+            self._load_artifact()
+        return self._nlp
+
+    def _load_artifact(self):
+        from chatbot_artifact import load_or_build
+
+        with self._load_lock:
+            if self.index is not None and self._nlp is not None:
+                return
+            loaded = load_or_build(self.artifact, self.patterns, self.responses, self.priorities, self._model,
+                                   self._full_pipeline)
+            if self._nlp is None:
+                self._nlp = loaded["nlp"]
+            if self.index is None:
+                self.index = loaded["index"]
+                self._fingerprint = self._current_fingerprint()
+                self._checked_at = time.monotonic()
+                if self.cache is not None:
+                    self.cache.bind(self._fingerprint)
+
+    def _current_fingerprint(self):
+        # Answers are looked up when responding, so only the set of intents matters
+        return fingerprint(self.patterns, sorted(self.responses), self.priorities)
+
+    def _build_index(self, current=None):
+        self.index = build_index(self.patterns, self.responses, self.priorities)
+        self._fingerprint = current or self._current_fingerprint()
+        self._checked_at = time.monotonic()
+        if self.cache is not None:
+            self.cache.bind(self._fingerprint)
+
+    def refresh(self):
+        """
+        Rebuild the intent index and invalidate the cache if patterns, intents or priorities changed.
+
+        Returns:
+            bool: Whether anything had changed
+        """
+        if self.index is None:
+            self._load_artifact()
+        current = self._current_fingerprint()
+        if current == self._fingerprint:
+            self._checked_at = time.monotonic()
+            return False
+        self._build_index(current)
+        return True
+
+    def _check(self):
+        if self.index is None:
+            self._load_artifact()
+        elif time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+
+    def _doc(self, text):
+        """Doc for one input; only the full pipeline runs components beyond the tokenizer."""
+        return self.nlp(text) if self.nlp.pipe_names else self.nlp.make_doc(text)
+
+    def _docs(self, texts, batch_size, n_process):
+        """Docs for many inputs with every pipeline component disabled."""
+        if n_process == 1:
+            # Tokenization only, no per-batch pipeline bookkeeping
+            return self.nlp.tokenizer.pipe(texts, batch_size=batch_size)
+        with self.nlp.select_pipes(disable=self.nlp.pipe_names):
+            return list(self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
+
+    def _match(self, doc):
+        """Best (intent, score) in a Doc, ("default", 0.0) if nothing matched."""
+        return self._match_tokens([token.lower_ for token in doc])
+
+    def _match_tokens(self, tokens):
+        return self.index.best(tokens) or ("default", 0.0)
+
+    def _cached_match(self, doc):
+        """_match() through the cache, keyed on the same lower-cased tokens the index reads."""
+        key = token_key(doc)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._match_tokens(key)
+            self.cache.put(key, result)
+        return result
+
+    def classify(self, user_input):
+        """Intent matched in one utterance ("default" if none)."""
+        return self.match(user_input)[0]
+
+    def match(self, user_input):
+        """
+        Best intent in one utterance with its match score.
+
+        Returns:
+            tuple: (intent, score); score is 1.0 for an exact keyword, lower for
+            fuzzy matches and 0.0 for "default"
+        """
+        self._check()
+        if self.cache is None:
+            return self._match(self._doc(user_input))
+        # Matching only reads token text, so the tokenizer alone gives both the key and the tokens
+        return self._cached_match(self.nlp.make_doc(user_input))
+
+    def candidates(self, user_input):
+        """
+        Every intent matched in one utterance, best first (not cached).
+
+        Returns:
+            list: (intent, score) per distinct intent, in rank order
+        """
+        self._check()
+        seen = {}
+        for match_id, _, _, score in self.index.matches([token.lower_ for token in self._doc(user_input)]):
+            seen.setdefault(self.index.intents[match_id], score)
+        return list(seen.items())
+
+    def classify_batch(self, texts, batch_size=256, n_process=1):
+        """
+        Intents of many utterances, tokenized in batches.
+
+        Args:
+            texts (iterable): Utterances to classify
+            batch_size (int): Texts tokenized per batch
+            n_process (int): Worker processes for tokenization (-1 for one per CPU)
+
+        Returns:
+            list: Intent per utterance, in input order
+        """
+        return [intent for intent, _ in self.match_batch(texts, batch_size, n_process)]
+
+    def match_batch(self, texts, batch_size=256, n_process=1):
+        """Best (intent, score) of many utterances, in input order (see classify_batch)."""
+        self._check()
+        match = self._match if self.cache is None else self._cached_match
+        return [match(doc) for doc in self._docs(texts, batch_size, n_process)]
+
+    def answer_for(self, intent):
+        """Answer of an intent ("default" for one removed since it was cached)."""
+        return self.responses.get(intent, self.responses["default"])
+
+    def get_response(self, user_input):
+        """Answer to one utterance."""
+        return self.answer_for(self.classify(user_input))
+
+    def respond_batch(self, texts, batch_size=256, n_process=1):
+        """Answers to many utterances, in input order (see classify_batch)."""
+        return [self.answer_for(intent) for intent in self.classify_batch(texts, batch_size, n_process)]
+
+    def chat(self):
+        """Interactive loop until the user types 'bye'."""
+        print("Chatbot: Hello! (Type 'bye' to exit.)")
+        while True:
+            user_input = input("You: ")
+            print("User:", user_input)
+            if user_input.lower() == "bye":
+                print("Chatbot: Goodbye! Have a great day!")
+                if self.cache is not None:
+                    self.cache.save()
+                break
+            else:
+                response = self.get_response(user_input)
+                print("Chatbot:", response)
+
+
+if __name__ == "__main__":
+    Chatbot().chat()
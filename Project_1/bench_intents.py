@@ -0,0 +1,115 @@
+"""
+Intent Resolution Benchmark
+---------------------------------------------------------
+Compares spaCy's Matcher (as used by the notebook) with the IntentIndex on
+growing synthetic pattern sets, a third of them FUZZY. Both see the same
+pre-tokenized utterances; for every utterance the set of matched intents
+must agree. The Matcher slows down in proportion to the patterns it has to
+try; the index only pays for the keywords that share a hash bucket or a
+deletion variant with an input token.
+
+    python bench_intents.py --sizes 10 100 1000 5000
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+
+import spacy
+from spacy.matcher import Matcher
+
+from intent_index import IntentIndex
+
+
+def make_patterns(count, seed=0):
+    """count intents with distinct random keywords, every third one FUZZY."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10))))
+    return {f"intent_{i}": [{"LOWER": {"FUZZY": word} if i % 3 == 0 else word}]
+            for i, word in enumerate(sorted(words))}
+
+
+def make_utterances(patterns, count, seed=1):
+    """Utterances containing a keyword (sometimes misspelled) among filler words."""
+    rng = random.Random(seed)
+    keywords = [next(iter(p[0]["LOWER"].values())) if isinstance(p[0]["LOWER"], dict) else p[0]["LOWER"]
+                for p in patterns.values()]
+    filler = ["how", "do", "i", "use", "the", "in", "java", "what", "is", "a", "please", "explain"]
+    utterances = []
+    for _ in range(count):
+        words = rng.sample(filler, rng.randint(3, 7))
+        keyword = rng.choice(keywords)
+        if rng.random() < 0.3:
+            position = rng.randrange(len(keyword))
+            keyword = keyword[:position] + rng.choice(string.ascii_lowercase) + keyword[position + 1:]
+        words.insert(rng.randrange(len(words) + 1), keyword)
+        utterances.append(" ".join(words))
+    return utterances
+
+
+def run_benchmarks(sizes=(10, 100, 1000), utterance_count=2000):
+    """
+    Time pattern building and matching for each pattern set size.
+
+    Returns:
+        dict: Size -> {"matcher_build_s", "index_build_s", "matcher_per_second", "index_per_second", "agree"}
+    """
+    nlp = spacy.blank("en")
+    results = {}
+    for size in sizes:
+        patterns = make_patterns(size)
+        docs = list(nlp.tokenizer.pipe(make_utterances(patterns, utterance_count)))
+        token_lists = [[token.lower_ for token in doc] for doc in docs]
+
+        start = time.perf_counter()
+        matcher = Matcher(nlp.vocab)
+        for intent, pattern in patterns.items():
+            matcher.add(intent, [pattern])
+        matcher_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = IntentIndex(patterns)
+        index_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matcher_found = [{nlp.vocab.strings[match_id] for match_id, _, _ in matcher(doc)} for doc in docs]
+        matcher_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index_found = [{index.intents[match[0]] for match in index.matches(tokens)} for tokens in token_lists]
+        index_seconds = time.perf_counter() - start
+
+        results[size] = {
+            "matcher_build_s": matcher_build,
+            "index_build_s": index_build,
+            "matcher_per_second": utterance_count / matcher_seconds,
+            "index_per_second": utterance_count / index_seconds,
+            "agree": matcher_found == index_found,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent resolution on growing pattern sets")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Pattern set sizes")
+    parser.add_argument("-n", "--utterances", type=int, default=2000, help="Utterances matched per size")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.utterances)
+    print(f"{'Patterns':>9}{'Matcher build':>15}{'Index build':>13}{'Matcher utt/s':>15}{'Index utt/s':>13}  Agree")
+    for size, r in results.items():
+        print(f"{size:>9}{r['matcher_build_s']:>14.3f}s{r['index_build_s']:>12.3f}s"
+              f"{r['matcher_per_second']:>15,.0f}{r['index_per_second']:>13,.0f}  {'yes' if r['agree'] else 'NO'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
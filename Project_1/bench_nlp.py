@@ -0,0 +1,115 @@
+"""
+Chatbot Throughput Benchmark
+---------------------------------------------------------
+Measures how many utterances per second the keyword chatbot classifies:
+one nlp() call per utterance (with the full en_core_web_sm pipeline as in
+the notebook when it is installed, tokenizer-only, and tokenizer-only behind
+the utterance cache), batched through
+nlp.pipe(), and batched across several worker processes. Every mode must
+produce the same intents as the tokenizer-only per-call path.
+
+    python bench_nlp.py -n 20000 --batch-size 512 --processes 2
+    python bench_nlp.py -n 20000 --distinct 300     # repeated traffic
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+import spacy
+
+from NLP import DEFAULT_MODEL, Chatbot, keyword_patterns
+from utterance_cache import UtteranceCache
+
+FILLER = ["how", "does", "a", "the", "loop", "work", "in", "java", "what", "is", "statement", "can", "you",
+          "explain", "when", "should", "i", "use", "example", "of", "please", "thanks"]
+
+
+def make_utterances(count, seed=0, distinct=None):
+    """
+    Synthetic chatbot traffic: short questions, most of them mentioning a keyword.
+
+    Args:
+        count (int): Utterances to produce
+        seed (int): Random seed
+        distinct (int, optional): Draw the utterances from this many different ones
+            (repeated traffic), all distinct if omitted
+    """
+    rng = random.Random(seed)
+    if distinct:
+        pool = make_utterances(distinct, seed)
+        return [rng.choice(pool) for _ in range(count)]
+    keywords = list(keyword_patterns) + ["swich", "brake", "contnue"]  # Some typos for the FUZZY patterns
+    utterances = []
+    for _ in range(count):
+        words = rng.sample(FILLER, rng.randint(3, 8))
+        if rng.random() < 0.8:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        utterances.append(" ".join(words).capitalize() + rng.choice(["?", ".", "!", ""]))
+    return utterances
+
+
+def run_benchmarks(count=10000, batch_size=256, processes=None, distinct=None):
+    """
+    Time each classification mode on the same utterances.
+
+    Args:
+        count (int): Utterances to classify per mode
+        batch_size (int): Texts per nlp.pipe() batch
+        processes (int, optional): Worker processes for the multi-process mode, one per CPU if omitted
+        distinct (int, optional): Number of different utterances, all distinct if omitted
+
+    Returns:
+        dict: Mode -> {"seconds", "per_second", "matches_reference"}
+    """
+    processes = processes or os.cpu_count() or 1
+    utterances = make_utterances(count, distinct=distinct)
+    bot = Chatbot()
+    cached = Chatbot(cache=UtteranceCache())
+    modes = {
+        "per-call (tokenizer)": lambda: [bot.classify(text) for text in utterances],
+        "per-call (cached)": lambda: [cached.classify(text) for text in utterances],
+        "batched": lambda: bot.classify_batch(utterances, batch_size),
+        f"batched, {processes} processes": lambda: bot.classify_batch(utterances, batch_size, processes),
+    }
+    if spacy.util.is_package(DEFAULT_MODEL):
+        full = Chatbot(full_pipeline=True)
+        modes = {"per-call (full pipeline)": lambda: [full.classify(text) for text in utterances], **modes}
+
+    results = {}
+    for name, run in modes.items():
+        start = time.perf_counter()
+        intents = run()
+        seconds = time.perf_counter() - start
+        results[name] = {"seconds": seconds, "per_second": count / seconds, "intents": intents}
+
+    reference = results["per-call (tokenizer)"]["intents"]
+    for result in results.values():
+        result["matches_reference"] = result.pop("intents") == reference
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chatbot classification throughput")
+    parser.add_argument("-n", "--count", type=int, default=10000, help="Utterances per mode")
+    parser.add_argument("--batch-size", type=int, default=256, help="Texts per nlp.pipe() batch")
+    parser.add_argument("--processes", type=int, help="Worker processes for the multi-process mode")
+    parser.add_argument("--distinct", type=int, help="Draw utterances from this many different ones")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.count, args.batch_size, args.processes, args.distinct)
+    print(f"{'Mode':<32}{'Seconds':>10}{'Utterances/s':>15}  Same intents")
+    for name, r in results.items():
+        print(f"{name:<32}{r['seconds']:>10.3f}{r['per_second']:>15,.0f}  {'yes' if r['matches_reference'] else 'NO'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"count": args.count, "batch_size": args.batch_size, "distinct": args.distinct,
+                       "modes": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Chatbot Cold-Start Benchmark
+---------------------------------------------------------
+Measures how long a fresh process takes to answer its first utterance, and
+its peak resident memory, for each way of starting the chatbot: the
+notebook's spacy.load("en_core_web_sm") + Matcher (when the model is
+installed), the module's tokenizer-only Chatbot(), and Chatbot(artifact=...)
+loading the serialized pipeline and index from chatbot_artifact.py, both
+current and stale (rebuilt on load). Every scenario runs in a new
+interpreter; medians are reported.
+
+    python bench_startup.py -n 5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import util
+
+from NLP import DEFAULT_MODEL
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+UTTERANCE = "How does a for loop work?"
+
+# Prints the import, ready and first-answer times (ms since the script started) and peak RSS (MB)
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+{setup}
+ready = time.perf_counter()
+{answer}
+done = time.perf_counter()
+print(json.dumps({{"ready_ms": (ready - start) * 1000, "first_answer_ms": (done - start) * 1000,
+                  "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  "modules": len(sys.modules)}}))
+"""
+
+NOTEBOOK = """
+import spacy
+from spacy.matcher import Matcher
+from NLP import keyword_patterns, response_dict
+nlp = spacy.load("en_core_web_sm")
+matcher = Matcher(nlp.vocab)
+for key, pattern in keyword_patterns.items():
+    matcher.add(key, [pattern])
+def get_response(user_input):
+    doc = nlp(user_input)
+    best_match = "default"
+    for match_id, start, end in matcher(doc):
+        best_match = nlp.vocab[match_id].text if nlp.vocab[match_id].text in response_dict else "default"
+    return response_dict[best_match]
+"""
+
+
+def scenarios(artifact):
+    """Scenario name -> (setup code, first-answer statement, remove the artifact before each run)."""
+    result = {}
+    if util.find_spec(DEFAULT_MODEL) is not None:
+        result["notebook (en_core_web_sm + Matcher)"] = (NOTEBOOK, f"get_response({UTTERANCE!r})", False)
+    result["Chatbot() (tokenizer only)"] = ("from NLP import Chatbot\nbot = Chatbot()",
+                                            f"bot.get_response({UTTERANCE!r})", False)
+    setup = f"from NLP import Chatbot\nbot = Chatbot(artifact={artifact!r})"
+    result["Chatbot(artifact) current"] = (setup, f"bot.get_response({UTTERANCE!r})", False)
+    result["Chatbot(artifact) stale, rebuilt"] = (setup, f"bot.get_response({UTTERANCE!r})", True)
+    return result
+
+
+def run_child(setup, answer, cwd):
+    """Run one scenario in a fresh interpreter; returns its measurements plus the process wall time."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD.format(setup=setup, answer=answer)], capture_output=True,
+                            text=True, cwd=cwd, env=dict(os.environ, PYTHONPATH=PROJECT_DIR), timeout=300)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Scenario failed: {result.stderr[-500:]}")
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    measured["wall_ms"] = wall * 1000
+    return measured
+
+
+def run_benchmarks(repeat=5):
+    """
+    Run every scenario repeat times.
+
+    Returns:
+        dict: Scenario -> median wall_ms, ready_ms, first_answer_ms, rss_mb, and the modules loaded
+    """
+    workdir = tempfile.mkdtemp(prefix="chatbot_startup_")
+    artifact = os.path.join(workdir, "chatbot_artifact")
+    results = {}
+    try:
+        for name, (setup, answer, stale) in scenarios(artifact).items():
+            runs = []
+            for _ in range(repeat):
+                if stale:
+                    shutil.rmtree(artifact, ignore_errors=True)
+                runs.append(run_child(setup, answer, workdir))
+            results[name] = {key: statistics.median(run[key] for run in runs)
+                             for key in ("wall_ms", "ready_ms", "first_answer_ms", "rss_mb")}
+            results[name]["modules"] = runs[-1]["modules"]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chatbot cold start and memory")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Runs per scenario")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    if util.find_spec(DEFAULT_MODEL) is None:
+        print(f"{DEFAULT_MODEL} is not installed; the notebook scenario is skipped")
+    results = run_benchmarks(args.repeat)
+    print(f"{'Scenario':<38}{'Process ms':>11}{'Ready ms':>10}{'1st answer ms':>15}{'Peak RSS MB':>13}{'Modules':>9}")
+    for name, r in results.items():
+        print(f"{name:<38}{r['wall_ms']:>11.0f}{r['ready_ms']:>10.0f}{r['first_answer_ms']:>15.0f}"
+              f"{r['rss_mb']:>13.1f}{r['modules']:>9}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"repeat": args.repeat, "scenarios": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
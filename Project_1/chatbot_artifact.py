@@ -0,0 +1,180 @@
+"""
+Chatbot Artifact
+---------------------------------------------------------
+Build step for fast chatbot cold starts. The pipeline is trimmed to what
+intent matching needs (vocab and tokenizer, no tagger/parser/NER weights)
+and saved with nlp.to_disk(), next to the keyword patterns, the response
+table and the compiled IntentIndex. A manifest records a content hash of the
+patterns, responses, priorities, base pipeline and spaCy version; when the
+hash no longer matches the current source the artifact is rebuilt on load.
+
+    python chatbot_artifact.py build                 # tokenizer of spacy.blank("en")
+    python chatbot_artifact.py build --full-pipeline # tokenizer and vocab of en_core_web_sm
+    python chatbot_artifact.py check
+
+Layout:
+    manifest.json   version, content hash, base pipeline, build time
+    intents.json    patterns, responses and priorities
+    index.pkl       pickled IntentIndex (only load artifacts you built)
+    nlp/            trimmed spaCy pipeline
+"""
+
+import argparse
+import json
+import logging
+import os
+import pickle
+import shutil
+import sys
+import time
+from importlib import metadata
+
+from NLP import DEFAULT_MODEL, build_index, keyword_patterns, load_pipeline, response_dict
+from utterance_cache import fingerprint
+
+ARTIFACT_VERSION = 2  # Bumped when the pickled IntentIndex layout changes
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot_artifact")
+MANIFEST = "manifest.json"
+
+
+def base_pipeline(model=DEFAULT_MODEL, full_pipeline=False):
+    """Name of the pipeline the artifact's tokenizer is taken from."""
+    return model if full_pipeline else "blank:en"
+
+
+def content_hash(patterns, responses, priorities=None, model=DEFAULT_MODEL, full_pipeline=False):
+    """Hash identifying an artifact's inputs; computed without importing spaCy."""
+    return fingerprint(ARTIFACT_VERSION, metadata.version("spacy"), base_pipeline(model, full_pipeline),
+                       patterns, responses, priorities or {})
+
+
+def read_manifest(path=DEFAULT_PATH):
+    """Manifest of the artifact at path, or None if there is no readable artifact."""
+    try:
+        with open(os.path.join(path, MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == ARTIFACT_VERSION else None
+
+
+def build(path=DEFAULT_PATH, patterns=None, responses=None, priorities=None, model=DEFAULT_MODEL,
+          full_pipeline=False):
+    """
+    Build the artifact and replace whatever is at path.
+
+    Args:
+        path (str): Artifact directory
+        patterns (dict, optional): Intent -> Matcher pattern, defaults to keyword_patterns
+        responses (dict, optional): Intent -> answer, defaults to response_dict
+        priorities (dict, optional): Intent -> priority when several intents match
+        model (str): Trained pipeline the tokenizer is taken from when full_pipeline is set
+        full_pipeline (bool): Use model's tokenizer and vocab instead of spacy.blank("en")
+
+    Returns:
+        dict: The new manifest
+    """
+    patterns = keyword_patterns if patterns is None else patterns
+    responses = response_dict if responses is None else responses
+    priorities = priorities or {}
+    start = time.perf_counter()
+
+    nlp = load_pipeline(model, full_pipeline)
+    # Intent matching only reads token text; the trained components are dropped
+    for name in list(nlp.pipe_names):
+        nlp.remove_pipe(name)
+    # Records what was actually loaded: load_pipeline() falls back to a blank pipeline
+    base = "blank:en" if nlp.meta.get("name") == "pipeline" else \
+        f"{nlp.meta['lang']}_{nlp.meta['name']}-{nlp.meta['version']}"
+    index = build_index(patterns, responses, priorities)
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+    nlp.to_disk(os.path.join(temp_path, "nlp"))
+    with open(os.path.join(temp_path, "intents.json"), "w", encoding="utf-8") as f:
+        json.dump({"patterns": patterns, "responses": responses, "priorities": priorities}, f,
+                  ensure_ascii=False, indent=1)
+    with open(os.path.join(temp_path, "index.pkl"), "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "hash": content_hash(patterns, responses, priorities, model, full_pipeline),
+        "base": base,
+        "spacy": metadata.version("spacy"),
+        "intents": len(index),
+        "built": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "build_seconds": time.perf_counter() - start,
+    }
+    with open(os.path.join(temp_path, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap directories so readers never see a half-written artifact
+    old_path = f"{path}.{os.getpid()}.old"
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        # Another process installed its build in the meantime; it has the same inputs
+        shutil.rmtree(temp_path, ignore_errors=True)
+    shutil.rmtree(old_path, ignore_errors=True)
+    logging.info(f"Built chatbot artifact {path} in {manifest['build_seconds']:.2f} seconds")
+    return manifest
+
+
+def load(path=DEFAULT_PATH):
+    """
+    Load a built artifact.
+
+    Returns:
+        dict: "nlp", "index", "patterns", "responses", "priorities" and "manifest"
+    """
+    import spacy
+
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f"No chatbot artifact at {path}")
+    with open(os.path.join(path, "intents.json"), "r", encoding="utf-8") as f:
+        intents = json.load(f)
+    with open(os.path.join(path, "index.pkl"), "rb") as f:
+        index = pickle.load(f)
+    return dict(intents, nlp=spacy.load(os.path.join(path, "nlp")), index=index, manifest=manifest)
+
+
+def load_or_build(path=DEFAULT_PATH, patterns=None, responses=None, priorities=None, model=DEFAULT_MODEL,
+                  full_pipeline=False):
+    """Load the artifact at path, rebuilding it first if it is missing or was built from other inputs."""
+    patterns = keyword_patterns if patterns is None else patterns
+    responses = response_dict if responses is None else responses
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get("hash") != content_hash(patterns, responses, priorities, model,
+                                                                  full_pipeline):
+        logging.info(f"Chatbot artifact {path} is missing or stale, rebuilding")
+        build(path, patterns, responses, priorities, model, full_pipeline)
+    return load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or check the serialized chatbot artifact")
+    parser.add_argument("action", choices=["build", "check"], help="Build the artifact, or check whether it is current")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="Artifact directory")
+    parser.add_argument("--full-pipeline", action="store_true", help=f"Take the tokenizer from {DEFAULT_MODEL}")
+    args = parser.parse_args()
+
+    if args.action == "build":
+        manifest = build(args.path, full_pipeline=args.full_pipeline)
+        print(f"Built {args.path}: {manifest['intents']} intents on {manifest['base']} "
+              f"in {manifest['build_seconds']:.2f} s")
+        return 0
+    manifest = read_manifest(args.path)
+    if manifest is None:
+        print(f"No artifact at {args.path}")
+        return 1
+    current = manifest["hash"] == content_hash(keyword_patterns, response_dict, {}, full_pipeline=args.full_pipeline)
+    print(f"{args.path}: built {manifest['built']} on {manifest['base']}, {'current' if current else 'STALE'}")
+    return 0 if current else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
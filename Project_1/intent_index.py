@@ -0,0 +1,241 @@
+"""
+Intent Index
+---------------------------------------------------------
+Resolves chatbot intents from tokenized input without scanning every pattern.
+Patterns use the Matcher syntax of keyword_patterns (LOWER with a string,
+{"IN": [...]}, {"FUZZY": ...} or {"FUZZYn": ...}), one dict per token.
+
+Exact phrases are stored in a hash index keyed by their first token, so a
+lookup costs one dict probe per input token however many intents exist.
+Fuzzy keywords go into a symmetric-delete index: every string reachable by
+deleting up to the allowed number of characters maps back to the keyword, so
+candidates within the edit distance are found by probing the deletions of
+the input token, then confirmed with a bounded Levenshtein distance. Input
+tokens whose length is further than the edit distance from every fuzzy
+keyword's length cannot match and are rejected before any deletions are
+generated, which bounds the work per token by the longest keyword rather
+than by the input.
+
+Intents are numbered once when the index is built (match_id -> intent is a
+plain list lookup), and matches are ranked deterministically by priority,
+position in the input, score (1.0 for exact matches, lower with each edit),
+span length and finally intent order.
+"""
+
+from functools import lru_cache
+from itertools import combinations
+
+FUZZY_CACHE_SIZE = 65536  # Input tokens whose fuzzy candidates are remembered
+
+
+def fuzzy_distance(keyword, fuzzy=-1):
+    """
+    Edits allowed for a FUZZY keyword, as spaCy's default fuzzy compare:
+    at least two (one transposition) and up to 30% of the keyword length.
+    """
+    return fuzzy if fuzzy >= 0 else max(2, round(0.3 * len(keyword)))
+
+
+@lru_cache(maxsize=8192)
+def deletions(word, max_edits):
+    """Every string obtained by deleting up to max_edits characters from word (cached for repeated tokens)."""
+    variants = {word}
+    for edits in range(1, min(max_edits, len(word)) + 1):
+        for positions in combinations(range(len(word)), edits):
+            variants.add("".join(char for i, char in enumerate(word) if i not in positions))
+    return frozenset(variants)
+
+
+def bounded_levenshtein(a, b, max_edits):
+    """Levenshtein distance of a and b, or max_edits + 1 as soon as it must exceed max_edits."""
+    if abs(len(a) - len(b)) > max_edits:
+        return max_edits + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_edits:
+            return max_edits + 1
+        previous = current
+    return previous[-1]
+
+
+def _token_spec(spec):
+    """
+    Normalize one token pattern to (alternatives, max_edits).
+
+    Raises:
+        ValueError: For attributes other than LOWER or unsupported operators
+    """
+    if set(spec) != {"LOWER"}:
+        raise ValueError(f"Only LOWER token patterns are supported, got {spec}")
+    value = spec["LOWER"]
+    if isinstance(value, str):
+        return (value.lower(),), None
+    if isinstance(value, dict) and len(value) == 1:
+        (operator, argument), = value.items()
+        if operator == "IN":
+            return tuple(word.lower() for word in argument), None
+        if operator.startswith("FUZZY") and isinstance(argument, str):
+            suffix = operator[len("FUZZY"):]
+            if suffix == "" or suffix.isdigit():
+                argument = argument.lower()
+                return (argument,), fuzzy_distance(argument, int(suffix) if suffix else -1)
+    raise ValueError(f"Unsupported token pattern {spec}")
+
+
+class IntentIndex:
+    """Exact and fuzzy keyword index mapping token sequences to intents."""
+
+    def __init__(self, patterns=None, priorities=None):
+        """
+        Args:
+            patterns (dict, optional): Intent -> token pattern (list of dicts) or list of token patterns
+            priorities (dict, optional): Intent -> priority, higher wins (default 0)
+        """
+        self.intents = []  # match_id -> intent
+        self.priorities = []  # match_id -> priority
+        self._ids = {}  # intent -> match_id
+        self._exact = {}  # first token -> [(pattern, match_id)]
+        self._fuzzy = {}  # deletion variant -> {(keyword, max_edits)}
+        self._fuzzy_first = {}  # (keyword, max_edits) -> [(pattern, match_id)]
+        self._fuzzy_cache = {}  # input token -> fuzzy candidates
+        self.max_edits = 0
+        self._fuzzy_lengths = None  # (shortest, longest) fuzzy keyword
+        self._configured_priorities = priorities or {}
+        for intent, intent_patterns in (patterns or {}).items():
+            self.add(intent, intent_patterns)
+
+    def __len__(self):
+        return len(self.intents)
+
+    def __contains__(self, intent):
+        return intent in self._ids
+
+    def add(self, intent, patterns, priority=None):
+        """
+        Index one or more token patterns for an intent.
+
+        Args:
+            intent (str): Intent name
+            patterns (list): A token pattern (list of dicts) or a list of token patterns
+            priority (int, optional): Priority of the intent, higher wins
+        """
+        if patterns and isinstance(patterns[0], dict):
+            patterns = [patterns]
+        match_id = self._ids.get(intent)
+        if match_id is None:
+            match_id = self._ids[intent] = len(self.intents)
+            self.intents.append(intent)
+            self.priorities.append(0)
+        if priority is None:
+            priority = self._configured_priorities.get(intent)
+        if priority is not None:
+            self.priorities[match_id] = priority
+
+        for pattern in patterns:
+            specs = tuple(_token_spec(spec) for spec in pattern)
+            if not specs:
+                continue
+            alternatives, max_edits = specs[0]
+            if max_edits is None:
+                for word in alternatives:
+                    self._exact.setdefault(word, []).append((specs, match_id))
+                continue
+            key = (alternatives[0], max_edits)
+            if key not in self._fuzzy_first:
+                for variant in deletions(key[0], max_edits):
+                    self._fuzzy.setdefault(variant, set()).add(key)
+                self.max_edits = max(self.max_edits, max_edits)
+                length = len(key[0])
+                shortest, longest = self._fuzzy_lengths or (length, length)
+                self._fuzzy_lengths = (min(shortest, length), max(longest, length))
+                self._fuzzy_cache.clear()
+            self._fuzzy_first.setdefault(key, []).append((specs, match_id))
+
+    def _fuzzy_candidates(self, token):
+        """Fuzzy keywords within their edit distance of token, as (keyword, max_edits, distance)."""
+        shortest, longest = self._fuzzy_lengths
+        if not shortest - self.max_edits <= len(token) <= longest + self.max_edits:
+            return []
+        candidates = self._fuzzy_cache.get(token)
+        if candidates is not None:
+            return candidates
+
+        keys = set()
+        for variant in deletions(token, self.max_edits):
+            keys.update(self._fuzzy.get(variant, ()))
+        candidates = []
+        for keyword, max_edits in sorted(keys):
+            distance = bounded_levenshtein(token, keyword, max_edits)
+            if distance <= max_edits:
+                candidates.append((keyword, max_edits, distance))
+        if len(self._fuzzy_cache) >= FUZZY_CACHE_SIZE:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[token] = candidates
+        return candidates
+
+    @staticmethod
+    def _token_distance(token, spec):
+        """Edits needed for token to satisfy one token spec, None if it does not."""
+        alternatives, max_edits = spec
+        if max_edits is None:
+            return 0 if token in alternatives else None
+        distance = bounded_levenshtein(token, alternatives[0], max_edits)
+        return distance if distance <= max_edits else None
+
+    def _extend(self, tokens, start, specs, distance):
+        """Match the remaining specs of a pattern after tokens[start]; returns total edits or None."""
+        if start + len(specs) > len(tokens):
+            return None
+        for offset, spec in enumerate(specs[1:], 1):
+            edits = self._token_distance(tokens[start + offset], spec)
+            if edits is None:
+                return None
+            distance += edits
+        return distance
+
+    def matches(self, tokens):
+        """
+        All matches in a token sequence, best first.
+
+        Args:
+            tokens (list): Lower-cased token texts
+
+        Returns:
+            list: (match_id, start, end, score) tuples in rank order
+        """
+        found = {}
+        for start, token in enumerate(tokens):
+            candidates = [(specs, match_id, 0) for specs, match_id in self._exact.get(token, ())]
+            if self._fuzzy:
+                for keyword, max_edits, distance in self._fuzzy_candidates(token):
+                    candidates.extend((specs, match_id, distance)
+                                      for specs, match_id in self._fuzzy_first[(keyword, max_edits)])
+            for specs, match_id, distance in candidates:
+                distance = self._extend(tokens, start, specs, distance)
+                if distance is None:
+                    continue
+                end = start + len(specs)
+                length = sum(len(tokens[i]) for i in range(start, end))
+                score = max(0.0, 1.0 - distance / max(length, 1))
+                key = (match_id, start, end)
+                if found.get(key, -1.0) < score:
+                    found[key] = score
+
+        return sorted(((match_id, start, end, score) for (match_id, start, end), score in found.items()),
+                      key=lambda m: (-self.priorities[m[0]], m[1], -m[3], m[1] - m[2], m[0]))
+
+    def best(self, tokens):
+        """
+        Highest-ranked match in a token sequence.
+
+        Returns:
+            tuple: (intent, score), or None if nothing matched
+        """
+        ranked = self.matches(tokens)
+        if not ranked:
+            return None
+        match_id, _, _, score = ranked[0]
+        return self.intents[match_id], score
@@ -0,0 +1,128 @@
+"""
+Chatbot Service Load Test
+---------------------------------------------------------
+Drives the chatbot service (nlp_service.py) with concurrent keep-alive
+clients and reports requests per second and latency percentiles. Without
+--url an in-process service is started on a free port, so batching settings
+can be compared directly:
+
+    python load_test.py -c 32 -n 5000
+    python load_test.py -c 32 -n 5000 --max-batch 1      # no micro-batching
+    python load_test.py --url http://127.0.0.1:8000
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+import urllib.parse
+
+from bench_nlp import make_utterances
+
+
+def _client(url, utterances, latencies, errors, lock):
+    """Send utterances one after another over one keep-alive connection."""
+    parts = urllib.parse.urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    own_latencies = []
+    own_errors = 0
+    for text in utterances:
+        body = json.dumps({"message": text})
+        start = time.perf_counter()
+        try:
+            connection.request("POST", "/chat", body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                own_errors += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            own_errors += 1
+            connection.close()
+            continue
+        own_latencies.append(time.perf_counter() - start)
+    connection.close()
+    with lock:
+        latencies.extend(own_latencies)
+        errors.append(own_errors)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_load(url, concurrency=16, total=2000):
+    """
+    Send total requests from concurrency clients.
+
+    Returns:
+        dict: Throughput and latency (ms) percentiles
+    """
+    utterances = make_utterances(total)
+    latencies, errors, lock = [], [], threading.Lock()
+    threads = [threading.Thread(target=_client, args=(url, utterances[i::concurrency], latencies, errors, lock))
+               for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    result = {"requests": len(latencies), "errors": sum(errors), "seconds": seconds,
+              "per_second": len(latencies) / seconds}
+    if latencies:
+        result.update({
+            "latency_p50_ms": statistics.median(latencies) * 1000,
+            "latency_p95_ms": _percentile(latencies, 0.95) * 1000,
+            "latency_p99_ms": _percentile(latencies, 0.99) * 1000,
+            "latency_max_ms": max(latencies) * 1000,
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the chatbot service")
+    parser.add_argument("--url", help="Service to test (an in-process service is started if omitted)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="Total requests")
+    parser.add_argument("--max-batch", type=int, default=64, help="Batch size of the in-process service")
+    parser.add_argument("--max-wait-ms", type=float, default=1.0, help="Batch wait of the in-process service")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    service = None
+    url = args.url
+    if url is None:
+        from nlp_service import ChatService
+
+        service = ChatService(port=0, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000).start()
+        url = service.url
+
+    try:
+        result = run_load(url, args.concurrency, args.requests)
+        if service is not None:
+            result["service"] = service.stats()
+    finally:
+        if service is not None:
+            service.stop()
+
+    print(f"{result['requests']} requests ({result['errors']} errors) in {result['seconds']:.2f} s: "
+          f"{result['per_second']:,.0f} req/s")
+    if "latency_p50_ms" in result:
+        print(f"Latency ms  p50 {result['latency_p50_ms']:.1f}  p95 {result['latency_p95_ms']:.1f}  "
+              f"p99 {result['latency_p99_ms']:.1f}  max {result['latency_max_ms']:.1f}")
+    if "service" in result:
+        print(f"Batches: {result['service']['batches']}, average size {result['service']['average_batch']:.1f}, "
+              f"largest {result['service']['largest_batch']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
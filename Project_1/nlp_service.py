@@ -0,0 +1,343 @@
+"""
+NLP Chatbot Service
+---------------------------------------------------------
+Serves the keyword chatbot over HTTP so many users can share one warm
+pipeline and intent index. Each connection is handled on its own thread,
+but classification is funneled through a single batcher thread: requests
+that arrive within a millisecond of each other are tokenized together in
+one nlp.pipe() call, so the per-call overhead is paid once per batch. With
+the tokenizer-only pipeline classification is so cheap that longer waits
+mostly add latency; they pay off with --full-pipeline.
+
+    python nlp_service.py --port 8000
+    curl -d '{"message": "How does a for loop work?"}' http://127.0.0.1:8000/chat
+
+Endpoints:
+    POST /chat    {"message": "..."} -> {"intent", "score", "response"}
+                  {"messages": [...]} -> {"results": [...]}
+    GET  /health  {"status": "ok"}
+    GET  /stats   Request, batching and cache counters
+
+Bodies larger than max_body_bytes are refused with 413 before they are read,
+and batches are limited to max_messages utterances of at most
+max_message_chars characters each.
+"""
+
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from NLP import Chatbot
+from utterance_cache import UtteranceCache
+
+_STOP = object()
+
+MAX_BODY_BYTES = 256 * 1024
+MAX_MESSAGES = 256
+MAX_MESSAGE_CHARS = 4096
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Bursts of new connections must not overflow the listen backlog
+
+
+class MicroBatcher:
+    """Collects items submitted from many threads and handles them in batches on one thread."""
+
+    def __init__(self, handle_batch, max_batch=64, max_wait=0.001):
+        """
+        Args:
+            handle_batch (callable): Called with a list of items, returns one result per item
+            max_batch (int): Maximum items per batch
+            max_wait (float): Seconds to wait for more items after the first one of a batch
+        """
+        self.handle_batch = handle_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """Start the batching thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Handle what is already queued, then stop the batching thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, item):
+        """
+        Queue an item.
+
+        Returns:
+            Future: Resolves to the item's result
+        """
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._handle(batch)
+
+    def _handle(self, batch):
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            results = self.handle_batch([item for item, _ in batch])
+        except Exception as e:
+            logging.error(f"Batch of {len(batch)} failed: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self):
+        """Batching counters."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "average_batch": self.items / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+class ChatService:
+    """Threaded HTTP server answering chat requests from one shared Chatbot."""
+
+    def __init__(self, bot=None, host="127.0.0.1", port=8000, max_batch=64, max_wait=0.001, timeout=30.0,
+                 max_body_bytes=MAX_BODY_BYTES, max_messages=MAX_MESSAGES, max_message_chars=MAX_MESSAGE_CHARS):
+        """
+        Args:
+            bot (Chatbot, optional): Chatbot to serve, created (once) if omitted
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free port)
+            max_batch (int): Maximum utterances classified per batch
+            max_wait (float): Seconds a batch waits for more requests
+            timeout (float): Seconds a request waits for its answer before failing with 503
+            max_body_bytes (int): Largest request body accepted, larger ones get 413 unread
+            max_messages (int): Most utterances accepted in one {"messages": [...]} request
+            max_message_chars (int): Longest utterance accepted
+        """
+        self.bot = bot or Chatbot()
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self.max_messages = max_messages
+        self.max_message_chars = max_message_chars
+        self.batcher = MicroBatcher(self._answer_batch, max_batch, max_wait)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _answer_batch(self, texts):
+        return [{"intent": intent, "score": score, "response": self.bot.answer_for(intent)}
+                for intent, score in self.bot.match_batch(texts, batch_size=len(texts))]
+
+    def answer(self, texts):
+        """Answers to utterances, classified together with whatever else is in flight."""
+        futures = [self.batcher.submit(text) for text in texts]
+        return [future.result(self.timeout) for future in futures]
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self.batcher.start()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests on the calling thread until interrupted."""
+        self.batcher.start()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+            self.batcher.stop()
+            if self.bot.cache is not None:
+                self.bot.cache.save()
+
+    def stop(self):
+        """Shut the server down, stop the batcher and save the utterance cache."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self.batcher.stop()
+        if self.bot.cache is not None:
+            self.bot.cache.save()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self):
+        """Request, batching and cache counters."""
+        stats = dict(self.batcher.stats(), requests=self.requests, errors=self.errors)
+        if self.bot.cache is not None:
+            stats["cache"] = self.bot.cache.stats()
+        return stats
+
+    def parse_request(self, body):
+        """
+        Utterances of a decoded /chat request body.
+
+        Returns:
+            tuple: (texts, single) where single is True for a {"message": ...} request
+
+        Raises:
+            ValueError: The body is not a JSON object of the expected shape, or exceeds the limits
+        """
+        if not isinstance(body, dict):
+            raise ValueError("body must be a JSON object")
+        single = "messages" not in body
+        if single and not isinstance(body.get("message"), str):
+            raise ValueError('body must have a "message" string or a "messages" list')
+        texts = [body["message"]] if single else body["messages"]
+        if not isinstance(texts, list):
+            raise ValueError("messages must be a list")
+        if len(texts) > self.max_messages:
+            raise ValueError(f"at most {self.max_messages} messages per request")
+        for text in texts:
+            if not isinstance(text, str):
+                raise ValueError("messages must be strings")
+            if len(text) > self.max_message_chars:
+                raise ValueError(f"messages must be at most {self.max_message_chars} characters")
+        return texts, single
+
+    def _count(self, error=False):
+        with self._lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload, status=200, close=False):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if close:
+                    # The unread body would otherwise be parsed as the next request
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send_json({"status": "ok"})
+                elif self.path == "/stats":
+                    self._send_json(service.stats())
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                if self.path != "/chat":
+                    self._send_json({"error": "not found"}, status=404)
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or length > service.max_body_bytes:
+                    service._count(error=True)
+                    status, reason = (413, f"body exceeds {service.max_body_bytes} bytes") if length > 0 else \
+                        (400, "invalid Content-Length")
+                    self._send_json({"error": f"Invalid request: {reason}"}, status=status, close=True)
+                    return
+                try:
+                    texts, single = service.parse_request(json.loads(self.rfile.read(length) or b"{}"))
+                except ValueError as e:
+                    service._count(error=True)
+                    self._send_json({"error": f"Invalid request: {str(e)}"}, status=400)
+                    return
+
+                try:
+                    results = service.answer(texts)
+                except Exception as e:
+                    service._count(error=True)
+                    self._send_json({"error": f"Could not answer: {str(e)}"}, status=503)
+                    return
+                service._count()
+                self._send_json(results[0] if single else {"results": results})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the NLP chatbot over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--max-batch", type=int, default=64, help="Maximum utterances per batch")
+    parser.add_argument("--max-wait-ms", type=float, default=1.0, help="Milliseconds a batch waits for more requests")
+    parser.add_argument("--full-pipeline", action="store_true", help="Load every component of en_core_web_sm")
+    parser.add_argument("--cache", metavar="PATH", help="Memoize answers, persisted to this JSON file")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Maximum memoized utterances")
+    parser.add_argument("--artifact", metavar="DIR", help="Load the pipeline and intent index from this "
+                                                          "artifact directory (built if missing or stale)")
+    args = parser.parse_args()
+
+    cache = UtteranceCache(args.cache_size, args.cache) if args.cache else None
+    bot = Chatbot(full_pipeline=args.full_pipeline, cache=cache, artifact=args.artifact)
+    if args.artifact:
+        bot.refresh()  # Load (or build) the artifact before the first request
+    service = ChatService(bot, args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+    print(f"Serving the chatbot on {service.url} (Ctrl+C to stop)")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Utterance Cache
+---------------------------------------------------------
+Memo of chatbot classifications keyed on the utterance's lower-cased
+tokens, so repeated questions ("What is a for loop?", "what is a FOR loop ?")
+skip intent matching. The key is exactly the token sequence the intent index
+reads, so two utterances share an entry only if they must get the same
+answer ("for_each item" and "for each item" do not). Entries live in a
+bounded LRU with hit statistics and are tied to a fingerprint of the patterns
+and intents they were computed with: when the fingerprint changes the cache
+is emptied. The
+cache can be saved to a JSON file and is reloaded on start-up if the
+fingerprint still matches, so warm starts skip recomputation.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_VERSION = 2
+
+
+def token_key(doc):
+    """Cache key for a tokenized utterance: the tuple of its lower-cased token texts."""
+    return tuple(token.lower_ for token in doc)
+
+
+def fingerprint(*parts):
+    """Stable hash of JSON-serializable values (patterns, intents, priorities)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class UtteranceCache:
+    """Bounded LRU of token key -> (intent, score), optionally persisted to JSON."""
+
+    def __init__(self, max_entries=4096, path=None):
+        """
+        Args:
+            max_entries (int): Maximum utterances remembered
+            path (str, optional): JSON file the cache is loaded from and saved to
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = None  # Entries read from disk, kept until the fingerprint is known
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._loaded = (data.get("fingerprint"), data.get("entries", []))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not load utterance cache {self.path}: {str(e)}")
+
+    def bind(self, new_fingerprint):
+        """
+        Tie the cache to the patterns and intents identified by a fingerprint.
+
+        Entries computed under a different fingerprint are dropped; entries
+        loaded from disk are only used if their fingerprint matches.
+        """
+        with self._lock:
+            if new_fingerprint == self.fingerprint:
+                return
+            if self.fingerprint is not None or self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.fingerprint = new_fingerprint
+            loaded, self._loaded = self._loaded, None
+            if loaded is not None and loaded[0] == new_fingerprint:
+                for key, intent, score in loaded[1][-self.max_entries:]:
+                    self._entries[tuple(key)] = (intent, score)
+
+    def get(self, key):
+        """
+        Look up a token key.
+
+        Returns:
+            tuple: (intent, score), or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Remember (intent, score) for a token key."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def save(self, path=None):
+        """
+        Write the cache (least recently used first) to a JSON file.
+
+        Args:
+            path (str, optional): Target file, defaults to the path given at construction
+        """
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            data = {
+                "version": CACHE_VERSION,
+                "fingerprint": self.fingerprint,
+                "entries": [[list(key), intent, score] for key, (intent, score) in self._entries.items()],
+            }
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not save utterance cache {path}: {str(e)}")
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "invalidations": self.invalidations,
+            }
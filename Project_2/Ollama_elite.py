@@ -6,27 +6,31 @@ featuring comprehensive error handling, streaming responses, detailed analytics,
 and Project 2 COMP 474 specific requirements implementation.
 """
 
-import ollama
 import time
 import json
 import logging
 import threading
 import sys
 import os
+from contextlib import nullcontext
 from datetime import datetime
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
 from rich.theme import Theme
-from rich.syntax import Syntax
+from history_store import HistoryStore
+from turn_store import Turn, TurnStore
+from host_pool import HostPool
+from metrics import MetricsRecorder
+from model_registry import ModelRegistry
+from response_cache import ResponseCache, replay_chunks
+from artifact_writer import ArtifactWriter
+from context_window import ContextWindow
+from token_budget import DEFAULT_CONTEXT_TOKENS, context_length, estimate_tokens, set_context_length
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[logging.FileHandler("ollama_interaction.log"), logging.StreamHandler()]
+    handlers=[logging.FileHandler("ollama_interaction.log", delay=True), logging.StreamHandler()]
 )
 
 # Initialize Rich console with custom theme
@@ -42,66 +46,266 @@ custom_theme = Theme({
 })
 console = Console(theme=custom_theme)
 
+
+def _as_dict(response):
+    """Convert an ollama response object (or streamed chunk) into a plain dict."""
+    if isinstance(response, dict):
+        return response
+    if hasattr(response, "model_dump"):
+        return response.model_dump(exclude_none=True)
+    return dict(response)
+
+
 class OllamaInteractionSuite:
     """Professional interface for Ollama LLM interactions with advanced features."""
     
-    def __init__(self, default_model='llama3.2'):
-        """Initialize the interaction suite with configuration parameters."""
+    SUMMARY_SYSTEM_PROMPT = """You are an expert at summarizing information clearly and concisely.
+        Provide a well-structured summary of the text that:
+        
+        1. Includes the main points and key information
+        2. Omits unnecessary details
+        3. Is organized with headings and bullet points where appropriate
+        4. Is significantly shorter than the original text
+        
+        Your summary should be accurate and comprehensive despite its brevity.
+        """
+    
+    ROLLING_SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an assistant.
+        Update the previous summary (if any) with the new turns. Keep facts, decisions,
+        names, code identifiers and open questions; drop pleasantries. Reply with the
+        updated summary only, in at most a few short paragraphs.
+        """
+    
+    def __init__(self, default_model='llama3.2', hosts=None, lazy=False, history_window=50):
+        """
+        Initialize the interaction suite with configuration parameters.
+        
+        Args:
+            default_model (str): Model used when a request does not name one
+            hosts (list, optional): Ollama host URLs to balance across (OLLAMA_HOSTS / OLLAMA_HOST if omitted)
+            lazy (bool): Defer loading the history and checking the connection until the first request
+            history_window (int): Most recent turns kept in memory and considered for the context window
+        """
         self.default_model = default_model
+        self.pool = HostPool(hosts)
         self.session_start = datetime.now()
         self.interaction_count = 0
-        self.models_cache = None
+        self.registry = ModelRegistry(self.pool)  # Cached model listing and metadata
         self.last_response_time = 0
+        self.last_ttft = 0  # Time to first token of the last call, in seconds
         self.cumulative_token_count = 0
         self.stream_mode = False
-        self.conversation_history = []
-        self.conversation_file = "conversation_history.json"
-        self.load_conversation_history()
+        self.stream_refresh_rate = 12  # Maximum redraws per second while streaming
+        self.render_stats = {"streams": 0, "chunks": 0, "frames": 0, "seconds": 0.0}
+        self.quiet = False  # Suppress spinners and per-response notices (batch/threaded use)
+        self.response_cache = None  # Opt-in, see enable_response_cache()
+        self.router = None  # Opt-in, see enable_routing()
+        self.latency_slo = None  # Opt-in, see enable_latency_slo()
+        self.semantic_memory = None  # Opt-in, see enable_semantic_memory()
+        self.recall_turns = 4  # Earlier turns recalled per prompt by the semantic memory
+        self.summarizer = None  # Created on first long document
+        self.keep_alive = None  # Default keep_alive for every model, e.g. "30m" (server default if None)
+        self.model_settings = {}  # Per-model {"keep_alive": ..., "options": {...}}, "*" applies to all
+        self.settings_file = "model_settings.json"
+        self.load_model_settings()
+        self._state_lock = threading.RLock()
+        self.history_context_turns = history_window
+        self.last_prompt_tokens = 0
+        self.conversation_file = "conversation_history.jsonl"
+        self.history_store = HistoryStore(self.conversation_file, legacy_path="conversation_history.json")
+        # Only the recent window stays in memory; older turns are read back from the history file
+        self.conversation_history = TurnStore(self.history_store, window=history_window)
+        # Selects from the same window instead of keeping its own copy of the turns
+        self.context_window = ContextWindow(self.conversation_history)
         
-        # Create output directory for saving responses
+        # Output directory for saving responses, created when the first file is written
         self.output_dir = "llm_outputs"
-        os.makedirs(self.output_dir, exist_ok=True)
+        self._output_dir_ready = False
+        # Responses and generated code are written off the request path
+        self.artifacts = ArtifactWriter(self.output_dir)
+        
+        # Per-call latency/throughput metrics, logged as JSONL next to the responses
+        self.metrics = MetricsRecorder(jsonl_path=os.path.join(self.output_dir, "metrics.jsonl"))
+        
+        # Load the history and verify the Ollama server connection now, or on first use
+        self.lazy = lazy
+        self._started = False
+        if not lazy:
+            self._ensure_started()
+    
+    def _ensure_started(self):
+        """
+        Load the conversation history and check the connection on first use.
+        
+        Deferred startup never blocks on the server: the model registry is
+        loaded in the background and requests are routed regardless.
+        """
+        with self._state_lock:
+            if self._started:
+                return
+            self._started = True
+            self.load_conversation_history()
+        if self.lazy:
+            self.registry.refresh(background=True)
+            self.pool.start_health_checks()
+        else:
+            self._verify_ollama_connection()
+    
+    def close(self):
+        """
+        Drain pending work and release files, threads and servers at the end of a session.
         
-        # Verify Ollama server connection on startup
-        self._verify_ollama_connection()
+        Queued embeddings and output files are written before returning. Safe to call more than once.
+        """
+        self.disable_semantic_memory()
+        self.history_store.close()
+        self.disable_response_cache()
+        if self.summarizer is not None:
+            self.summarizer.close()
+            self.summarizer = None
+        self.pool.stop()
+        self.metrics.stop()
+        if self.artifacts.pending and not self.quiet:
+            console.print(f"[info]Writing {self.artifacts.pending} pending output files...")
+        self.artifacts.close()
     
-    def _verify_ollama_connection(self):
-        """Verify connection to Ollama server and cache available models."""
+    def _output_path(self, filename):
+        """Path of a file in the output directory, creating the directory on first use."""
+        if not self._output_dir_ready:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._output_dir_ready = True
+        return os.path.join(self.output_dir, filename)
+    
+    def _verify_ollama_connection(self, timeout=2.0):
+        """
+        Start loading the model registry and report on the Ollama servers.
+        
+        The registry is loaded in the background; startup only waits up to
+        timeout seconds for it so a slow server does not block the prompt.
+        """
+        self.registry.refresh(background=True)
         with console.status("[info]Connecting to Ollama server...", spinner="dots"):
-            try:
-                self.models_cache = ollama.list()
-                console.print(f"[success]✓ Connected to Ollama server")
-                console.print(f"[info]Available models: {len(self.models_cache['models'])}")
-            except Exception as e:
-                console.print(f"[error]! Failed to connect to Ollama server: {str(e)}")
-                console.print("[info]Make sure Ollama is running (https://ollama.ai/download)")
-                console.print("[info]Run 'ollama serve' if installed but not running")
-                sys.exit(1)
+            loaded = self.registry.wait(timeout)
+        self.pool.start_health_checks()
+        if not loaded:
+            console.print("[warning]Ollama server is slow to respond, loading models in the background")
+            return
+        
+        healthy = self.pool.healthy_count
+        for state in self.pool.hosts:
+            if not state.healthy:
+                console.print(f"[error]! Failed to connect to Ollama server {state.name}: {state.last_error}")
+        if not healthy:
+            console.print("[info]Make sure Ollama is running (https://ollama.ai/download)")
+            console.print("[info]Run 'ollama serve' if installed but not running")
+            sys.exit(1)
+        
+        if len(self.pool) > 1:
+            console.print(f"[success]✓ Connected to {healthy} of {len(self.pool)} Ollama servers")
+        else:
+            console.print(f"[success]✓ Connected to Ollama server")
+        console.print(f"[info]Available models: {len(self.registry)}")
+        self.load_model_metadata(self.default_model)
+    
+    def load_model_metadata(self, model, background=True):
+        """
+        Fetch a model's metadata and use its num_ctx for context budgeting.
+        
+        A num_ctx set in the model settings file takes precedence over the
+        one configured in the model's Modelfile.
+        """
+        def load():
+            metadata = self.registry.metadata(model)
+            if not metadata:
+                return
+            options, _ = self._request_settings(model)
+            if options and options.get("num_ctx"):
+                return
+            effective = metadata["num_ctx"] or DEFAULT_CONTEXT_TOKENS
+            if metadata["context_length"]:
+                effective = min(effective, metadata["context_length"])
+            if metadata["num_ctx"] or effective < DEFAULT_CONTEXT_TOKENS:
+                set_context_length(model, effective)
+        
+        if background:
+            threading.Thread(target=load, daemon=True).start()
+        else:
+            load()
+    
+    def set_default_model(self, model):
+        """
+        Change the default model after checking that a host has it.
+        
+        Args:
+            model (str): Model name
+            
+        Returns:
+            bool: True if the model was accepted
+        """
+        if self.registry.wait(0) and model not in self.registry:
+            console.print(f"[error]Model '{model}' is not available on any Ollama host")
+            suggestions = self.registry.suggest(model)
+            if suggestions:
+                console.print(f"[info]Did you mean: {', '.join(suggestions)}?")
+            return False
+        self.default_model = model
+        self.load_model_metadata(model)
+        return True
     
     def load_conversation_history(self):
-        """Load conversation history from file if exists."""
+        """Load the recent tail of the conversation history used for context."""
         try:
-            if os.path.exists(self.conversation_file):
-                with open(self.conversation_file, 'r') as f:
-                    self.conversation_history = json.load(f)
-                console.print(f"[info]Loaded {len(self.conversation_history)} previous conversation turns")
+            self.conversation_history.load()
+            self.context_window.clear()
+            if self.conversation_history:
+                console.print(f"[info]Loaded {len(self.conversation_history)} recent conversation turns")
         except Exception as e:
             console.print(f"[warning]Could not load conversation history: {str(e)}")
-            self.conversation_history = []
     
     def save_conversation_history(self):
-        """Save conversation history to file."""
+        """Flush appended conversation turns to disk."""
+        try:
+            self.history_store.sync()
+        except Exception as e:
+            console.print(f"[warning]Could not save conversation history: {str(e)}")
+    
+    def _append_turn(self, role, content, tokens=None):
+        """Record a conversation turn in memory and append it to the history file."""
+        turn = Turn(role, content, tokens=tokens or self.context_window.estimate(content))
         try:
-            with open(self.conversation_file, 'w') as f:
-                json.dump(self.conversation_history, f, indent=2)
+            offset = self.conversation_history.append(turn)
+            if self.semantic_memory is not None:
+                self.semantic_memory.add(offset, content)
         except Exception as e:
             console.print(f"[warning]Could not save conversation history: {str(e)}")
+        return turn
+    
+    def compact_conversation_history(self, keep_last=None):
+        """Rewrite the history file, dropping damaged lines and optionally old turns."""
+        try:
+            mapping = self.history_store.compact(keep_last=keep_last)
+            if self.semantic_memory is not None:
+                self.semantic_memory.remap(mapping)
+            self.load_conversation_history()
+            console.print(f"[success]Conversation history compacted ({len(self.history_store)} turns kept)")
+            return True
+        except Exception as e:
+            console.print(f"[error]Error compacting conversation history: {str(e)}")
+            return False
     
-    def list_available_models(self):
-        """Display available models in a formatted table."""
+    def list_available_models(self, refresh=False):
+        """
+        Display available models in a formatted table.
+        
+        Args:
+            refresh (bool): Re-query the hosts instead of using the cached listing
+        """
         try:
-            # Always get fresh model list
-            models_data = ollama.list()
+            if refresh or not self.registry.wait(0):
+                with console.status("[info]Loading models...", spinner="dots"):
+                    self.registry.refresh()
+            
+            from rich.table import Table
             
             # Create and populate table
             table = Table(title="Available Ollama Models")
@@ -109,12 +313,20 @@ class OllamaInteractionSuite:
             table.add_column("Size", style="green")
             table.add_column("Modified", style="yellow")
             table.add_column("Quantization", style="magenta")
+            table.add_column("Context", style="green", justify="right")
+            if len(self.pool) > 1:
+                table.add_column("Hosts", style="metrics")
             
-            for model in models_data['models']:
-                size_mb = f"{model['size'] / 1024 / 1024:.1f} MB"
-                modified = datetime.fromtimestamp(model['modified']).strftime('%Y-%m-%d %H:%M')
-                quant = model.get('details', {}).get('quantization_level', 'N/A')
-                table.add_row(model['name'], size_mb, modified, quant)
+            for model in self.registry.models():
+                size_mb = f"{model['size'] / 1024 / 1024:.1f} MB" if model.get('size') else "N/A"
+                modified = model['modified'].strftime('%Y-%m-%d %H:%M') if model.get('modified') else "N/A"
+                quant = (model.get('details') or {}).get('quantization_level') or 'N/A'
+                metadata = self.registry.cached_metadata(model['name'])
+                context = f"{metadata['context_length']:,}" if metadata and metadata['context_length'] else "-"
+                row = [model['name'], size_mb, modified, quant, context]
+                if len(self.pool) > 1:
+                    row.append(", ".join(model.get('hosts', [])))
+                table.add_row(*row)
             
             console.print(table)
             return True
@@ -122,7 +334,101 @@ class OllamaInteractionSuite:
             console.print(f"[error]Error listing models: {str(e)}")
             return False
     
-    def generate_response(self, prompt, model_name=None, stream=None, system_prompt=None):
+    def enable_response_cache(self, max_entries=256, ttl=24 * 3600, disk_path="response_cache.sqlite"):
+        """Cache responses keyed on (model, options, messages) in memory and on disk."""
+        if self.response_cache is None:
+            self.response_cache = ResponseCache(max_entries=max_entries, ttl=ttl, disk_path=disk_path)
+        return self.response_cache
+    
+    def disable_response_cache(self):
+        """Stop caching responses and release the on-disk tier."""
+        if self.response_cache is not None:
+            self.response_cache.close()
+            self.response_cache = None
+    
+    def enable_routing(self, threshold=0.75):
+        """Answer plain prompts from the Project 1 keyword chatbot when it is confident (see HybridRouter)."""
+        from hybrid_router import HybridRouter
+        
+        if self.router is None:
+            self.router = HybridRouter(self, threshold=threshold)
+        return self.router
+    
+    def disable_routing(self):
+        """Send every prompt to the LLM again."""
+        self.router = None
+    
+    def enable_latency_slo(self, hedge_model=None, deadline=2.0, limits=None):
+        """
+        Enforce per-command timeouts and token caps, hedging slow requests to a second model (see LatencySLO).
+        
+        Args:
+            hedge_model (str, optional): Model raced against the primary when it has no first token by the deadline
+            deadline (float): Seconds to wait for the primary's first token before hedging
+            limits (dict, optional): Command ("chat", "code", "summarize") -> {"timeout": ..., "max_tokens": ...}
+        """
+        from latency_slo import LatencySLO
+        
+        if self.latency_slo is None:
+            self.latency_slo = LatencySLO(hedge_model, deadline, limits)
+        else:
+            self.latency_slo.hedge_model = hedge_model
+            self.latency_slo.deadline = deadline
+            for command, values in (limits or {}).items():
+                self.latency_slo.set_limit(command, **values)
+        return self.latency_slo
+    
+    def disable_latency_slo(self):
+        """Send every request to its model only, without timeouts or token caps."""
+        self.latency_slo = None
+    
+    def enable_semantic_memory(self, model="nomic-embed-text", lsh_bits=0):
+        """
+        Recall relevant earlier turns by embedding similarity (see SemanticMemory).
+        
+        Turns already in the history that are not indexed yet are embedded in the background.
+        """
+        from semantic_memory import SemanticMemory
+        
+        if self.semantic_memory is None:
+            self.semantic_memory = SemanticMemory(self.history_store, self._embed, model=model, lsh_bits=lsh_bits)
+            self.semantic_memory.backfill()
+        return self.semantic_memory
+    
+    def disable_semantic_memory(self):
+        """Stop indexing and recalling turns; the index files are kept for later."""
+        if self.semantic_memory is not None:
+            self.semantic_memory.close()
+            self.semantic_memory = None
+    
+    def _embed(self, model, texts):
+        """Embeddings of texts from the host pool."""
+        return _as_dict(self.pool.call("embed", model=model, input=texts))["embeddings"]
+    
+    def _recall(self, prompt):
+        """Earlier turns relevant to the prompt as one context message, None if there are none."""
+        if self.semantic_memory is None:
+            return None
+        try:
+            exclude = {turn.content for turn in self.conversation_history.recent(self.history_context_turns)}
+            recalled = self.semantic_memory.recall(prompt, self.recall_turns, exclude)
+        except Exception as e:
+            logging.warning(f"Could not recall earlier turns: {str(e)}")
+            return None
+        if not recalled:
+            return None
+        turns = sorted((Turn.from_dict(record) for _, record in recalled), key=lambda turn: turn.timestamp)
+        lines = [f"[{turn.time_text('%Y-%m-%d %H:%M')}] {turn.role}: {turn.content[:1000]}" for turn in turns]
+        return "Relevant earlier conversation:\n" + "\n".join(lines)
+    
+    def ask(self, prompt, **kwargs):
+        """Answer a plain prompt, through the hybrid router when routing is enabled."""
+        if self.router is not None:
+            return self.router.route(prompt, **kwargs)
+        return self.generate_response(prompt, **kwargs)
+    
+    def generate_response(self, prompt, model_name=None, stream=None, system_prompt=None, use_history=True,
+                          use_cache=True, on_chunk=None, command="chat", quiet=None):
         """
         Generate a response from Ollama with detailed metrics.
         
@@ -131,70 +437,37 @@ class OllamaInteractionSuite:
             model_name (str, optional): Model to use, defaults to instance default
             stream (bool): Whether to stream the response token by token
             system_prompt (str, optional): System prompt to guide model behavior
+            use_history (bool): Send recent turns as context and record this exchange in the history
+            use_cache (bool): Serve from and store into the response cache when it is enabled;
+                pass False when sampling is non-deterministic and a fresh answer is wanted
+            on_chunk (callable, optional): Called with each streamed content fragment
+            command (str): "chat", "code" or "summarize"; selects the limits of the latency SLO mode
+            quiet (bool, optional): Suppress the spinner and saved-file notice for this call only,
+                defaults to the suite's quiet setting; use it from worker threads
             
         Returns:
             dict: Response data with content and metrics
         """
+        self._ensure_started()
         model = model_name or self.default_model
         stream = self.stream_mode if stream is None else stream
+        quiet = self.quiet if quiet is None else quiet
         start_time = time.time()
-        self.interaction_count += 1
+        with self._state_lock:
+            self.interaction_count += 1
         
         try:
-            # Format the messages for the API
-            messages = []
-            
-            # Add system prompt if provided
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            
-            # Add conversation history for context (with a limit to avoid context length issues)
-            for turn in self.conversation_history[-5:]:  # Include last 5 turns
-                messages.append({"role": turn["role"], "content": turn["content"]})
-            
-            # Add the current prompt
-            messages.append({"role": "user", "content": prompt})
-            
-            # Add current prompt to conversation history
-            self.conversation_history.append({"role": "user", "content": prompt, "timestamp": datetime.now().isoformat()})
+            messages = self._build_messages(prompt, system_prompt, use_history, model)
             
             if stream:
-                return self._stream_response(model, messages)
+                return self._stream_response(model, messages, start_time, use_history, use_cache, on_chunk,
+                                             command, quiet)
             else:
-                with console.status(f"[info]Generating response with {model}...", spinner="dots"):
-                    response = ollama.chat(model=model, messages=messages)
-                    
-                # Track performance metrics
-                self.last_response_time = time.time() - start_time
-                if 'eval_count' in response:
-                    self.cumulative_token_count += response['eval_count']
-                
-                # Add response to conversation history
-                if 'message' in response and 'content' in response['message']:
-                    self.conversation_history.append({
-                        "role": "assistant", 
-                        "content": response['message']['content'],
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    self.save_conversation_history()
-                
-                # Save response to file (Project 2 requirement)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{self.output_dir}/response_{timestamp}.md"
-                
-                try:
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        f.write(f"# LLM Response - {timestamp}\n\n")
-                        f.write(f"## Prompt\n\n{prompt}\n\n")
-                        f.write(f"## Response\n\n{response['message']['content']}\n\n")
-                        f.write(f"## Metadata\n\n")
-                        f.write(f"- Model: {response.get('model', 'unknown')}\n")
-                        f.write(f"- Response time: {self.last_response_time:.2f} seconds\n")
-                        f.write(f"- Tokens generated: {response.get('eval_count', 'unknown')}\n")
-                    console.print(f"[info]Response saved to {filename}")
-                except Exception as e:
-                    console.print(f"[warning]Could not save response to file: {str(e)}")
+                with self._status(f"[info]Generating response with {model}...", quiet):
+                    response = self._chat(model, messages, use_cache=use_cache, command=command)
                 
+                self._finalize_response(prompt, response, start_time, record_history=use_history, messages=messages,
+                                        model=model, quiet=quiet)
                 return response
                 
         except Exception as e:
@@ -202,77 +475,285 @@ class OllamaInteractionSuite:
             logging.error(error_msg)
             return {"error": error_msg}
     
-    def _stream_response(self, model, messages):
-        """Stream response token by token with visual progress indicator."""
-        full_response = {"message": {"content": ""}}
-        
-        # Set up the progress display
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            task = progress.add_task(f"[cyan]Generating response with {model}...", total=None)
-            
-            try:
-                # Generator approach to stream the response
-                for chunk in ollama.chat(
-                    model=model,
-                    messages=messages,
-                    stream=True
-                ):
-                    if 'message' in chunk and 'content' in chunk['message']:
-                        content = chunk['message']['content']
-                        console.print(content, end="")
-                        full_response["message"]["content"] += content
-                        
-                    # Update full response with metrics
-                    for key, value in chunk.items():
-                        if key != 'message':
-                            full_response[key] = value
-                
-                console.print()  # Add newline at end
-                
-                # Add response to conversation history
-                self.conversation_history.append({
-                    "role": "assistant", 
-                    "content": full_response['message']['content'],
-                    "timestamp": datetime.now().isoformat()
-                })
-                self.save_conversation_history()
-                
-                # Save response to file (Project 2 requirement)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{self.output_dir}/stream_response_{timestamp}.md"
-                
+    def load_model_settings(self):
+        """Load per-model keep_alive and options from the settings file if it exists."""
+        try:
+            if os.path.exists(self.settings_file):
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    self.model_settings = json.load(f)
+                for model, settings in self.model_settings.items():
+                    num_ctx = settings.get("options", {}).get("num_ctx")
+                    if num_ctx and model != "*":
+                        set_context_length(model, num_ctx)
+        except Exception as e:
+            console.print(f"[warning]Could not load model settings: {str(e)}")
+            self.model_settings = {}
+    
+    def _request_settings(self, model, options=None):
+        """
+        Resolve the options and keep_alive to send for a model.
+        
+        Settings for "*" apply to every model, model-specific settings override
+        them, and explicit per-call options override both.
+        
+        Returns:
+            tuple: (options dict or None, keep_alive or None)
+        """
+        merged = {}
+        keep_alive = self.keep_alive
+        for key in ("*", model.split(":")[0], model):
+            settings = self.model_settings.get(key, {})
+            merged.update(settings.get("options", {}))
+            keep_alive = settings.get("keep_alive", keep_alive)
+        merged.update(options or {})
+        return (merged or None), keep_alive
+    
+    def warm_up(self, model=None, background=True):
+        """
+        Load a model into server memory ahead of the first request.
+        
+        An empty generate request makes Ollama load the model without
+        producing any tokens; keep_alive keeps it resident between bursts.
+        """
+        model = model or self.default_model
+        _, keep_alive = self._request_settings(model)
+        
+        def load():
+            # Every host that may serve the model gets it loaded
+            for state in self.pool.hosts_for(model):
+                start = time.time()
                 try:
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        f.write(f"# LLM Streamed Response - {timestamp}\n\n")
-                        f.write(f"## Prompt\n\n{messages[-1]['content']}\n\n")
-                        f.write(f"## Response\n\n{full_response['message']['content']}\n\n")
-                        f.write(f"## Metadata\n\n")
-                        f.write(f"- Model: {full_response.get('model', 'unknown')}\n")
-                        if 'total_duration' in full_response:
-                            duration_ms = full_response["total_duration"] / 1_000_000
-                            f.write(f"- Response time: {duration_ms:.2f} ms\n")
-                        if 'eval_count' in full_response:
-                            f.write(f"- Tokens generated: {full_response['eval_count']}\n")
-                    console.print(f"[info]Streamed response saved to {filename}")
+                    state.client.generate(model=model, prompt="", keep_alive=keep_alive)
+                    logging.info(f"Warmed up {model} on {state.name} in {time.time() - start:.2f} seconds")
                 except Exception as e:
-                    console.print(f"[warning]Could not save response to file: {str(e)}")
-                
-                return full_response
-                
-            except Exception as e:
-                error_msg = f"Error in streaming response: {str(e)}"
-                logging.error(error_msg)
-                return {"error": error_msg}
+                    logging.warning(f"Could not warm up {model} on {state.name}: {str(e)}")
+        
+        if background:
+            threading.Thread(target=load, daemon=True).start()
+        else:
+            load()
+    
+    def _chat(self, model, messages, stream=False, use_cache=True, options=None, command="chat"):
+        """
+        Send a chat request, going through the response cache when enabled.
+        
+        In latency SLO mode the command's token cap and timeout apply and the
+        request may be hedged to the SLO's hedge model.
+        
+        Returns:
+            dict, or an iterator of chunk dicts when streaming
+        """
+        slo = self.latency_slo
+        request_options = slo.options_for(command, options) if slo is not None else options
+        options, keep_alive = self._request_settings(model, request_options)
+        cache = self.response_cache if use_cache else None
+        key = None
+        if cache is not None:
+            key = ResponseCache.make_key(model, messages, options)
+            cached = cache.get(key)
+            if cached is not None:
+                cached = dict(cached, cached=True)
+                return replay_chunks(cached) if stream else cached
+        
+        if slo is not None:
+            def open_stream(racer_model):
+                racer_options, racer_keep_alive = self._request_settings(racer_model, request_options)
+                return map(_as_dict, self.pool.stream("chat", racer_model, messages=messages,
+                                                      options=racer_options, keep_alive=racer_keep_alive))
+            
+            chunks = slo.stream(open_stream, model, command)
+            if stream:
+                return self._cache_stream(chunks, cache, key) if cache is not None else chunks
+            from latency_slo import collect
+            
+            response = collect(chunks)
+            if cache is not None and response.get("winner") == "primary":
+                cache.put(key, response)
+            return response
+        
+        if not stream:
+            response = _as_dict(self.pool.call("chat", model, messages=messages, options=options,
+                                               keep_alive=keep_alive))
+            if cache is not None and "message" in response:
+                cache.put(key, response)
+            return response
+        
+        chunks = self.pool.stream("chat", model, messages=messages, options=options, keep_alive=keep_alive)
+        return self._cache_stream(chunks, cache, key) if cache is not None else map(_as_dict, chunks)
+    
+    def _cache_stream(self, chunks, cache, key):
+        """Pass streamed chunks through and store the assembled response once it completes."""
+        parts = []
+        for chunk in chunks:
+            chunk = _as_dict(chunk)
+            parts.append(chunk.get("message", {}).get("content", ""))
+            yield chunk
+            # An answer from a hedge model is not stored under the primary model's key
+            if chunk.get("done") and chunk.get("winner", "primary") == "primary":
+                response = {k: v for k, v in chunk.items() if k != "message"}
+                response["message"] = {"role": "assistant", "content": "".join(parts)}
+                cache.put(key, response)
+    
+    def enable_rolling_summaries(self, enabled=True):
+        """Replace turns that no longer fit the context with a background-updated summary."""
+        self.context_window.summarizer = self._summarize_turns if enabled else None
+    
+    def _summarize_turns(self, previous_summary, turns):
+        """Fold turns into a running conversation summary (runs on a background thread)."""
+        text = "\n\n".join(f"{turn['role'].title()}: {turn['content']}" for turn in turns)
+        if previous_summary:
+            text = f"Previous summary:\n{previous_summary}\n\nNew turns:\n{text}"
+        response = self._chat(self.default_model, [
+            {"role": "system", "content": self.ROLLING_SUMMARY_PROMPT},
+            {"role": "user", "content": text},
+        ], command="summarize")
+        return response["message"]["content"].strip()
+    
+    def _status(self, message, quiet=None):
+        """Spinner shown while waiting on the model, or a no-op in quiet mode (or when quiet is passed)."""
+        quiet = self.quiet if quiet is None else quiet
+        return nullcontext() if quiet else console.status(message, spinner="dots")
+    
+    def _build_messages(self, prompt, system_prompt=None, use_history=True, model=None):
+        """Assemble the chat messages for a prompt from the system prompt, recent and recalled history."""
+        messages = []
+        
+        # Add system prompt if provided
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        
+        # Add as much recent history as fits in the model's context window
+        if use_history:
+            recalled = self._recall(prompt)
+            history, _ = self.context_window.messages_for(
+                context_length(model or self.default_model),
+                "\n".join(part for part in (system_prompt, recalled) if part) or None, prompt
+            )
+            messages.extend(history)
+            # Recalled turns go after the history so the history prefix stays cacheable
+            if recalled:
+                messages.append({"role": "system", "content": recalled})
+        
+        # Add the current prompt
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    def _finalize_response(self, prompt, response, start_time, streamed=False, record_history=True,
+                           messages=None, model=None, chunk_times=None, quiet=None):
+        """
+        Account for a completed response and persist it.
+        
+        Token accounting and the history update happen under the state lock so
+        concurrent requests never lose updates or interleave a prompt with
+        another request's answer.
+        """
+        content = response.get("message", {}).get("content")
+        elapsed = time.time() - start_time
+        if "ttft" not in response:
+            # Without a stream, the first token arrived once everything but generation was done
+            response["ttft"] = max(0.0, elapsed - response.get("eval_duration", 0) / 1e9)
+        self.metrics.record(response.get("model") or model or self.default_model, elapsed, response, chunk_times)
+        with self._state_lock:
+            self.last_response_time = elapsed
+            self.last_ttft = response["ttft"]
+            if response.get("eval_count") and not response.get("cached"):
+                self.cumulative_token_count += response["eval_count"]
+            if response.get("prompt_eval_count") and not response.get("cached"):
+                self.last_prompt_tokens = response["prompt_eval_count"]
+                if messages:
+                    estimated = sum(self.context_window.estimate(m["content"]) for m in messages)
+                    self.context_window.observe(estimated, response["prompt_eval_count"])
+            if content is not None and record_history:
+                self._append_turn("user", prompt)
+                self._append_turn("assistant", content, tokens=response.get("eval_count"))
+        
+        if content is not None:
+            self._save_response_file(prompt, response, streamed, quiet)
+    
+    def _save_response_file(self, prompt, response, streamed=False, quiet=None):
+        """Queue a response and its metadata to be saved as a Markdown file (Project 2 requirement)."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = "stream_response" if streamed else "response"
+        lines = [
+            f"# LLM {'Streamed ' if streamed else ''}Response - {timestamp}\n\n",
+            f"## Prompt\n\n{prompt}\n\n",
+            f"## Response\n\n{response['message']['content']}\n\n",
+            f"## Metadata\n\n",
+            f"- Model: {response.get('model', 'unknown')}\n",
+        ]
+        if streamed:
+            if 'total_duration' in response:
+                duration_ms = response["total_duration"] / 1_000_000
+                lines.append(f"- Response time: {duration_ms:.2f} ms\n")
+            if 'eval_count' in response:
+                lines.append(f"- Tokens generated: {response['eval_count']}\n")
+        else:
+            lines.append(f"- Response time: {self.last_response_time:.2f} seconds\n")
+            lines.append(f"- Tokens generated: {response.get('eval_count', 'unknown')}\n")
+        
+        record = {
+            "prompt": prompt,
+            "response": response['message']['content'],
+            "model": response.get('model'),
+            "response_time": self.last_response_time,
+            "tokens": response.get('eval_count'),
+        }
+        filename = self.artifacts.save(prefix, "md", "".join(lines), record)
+        if not (self.quiet if quiet is None else quiet):
+            console.print(f"[info]{'Streamed response' if streamed else 'Response'} saved to {filename}")
+    
+    def _stream_response(self, model, messages, start_time=None, record_history=True, use_cache=True,
+                         on_chunk=None, command="chat", quiet=None):
+        """Stream the response, rendering it as Markdown at a bounded frame rate."""
+        from stream_renderer import StreamRenderer
+        
+        quiet = self.quiet if quiet is None else quiet
+        start_time = start_time or time.time()
+        chunk_times = []
+        final_chunk = {}
+        status = None if quiet else console.status(f"[cyan]Generating response with {model}...", spinner="dots")
+        renderer = StreamRenderer(None if quiet else console, self.stream_refresh_rate, status=status)
+        
+        try:
+            with renderer:
+                for chunk in self._chat(model, messages, stream=True, use_cache=use_cache, command=command):
+                    content = chunk.get("message", {}).get("content")
+                    if content:
+                        chunk_times.append(time.time())
+                        renderer.feed(content)
+                        if on_chunk:
+                            on_chunk(content)
+                    if chunk.get("done"):
+                        # Only the final chunk carries the response metrics
+                        final_chunk = chunk
+        except Exception as e:
+            error_msg = f"Error in streaming response: {str(e)}"
+            logging.error(error_msg)
+            return {"error": error_msg}
+        
+        full_response = {key: value for key, value in final_chunk.items() if key != "message"}
+        full_response["message"] = {"role": "assistant", "content": renderer.text}
+        full_response["streamed"] = True
+        if chunk_times:
+            full_response["ttft"] = chunk_times[0] - start_time
+        with self._state_lock:
+            self.render_stats["streams"] += 1
+            self.render_stats["chunks"] += renderer.chunks
+            self.render_stats["frames"] += renderer.frames
+            self.render_stats["seconds"] += renderer.render_seconds
+        
+        self._finalize_response(messages[-1]['content'], full_response, start_time,
+                                streamed=True, record_history=record_history, messages=messages,
+                                model=model, chunk_times=chunk_times, quiet=quiet)
+        return full_response
     
     def display_session_stats(self):
         """Display detailed session statistics."""
         session_duration = datetime.now() - self.session_start
         minutes = session_duration.total_seconds() / 60
         
+        from rich.table import Table
+        
         table = Table(title="Session Statistics")
         table.add_column("Metric", style="cyan")
         table.add_column("Value", style="green")
@@ -280,62 +761,180 @@ class OllamaInteractionSuite:
         table.add_row("Session Duration", f"{minutes:.2f} minutes")
         table.add_row("Interactions", str(self.interaction_count))
         table.add_row("Last Response Time", f"{self.last_response_time:.2f} seconds")
+        table.add_row("Last Time to First Token", f"{self.last_ttft * 1000:.0f} ms")
         table.add_row("Total Tokens Generated", f"{self.cumulative_token_count}")
-        table.add_row("Conversation History Size", f"{len(self.conversation_history)} turns")
+        table.add_row("Conversation History Size", f"{len(self.history_store)} turns")
+        if self.last_prompt_tokens:
+            table.add_row("Last Prompt Tokens", str(self.last_prompt_tokens))
+        if self.context_window.stable_prefix:
+            table.add_row("Prefix Compactions", str(self.context_window.compactions))
         
         if self.interaction_count > 0 and minutes > 0:
             table.add_row("Avg. Tokens per Minute", f"{self.cumulative_token_count / minutes:.1f}")
             table.add_row("Avg. Tokens per Interaction", f"{self.cumulative_token_count / self.interaction_count:.1f}")
         
+        if self.render_stats["streams"]:
+            render = self.render_stats
+            table.add_row("Streaming Render Overhead",
+                          f"{render['seconds'] * 1000:.1f} ms over {render['frames']} frames "
+                          f"({render['chunks']} chunks, {render['streams']} streams)")
+        
+        artifacts = self.artifacts.stats()
+        if artifacts["files"] or artifacts["archived"] or artifacts["pending"]:
+            table.add_row("Output Files Written", f"{artifacts['files']} files, {artifacts['archived']} archived "
+                                                  f"({artifacts['pending']} pending)")
+        
+        if self.response_cache is not None:
+            cache_stats = self.response_cache.stats()
+            table.add_row("Cache Hits (memory / disk)", f"{cache_stats['memory_hits']} / {cache_stats['disk_hits']}")
+            table.add_row("Cache Misses", str(cache_stats['misses']))
+            table.add_row("Cache Hit Rate", f"{cache_stats['hit_rate'] * 100:.1f}%")
+        
+        if self.semantic_memory is not None:
+            memory = self.semantic_memory.stats()
+            table.add_row("Semantic Memory", f"{memory['rows']} turns indexed ({memory['pending']} pending, "
+                                             f"{memory['failures']} failed)")
+        
+        if self.latency_slo is not None and self.latency_slo.stats()["requests"]:
+            slo = self.latency_slo.stats()
+            table.add_row("SLO Requests (hedged)", f"{slo['requests']} ({slo['hedged']} hedged to "
+                                                   f"{slo['hedge_model'] or '-'}, {slo['fallbacks']} after errors)")
+            table.add_row("Hedge Wins (primary / hedge)", f"{slo['wins']['primary']} / {slo['wins']['hedge']} "
+                                                          f"({slo['hedge_win_rate'] * 100:.1f}% won by the hedge)")
+            if slo["saved_samples"]:
+                table.add_row("Latency Saved by Hedging", f"{slo['saved_seconds']:.2f} seconds over "
+                                                          f"{slo['saved_samples']} requests")
+            table.add_row("Hard Timeouts", str(slo["timeouts"]))
+        
+        if self.router is not None and self.router.stats()["requests"]:
+            routing = self.router.stats()
+            for name, label in (("rules", "Rule-based Answers"), ("llm", "LLM Answers")):
+                tier = routing["tiers"][name]
+                table.add_row(label, f"{tier['requests']} ({tier['hit_rate'] * 100:.1f}%), "
+                                     f"avg {tier['avg_seconds'] * 1000:.1f} ms")
+            if routing["saved_seconds"] is not None:
+                table.add_row("Est. Latency Saved by Routing", f"{routing['saved_seconds']:.2f} seconds")
+        
+        console.print(table)
+        if len(self.pool) > 1:
+            self.display_host_stats()
+        self.display_latency_stats()
+    
+    def display_host_stats(self):
+        """Display routing, health and circuit-breaker state of each Ollama host."""
+        from rich.table import Table
+        
+        table = Table(title="Ollama Hosts")
+        table.add_column("Host", style="cyan")
+        table.add_column("Status", style="green")
+        table.add_column("Models", style="yellow", justify="right")
+        table.add_column("Requests", style="green", justify="right")
+        table.add_column("Failures", style="red", justify="right")
+        table.add_column("In Flight", style="magenta", justify="right")
+        table.add_column("Latency (ms)", style="green", justify="right")
+        
+        for host in self.pool.stats():
+            if host["circuit_open"]:
+                status = "[error]circuit open"
+            else:
+                status = "healthy" if host["healthy"] else "[warning]unreachable"
+            latency = f"{host['latency'] * 1000:.0f}" if host["latency"] else "-"
+            table.add_row(host["host"], status, str(host["models"]), str(host["requests"]),
+                          str(host["failures"]), str(host["outstanding"]), latency)
+        
+        console.print(table)
+    
+    def display_latency_stats(self):
+        """Display per-model latency and throughput percentiles."""
+        summary = self.metrics.summary()
+        if not summary:
+            return
+        
+        from rich.table import Table
+        
+        table = Table(title="Latency & Throughput (p50 / p95 / p99)")
+        table.add_column("Model", style="cyan")
+        table.add_column("Metric", style="yellow")
+        table.add_column("p50", style="green", justify="right")
+        table.add_column("p95", style="green", justify="right")
+        table.add_column("p99", style="green", justify="right")
+        table.add_column("Samples", style="metrics", justify="right")
+        
+        for model, metrics in summary.items():
+            for metric, stats in metrics.items():
+                if metric.endswith("_seconds"):
+                    label = metric[:-len("_seconds")].replace("_", " ") + " (ms)"
+                    values = [f"{stats[p] * 1000:.1f}" for p in ("p50", "p95", "p99")]
+                else:
+                    label = metric.replace("_tokens_per_second", "").replace("_", " ") + " (tok/s)"
+                    values = [f"{stats[p]:.1f}" for p in ("p50", "p95", "p99")]
+                table.add_row(model, label, *values, str(stats["count"]))
+                model = ""  # Only label the first row of each model
+        
         console.print(table)
 
     def clear_conversation_history(self):
         """Clear the current conversation history."""
-        self.conversation_history = []
-        self.save_conversation_history()
+        self.conversation_history.clear()
+        self.context_window.clear()
+        if self.semantic_memory is not None:
+            self.semantic_memory.clear()
         console.print("[success]Conversation history cleared")
 
     def save_conversation_to_markdown(self, filename=None):
-        """Save the conversation history to a Markdown file."""
+        """Save the conversation history to a Markdown file, streamed turn by turn from the history file."""
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{self.output_dir}/conversation_{timestamp}.md"
+            filename = self._output_path(f"conversation_{timestamp}.md")
         
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"# Conversation History - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                f.write(f"Model: {self.default_model}\n\n")
-                
-                for turn in self.conversation_history:
-                    role = turn['role']
-                    content = turn['content']
-                    timestamp = turn.get('timestamp', 'Unknown time')
-                    
-                    if isinstance(timestamp, str):
-                        try:
-                            dt = datetime.fromisoformat(timestamp)
-                            timestamp = dt.strftime('%Y-%m-%d %H:%M:%S')
-                        except ValueError:
-                            pass  # Keep original timestamp string if parsing fails
-                    
-                    f.write(f"## {role.title()} ({timestamp})\n\n")
-                    f.write(f"{content}\n\n")
-                    f.write("---\n\n")
-                
-                f.write(f"\n\n*Generated by Ollama Interaction Suite*\n")
+                self.conversation_history.export_markdown(
+                    f, f"Conversation History - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", self.default_model)
             
             console.print(f"[success]Conversation saved to {filename}")
             return True
         except Exception as e:
             console.print(f"[error]Error saving conversation: {str(e)}")
             return False
+    
+    def save_conversation_to_json(self, filename=None):
+        """Save the conversation history to a JSON file, streamed turn by turn from the history file."""
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = self._output_path(f"conversation_{timestamp}.json")
+        
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                count = self.conversation_history.export_json(f)
+            
+            console.print(f"[success]Conversation ({count} turns) saved to {filename}")
+            return True
+        except Exception as e:
+            console.print(f"[error]Error saving conversation: {str(e)}")
+            return False
                 
-    def code_generation(self, prompt, language="python"):
+    def code_generation(self, prompt, language="python", use_history=True):
         """
         Generate code based on user requirements.
         Specialized prompt engineering for code generation tasks.
         """
-        system_prompt = f"""You are an expert {language} developer. 
+        if not self.quiet:
+            console.print(f"[project]Generating {language} code based on your requirements...")
+        # Blocks are saved and syntax-checked as soon as their closing fence streams in
+        extractor = self._code_extractor(language)
+        response = self.generate_response(prompt, system_prompt=self._code_system_prompt(language),
+                                          use_history=use_history, on_chunk=extractor.feed, command="code")
+        
+        if "error" in response:
+            return response
+        
+        self._save_code_blocks(response, language, extractor)
+        return response
+    
+    def _code_system_prompt(self, language):
+        """Build the system prompt used for code generation in a language."""
+        return f"""You are an expert {language} developer. 
         Your task is to generate clean, efficient, well-documented {language} code 
         based on the user's requirements. Include:
         
@@ -346,29 +945,41 @@ class OllamaInteractionSuite:
         
         Format your response using Markdown code blocks with the appropriate language tag.
         """
+    
+    def _code_extractor(self, language):
+        """Code block extractor that saves every block as soon as it is complete."""
+        from code_extractor import CodeBlockExtractor
         
-        console.print(f"[project]Generating {language} code based on your requirements...")
-        response = self.generate_response(prompt, system_prompt=system_prompt)
-        
-        if "error" in response:
-            return response
+        return CodeBlockExtractor(language, on_block=self._save_code_block)
+    
+    def _save_code_block(self, block):
+        """Queue one extracted code block to be written to its own file."""
+        block["path"] = self.artifacts.save("generated_code", self._get_file_extension(block["language"]),
+                                            block["code"], {key: value for key, value in block.items()
+                                                            if key != "path"})
+    
+    def _save_code_blocks(self, response, language, extractor=None):
+        """
+        Save every code block of a response to its own file.
         
-        # Save code to separate file
+        Blocks already handled while the response streamed are not saved again;
+        without a stream the complete content is parsed here. The saved paths
+        are added to the response as "code_files".
+        """
         try:
-            content = response['message']['content']
+            extractor = extractor or self._code_extractor(language)
+            if not extractor.received:
+                extractor.feed(response['message']['content'])
+            extractor.close()
+            response["code_files"] = [block["path"] for block in extractor.blocks]
             
-            # Extract code blocks from markdown
-            import re
-            code_blocks = re.findall(r'```(?:' + language + r')?\n(.*?)\n```', content, re.DOTALL)
-            
-            if code_blocks:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                code_filename = f"{self.output_dir}/generated_code_{timestamp}.{self._get_file_extension(language)}"
-                
-                with open(code_filename, 'w', encoding='utf-8') as f:
-                    f.write(code_blocks[0])  # Write the first code block
-                
-                console.print(f"[success]Generated code saved to {code_filename}")
+            if not self.quiet:
+                for block in extractor.blocks:
+                    console.print(f"[success]Generated {block['language']} code saved to {block['path']}")
+                    if block.get("valid") is False:
+                        console.print(f"[warning]Syntax error in block {block['index'] + 1}: {block['error']}")
+                    elif not block["complete"]:
+                        console.print(f"[warning]Block {block['index'] + 1} has no closing fence; it may be truncated")
             
             return response
         except Exception as e:
@@ -376,7 +987,9 @@ class OllamaInteractionSuite:
             return response
     
     def _get_file_extension(self, language):
-        """Get the appropriate file extension for a language."""
+        """Get the appropriate file extension for a language or one of its aliases."""
+        from code_extractor import canonical_language
+        
         extensions = {
             "python": "py",
             "javascript": "js",
@@ -398,40 +1011,63 @@ class OllamaInteractionSuite:
             "powershell": "ps1",
             "r": "r",
             "matlab": "m",
+            "json": "json",
+            "yaml": "yaml",
         }
-        return extensions.get(language.lower(), "txt")
+        return extensions.get(canonical_language(language), "txt")
     
-    def document_summarization(self, text):
+    def document_summarization(self, text, use_history=True):
         """
         Summarize a document or long text.
-        Uses specialized prompt engineering for summarization tasks.
+        Uses specialized prompt engineering for summarization tasks. Text that
+        would not fit in half of the model's context window is summarized
+        chunk by chunk (see ChunkedSummarizer).
         """
-        system_prompt = """You are an expert at summarizing information clearly and concisely.
-        Provide a well-structured summary of the text that:
-        
-        1. Includes the main points and key information
-        2. Omits unnecessary details
-        3. Is organized with headings and bullet points where appropriate
-        4. Is significantly shorter than the original text
-        
-        Your summary should be accurate and comprehensive despite its brevity.
-        """
-        
-        prompt = f"Please summarize the following text:\n\n{text}"
+        if estimate_tokens(text) > context_length(self.default_model) // 2:
+            if not self.quiet:
+                console.print(f"[project]Generating chunked summary of a long document...")
+            return self._get_summarizer().summarize_text(text, use_history=use_history)
         
-        console.print(f"[project]Generating document summary...")
-        return self.generate_response(prompt, system_prompt=system_prompt)
+        if not self.quiet:
+            console.print(f"[project]Generating document summary...")
+        return self.generate_response(self._summary_prompt(text), system_prompt=self.SUMMARY_SYSTEM_PROMPT,
+                                      use_history=use_history, command="summarize")
+    
+    def summarize_file(self, path, use_history=True):
+        """Summarize a text file of any size, streaming it from disk in chunks."""
+        if not self.quiet:
+            console.print(f"[project]Generating summary of {path}...")
+        try:
+            return self._get_summarizer().summarize_file(path, use_history=use_history)
+        except OSError as e:
+            return {"error": f"Could not read {path}: {str(e)}"}
+    
+    def _get_summarizer(self):
+        """Create the chunked summarizer on first use."""
+        with self._state_lock:
+            if self.summarizer is None:
+                from summarizer import ChunkedSummarizer
+                
+                self.summarizer = ChunkedSummarizer(self)
+            return self.summarizer
+    
+    def _summary_prompt(self, text):
+        """Build the user prompt asking for a summary of text."""
+        return f"Please summarize the following text:\n\n{text}"
     
     def format_response(self, response):
         """Format the response for display with rich formatting."""
+        from rich.markdown import Markdown
+        from rich.panel import Panel
+        
         if "error" in response:
             console.print(Panel(response["error"], title="Error", border_style="red"))
             return
             
         if "message" in response and "content" in response["message"]:
-            # Display the main content
-            content = response["message"]["content"]
-            console.print(Markdown(content))
+            # Display the main content (streamed responses were already rendered live)
+            if not response.get("streamed"):
+                console.print(Markdown(response["message"]["content"]))
             
             # Display metrics in a compact format
             metrics = []
@@ -440,6 +1076,8 @@ class OllamaInteractionSuite:
             if "total_duration" in response:
                 duration_ms = response["total_duration"] / 1_000_000
                 metrics.append(f"Time: {duration_ms:.2f}ms")
+            if "ttft" in response:
+                metrics.append(f"TTFT: {response['ttft'] * 1000:.0f}ms")
             if "eval_count" in response:
                 metrics.append(f"Tokens: {response['eval_count']}")
                 
@@ -449,6 +1087,9 @@ class OllamaInteractionSuite:
 
 def main():
     """Main application entry point with interactive command loop."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+    
     console.print(Panel.fit(
         "[bold cyan]Ollama Interaction Suite[/bold cyan]\n"
         "[dim]Professional LLM Interface[/dim]\n"
@@ -456,105 +1097,249 @@ def main():
         border_style="cyan"
     ))
     
-    # Initialize the interaction suite
+    # Initialize the interaction suite and load the default model in the background
     suite = OllamaInteractionSuite()
+    suite.warm_up()
     
-    # Command loop
-    while True:
-        console.print("\n[prompt]Enter command or prompt[/prompt] [dim](type 'help' for options)[/dim]:", end=" ")
-        user_input = input()
-        
-        # Handle special commands
-        if user_input.lower() in ["exit", "quit", "q"]:
-            suite.display_session_stats()
-            suite.save_conversation_to_markdown()
-            console.print("[success]Session ended successfully.")
-            break
+    # Command loop; the suite is closed however it ends, Ctrl+C included
+    try:
+        while True:
+            console.print("\n[prompt]Enter command or prompt[/prompt] [dim](type 'help' for options)[/dim]:", end=" ")
+            user_input = input()
             
-        elif user_input.lower() in ["help", "h", "?"]:
-            help_text = """
+            # Handle special commands
+            if user_input.lower() in ["exit", "quit", "q"]:
+                suite.display_session_stats()
+                suite.save_conversation_to_markdown()
+                suite.metrics.write_prometheus(suite._output_path("metrics.prom"))
+                suite.close()
+                console.print("[success]Session ended successfully.")
+                break
+                
+            elif user_input.lower() in ["help", "h", "?"]:
+                help_text = """
             # Available Commands
             
             ## Basic Commands
             - `models` or `list`: List available models
+            - `models refresh`: Re-query the Ollama hosts for their models
             - `stats`: Show session statistics
+            - `hosts`: Show load balancing and health of the Ollama hosts
+            - `metrics export [path]`: Write latency/throughput metrics in Prometheus text format
+            - `metrics serve [port]`: Serve the metrics at http://127.0.0.1:<port>/metrics
             - `stream`: Toggle streaming mode (currently: {})
             - `model <name>`: Change the default model
+            - `cache`: Toggle the response cache (currently: {})
+            - `cache clear`: Empty the response cache
+            - `memory`: Toggle recalling relevant earlier turns by embedding similarity (currently: {})
+            - `route`: Toggle answering simple keyword questions with the Project 1 chatbot before the LLM (currently: {})
+            - `slo [hedge-model] [deadline]`: Toggle per-command timeouts and token caps; with a model, requests without a first token after the deadline (default 2 s) are hedged to it (currently: {})
+            - `slo limit <chat|code|summarize> <timeout> [max-tokens]`: Set a command's hard timeout and token cap
             - `exit` or `quit`: End the session
             
             ## Conversation Management
             - `clear`: Clear conversation history
             - `save`: Save conversation to markdown file
+            - `save json`: Save conversation to a JSON file
+            - `compact [n]`: Compact the history file, optionally keeping only the last n turns
+            - `archive`: Toggle saving outputs to one JSONL archive per session instead of separate files (currently: {})
+            - `prefix`: Toggle stable prompt prefixes for server-side prompt caching (currently: {})
+            - `rolling`: Toggle rolling summaries of turns that no longer fit the context (currently: {})
             
             ## Project 2 Features
             - `code <language>`: Generate code (default: Python)
             - `summarize`: Summarize a document (will prompt for text)
+            - `summarize <path>`: Summarize a text file of any length
             
             Any other input will be treated as a prompt for the model.
-            """.format("ON" if suite.stream_mode else "OFF")
-            console.print(Markdown(help_text))
-            
-        elif user_input.lower() in ["models", "list"]:
-            suite.list_available_models()
-            
-        elif user_input.lower() == "stats":
-            suite.display_session_stats()
+            """.format("ON" if suite.stream_mode else "OFF", "ON" if suite.response_cache is not None else "OFF",
+                           "ON" if suite.semantic_memory is not None else "OFF",
+                           "ON" if suite.router is not None else "OFF",
+                           "ON" if suite.latency_slo is not None else "OFF",
+                           "ON" if suite.artifacts.archive else "OFF",
+                           "ON" if suite.context_window.stable_prefix else "OFF",
+                           "ON" if suite.context_window.summarizer else "OFF")
+                console.print(Markdown(help_text))
+                
+            elif user_input.lower() in ["models", "list"]:
+                suite.list_available_models()
+                
+            elif user_input.lower() == "models refresh":
+                suite.list_available_models(refresh=True)
+                
+            elif user_input.lower() == "stats":
+                suite.display_session_stats()
+                
+            elif user_input.lower() == "hosts":
+                suite.display_host_stats()
+                
+            elif user_input.lower().startswith("metrics"):
+                parts = user_input.split()
+                if len(parts) >= 2 and parts[1] == "export":
+                    path = parts[2] if len(parts) > 2 else suite._output_path("metrics.prom")
+                    suite.metrics.write_prometheus(path)
+                    console.print(f"[success]Metrics written to {path}")
+                elif len(parts) >= 2 and parts[1] == "serve":
+                    port = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 9464
+                    try:
+                        host, port = suite.metrics.serve(port)
+                        console.print(f"[success]Serving metrics at http://{host}:{port}/metrics")
+                    except OSError as e:
+                        console.print(f"[error]Could not start metrics endpoint: {str(e)}")
+                else:
+                    suite.display_latency_stats()
+                
+            elif user_input.lower() == "stream":
+                suite.stream_mode = not suite.stream_mode
+                console.print(f"[success]Streaming mode {'enabled' if suite.stream_mode else 'disabled'}")
+                
+            elif user_input.lower() == "cache":
+                if suite.response_cache is None:
+                    suite.enable_response_cache()
+                    console.print("[success]Response cache enabled")
+                else:
+                    suite.disable_response_cache()
+                    console.print("[success]Response cache disabled")
             
-        elif user_input.lower() == "stream":
-            suite.stream_mode = not suite.stream_mode
-            console.print(f"[success]Streaming mode {'enabled' if suite.stream_mode else 'disabled'}")
+            elif user_input.lower() == "memory":
+                if suite.semantic_memory is None:
+                    suite.enable_semantic_memory()
+                    console.print("[success]Semantic memory enabled: relevant earlier turns are recalled for each prompt")
+                else:
+                    suite.disable_semantic_memory()
+                    console.print("[success]Semantic memory disabled")
             
-        elif user_input.lower().startswith("model "):
-            new_model = user_input[6:].strip()
-            suite.default_model = new_model
-            console.print(f"[success]Model changed to: [bold]{new_model}[/bold]")
+            elif user_input.lower() == "route":
+                if suite.router is None:
+                    suite.enable_routing()
+                    console.print("[success]Hybrid routing enabled: keyword questions are answered without the LLM")
+                else:
+                    suite.disable_routing()
+                    console.print("[success]Hybrid routing disabled")
             
-        elif user_input.lower() == "clear":
-            suite.clear_conversation_history()
+            elif user_input.lower().startswith("slo limit"):
+                parts = user_input.split()
+                try:
+                    timeout = float(parts[3])
+                    max_tokens = int(parts[4]) if len(parts) > 4 else None
+                except (IndexError, ValueError):
+                    console.print("[warning]Usage: slo limit <chat|code|summarize> <timeout seconds> [max tokens]")
+                    continue
+                slo = suite.latency_slo or suite.enable_latency_slo()
+                slo.set_limit(parts[2].lower(), timeout or None, max_tokens)
+                console.print(f"[success]{parts[2].lower()}: timeout {timeout:g} s, "
+                              f"max tokens {max_tokens if max_tokens else 'unlimited'}")
             
-        elif user_input.lower() == "save":
-            suite.save_conversation_to_markdown()
-        
-        elif user_input.lower().startswith("code"):
-            # Extract language if specified
-            parts = user_input.split(maxsplit=1)
-            language = "python"  # Default language
+            elif user_input.lower() == "slo" or user_input.lower().startswith("slo "):
+                parts = user_input.split()
+                if len(parts) == 1 and suite.latency_slo is not None:
+                    suite.disable_latency_slo()
+                    console.print("[success]Latency SLO mode disabled")
+                    continue
+                try:
+                    deadline = float(parts[2]) if len(parts) > 2 else 2.0
+                except ValueError:
+                    console.print("[warning]Usage: slo [hedge model] [deadline seconds]")
+                    continue
+                hedge_model = parts[1] if len(parts) > 1 else None
+                suite.enable_latency_slo(hedge_model, deadline)
+                if hedge_model:
+                    console.print(f"[success]Latency SLO mode enabled: requests without a first token after "
+                                  f"{deadline:.1f} s are hedged to {hedge_model}")
+                else:
+                    console.print("[success]Latency SLO mode enabled: per-command timeouts and token caps apply")
             
-            if len(parts) > 1 and not parts[1].startswith("generate") and len(parts[1]) < 20:
-                language = parts[1].strip()
-                console.print(f"[info]Code generation language set to: {language}")
-                code_prompt = console.input("[prompt]Enter code generation requirements: [/prompt]")
-            else:
-                code_prompt = console.input("[prompt]Enter Python code generation requirements: [/prompt]")
+            elif user_input.lower() == "cache clear":
+                if suite.response_cache is not None:
+                    suite.response_cache.clear()
+                console.print("[success]Response cache cleared")
+                
+            elif user_input.lower().startswith("model "):
+                new_model = user_input[6:].strip()
+                if suite.set_default_model(new_model):
+                    console.print(f"[success]Model changed to: [bold]{new_model}[/bold]")
+                
+            elif user_input.lower() == "archive":
+                suite.artifacts.archive = not suite.artifacts.archive
+                if suite.artifacts.archive:
+                    console.print(f"[success]Outputs will be archived to {suite.artifacts.archive_path}")
+                else:
+                    console.print("[success]Outputs will be saved as separate files")
+                
+            elif user_input.lower() == "prefix":
+                suite.context_window.stable_prefix = not suite.context_window.stable_prefix
+                console.print(f"[success]Stable prompt prefixes {'enabled' if suite.context_window.stable_prefix else 'disabled'}")
+                
+            elif user_input.lower() == "rolling":
+                enabled = suite.context_window.summarizer is None
+                suite.enable_rolling_summaries(enabled)
+                console.print(f"[success]Rolling conversation summaries {'enabled' if enabled else 'disabled'}")
+                
+            elif user_input.lower() == "clear":
+                suite.clear_conversation_history()
+                
+            elif user_input.lower() == "save":
+                suite.save_conversation_to_markdown()
             
-            response = suite.code_generation(code_prompt, language)
-            suite.format_response(response)
+            elif user_input.lower() == "save json":
+                suite.save_conversation_to_json()
             
-        elif user_input.lower() == "summarize":
-            console.print("[info]Enter or paste the text to summarize (type 'END' on a new line when finished):")
-            lines = []
-            while True:
-                line = input()
-                if line.strip() == "END":
-                    break
-                lines.append(line)
+            elif user_input.lower().startswith("compact"):
+                parts = user_input.split()
+                if len(parts) > 1 and not parts[1].isdigit():
+                    console.print("[warning]Usage: compact [number of turns to keep]")
+                    continue
+                suite.compact_conversation_history(int(parts[1]) if len(parts) > 1 else None)
             
-            text_to_summarize = "\n".join(lines)
-            if len(text_to_summarize) < 50:
-                console.print("[warning]Text too short to summarize meaningfully")
-                continue
+            elif user_input.lower().startswith("code"):
+                # Extract language if specified
+                parts = user_input.split(maxsplit=1)
+                language = "python"  # Default language
                 
-            response = suite.document_summarization(text_to_summarize)
-            suite.format_response(response)
-            
-        elif user_input.strip():
-            # Process as a normal prompt
-            response = suite.generate_response(user_input)
-            suite.format_response(response)
-            
-        else:
-            # Empty input
-            console.print("[warning]Please enter a command or prompt.")
+                if len(parts) > 1 and not parts[1].startswith("generate") and len(parts[1]) < 20:
+                    language = parts[1].strip()
+                    console.print(f"[info]Code generation language set to: {language}")
+                    code_prompt = console.input("[prompt]Enter code generation requirements: [/prompt]")
+                else:
+                    code_prompt = console.input("[prompt]Enter Python code generation requirements: [/prompt]")
+                
+                response = suite.code_generation(code_prompt, language)
+                suite.format_response(response)
+                
+            elif user_input.lower().startswith("summarize "):
+                path = user_input[len("summarize "):].strip()
+                response = suite.summarize_file(path)
+                suite.format_response(response)
+                if "chunks" in response:
+                    console.print(f"Chunks: {response['chunks']} | Reduce passes: {response['reduce_levels']}", style="metrics")
+                
+            elif user_input.lower() == "summarize":
+                console.print("[info]Enter or paste the text to summarize (type 'END' on a new line when finished):")
+                lines = []
+                while True:
+                    line = input()
+                    if line.strip() == "END":
+                        break
+                    lines.append(line)
+                
+                text_to_summarize = "\n".join(lines)
+                if len(text_to_summarize) < 50:
+                    console.print("[warning]Text too short to summarize meaningfully")
+                    continue
+                    
+                response = suite.document_summarization(text_to_summarize)
+                suite.format_response(response)
+                
+            elif user_input.strip():
+                # Process as a normal prompt
+                response = suite.ask(user_input)
+                suite.format_response(response)
+                
+            else:
+                # Empty input
+                console.print("[warning]Please enter a command or prompt.")
+    finally:
+        suite.close()
 
 
 if __name__ == "__main__":
@@ -572,7 +1357,6 @@ if __name__ == "__main__":
             from rich.console import Console
             from rich.panel import Panel
             from rich.markdown import Markdown
-            from rich.progress import Progress, SpinnerColumn, TextColumn
             from rich.table import Table
             from rich.theme import Theme
         
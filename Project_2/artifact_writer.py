@@ -0,0 +1,192 @@
+"""
+Artifact Writer
+---------------------------------------------------------
+Writes the suite's output artifacts (saved responses, generated code) on a
+background thread so file I/O stays off the request path. Writes are queued
+and handled in batches, file names combine the timestamp with a per-session
+counter so fast or concurrent calls never overwrite each other, and
+artifacts can optionally be appended to a single JSONL archive per session
+instead of being written as many small files. Pending writes are drained on
+close() and at interpreter exit, including after a KeyboardInterrupt.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+
+_STOP = object()
+
+
+class ArtifactWriter:
+    """Queue-backed writer of output files and an optional per-session JSONL archive."""
+
+    def __init__(self, output_dir="llm_outputs", archive=False, max_batch=64):
+        """
+        Args:
+            output_dir (str): Directory artifacts are written to (created on first write)
+            archive (bool): Append artifacts to one session JSONL file instead of separate files
+            max_batch (int): Maximum queued writes handled per batch
+        """
+        self.output_dir = output_dir
+        self.archive = archive
+        self.max_batch = max_batch
+        self.session = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.archive_path = os.path.join(output_dir, f"session_{self.session}.jsonl")
+        self.files_written = 0
+        self.records_archived = 0
+        self.bytes_written = 0
+        self.errors = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._closed = False
+        self._dir_ready = False
+
+    def unique_name(self, prefix, extension):
+        """
+        Collision-free file name: timestamp plus a per-session sequence number.
+
+        Returns:
+            str: Path inside the output directory
+        """
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.output_dir, f"{prefix}_{timestamp}_{counter:04d}.{extension}")
+
+    def write(self, path, content):
+        """Queue content to be written to path."""
+        self._submit(("file", path, content))
+
+    def save(self, prefix, extension, content, record=None):
+        """
+        Queue an artifact, as its own file or as a line in the session archive.
+
+        Args:
+            prefix (str): File name prefix, also the record "type" in the archive
+            extension (str): File extension when written as a file
+            content (str): File content
+            record (dict, optional): Structured form of the artifact for the archive
+
+        Returns:
+            str: Where the artifact will end up
+        """
+        if self.archive:
+            entry = {"type": prefix, "timestamp": datetime.now().isoformat()}
+            entry.update(record if record is not None else {"content": content})
+            self._submit(("archive", self.archive_path, entry))
+            return self.archive_path
+        path = self.unique_name(prefix, extension)
+        self.write(path, content)
+        return path
+
+    def _submit(self, item):
+        with self._lock:
+            if not self._closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+                self._queue.put(item)
+                return
+        # Late writes after close() are done synchronously so nothing is lost
+        self._write_batch([item])
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(entry is _STOP for entry in batch)
+            self._write_batch([entry for entry in batch if entry is not _STOP])
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        """Write a batch: separate files individually, archive records with one append."""
+        if not batch:
+            return
+        if not self._dir_ready:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._dir_ready = True
+
+        records = []
+        for kind, path, payload in batch:
+            if kind == "archive":
+                records.append(json.dumps(payload, ensure_ascii=False, default=str) + "\n")
+                continue
+            try:
+                self._write_new_file(path, payload)
+                self.files_written += 1
+                self.bytes_written += len(payload)
+            except OSError as e:
+                self.errors += 1
+                logging.warning(f"Could not write {path}: {str(e)}")
+
+        if records:
+            data = "".join(records)
+            try:
+                with open(self.archive_path, "a", encoding="utf-8") as f:
+                    f.write(data)
+                self.records_archived += len(records)
+                self.bytes_written += len(data)
+            except OSError as e:
+                self.errors += 1
+                logging.warning(f"Could not append to {self.archive_path}: {str(e)}")
+
+    @staticmethod
+    def _write_new_file(path, content):
+        """Create path exclusively, adding a suffix if another process already took the name."""
+        base, extension = os.path.splitext(path)
+        attempt = 0
+        while True:
+            try:
+                with open(path, "x", encoding="utf-8") as f:
+                    f.write(content)
+                return path
+            except FileExistsError:
+                attempt += 1
+                path = f"{base}-{attempt}{extension}"
+
+    @property
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def flush(self):
+        """Block until every queued write has been done."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Drain pending writes and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+            atexit.unregister(self.close)
+
+    def stats(self):
+        """Counters of written artifacts."""
+        return {
+            "files": self.files_written,
+            "archived": self.records_archived,
+            "bytes": self.bytes_written,
+            "pending": self.pending,
+            "errors": self.errors,
+        }
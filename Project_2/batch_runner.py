@@ -0,0 +1,270 @@
+"""
+Batch Prompt Runner
+---------------------------------------------------------
+Offline batch mode for the interaction suite. Prompts are streamed from a
+JSONL or CSV file, dispatched over a bounded worker pool, and results are
+appended to a JSONL sink as they complete. The sink doubles as the
+checkpoint: re-running the same command skips every ID that already has a
+successful result, so an interrupted run resumes without redoing work.
+
+Input records may contain:
+    id            Unique identifier (defaults to the record's line number)
+    prompt        Prompt text (or "text" for summarization)
+    task          "chat" (default), "code" or "summarize"
+    language      Language for code tasks (default: python)
+    model         Model override for chat tasks
+    system_prompt System prompt for chat tasks
+"""
+
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.table import Table
+
+from Ollama_elite import OllamaInteractionSuite, console
+
+TASKS = ("chat", "code", "summarize")
+
+
+def read_prompts(path):
+    """
+    Stream prompt records from a JSONL or CSV file without loading it whole.
+
+    Args:
+        path (str): Input file; .csv files are read as CSV, anything else as JSONL
+
+    Yields:
+        dict: Prompt record with at least "id" and "prompt" keys
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = csv.DictReader(f) if path.lower().endswith(".csv") else f
+
+        for line_number, row in enumerate(rows, start=1):
+            if isinstance(row, str):
+                if not row.strip():
+                    continue
+                try:
+                    row = json.loads(row)
+                except ValueError as e:
+                    logging.warning(f"Skipping record {line_number} in {path}: invalid JSON ({str(e)})")
+                    continue
+            if not isinstance(row, dict):
+                logging.warning(f"Skipping record {line_number} in {path}: not a JSON object")
+                continue
+            if not row:
+                continue
+            prompt = row.get("prompt") or row.get("text")
+            if not prompt:
+                logging.warning(f"Skipping record {line_number} in {path}: no prompt")
+                continue
+            record = {k: v for k, v in row.items() if v not in (None, "")}
+            record["id"] = str(row.get("id") or line_number)
+            record["prompt"] = prompt
+            yield record
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class BatchRunner:
+    """Run a file of prompts through the suite with a bounded worker pool."""
+
+    def __init__(self, suite, output_path, workers=4, fsync_every=64):
+        """
+        Args:
+            suite (OllamaInteractionSuite): Suite used to answer each prompt
+            output_path (str): JSONL sink for results, also used as the resume checkpoint
+            workers (int): Number of prompts processed concurrently
+            fsync_every (int): Force results to disk after this many records
+        """
+        self.suite = suite
+        self.output_path = output_path
+        self.workers = max(1, workers)
+        self.fsync_every = fsync_every
+        self._sink_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.latencies = []
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.tokens = 0
+        self.wall_time = 0.0
+
+    def completed_ids(self):
+        """IDs that already have a successful result in the output sink."""
+        done = set()
+        if not os.path.exists(self.output_path):
+            return done
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn line from an interrupted run
+                if "error" in record:
+                    done.discard(record.get("id"))
+                else:
+                    done.add(record.get("id"))
+        return done
+
+    def run(self, input_path):
+        """
+        Process every pending prompt in the input file.
+
+        Args:
+            input_path (str): JSONL or CSV file of prompts
+
+        Returns:
+            dict: Summary report (see report())
+        """
+        self._reset_stats()
+        done = self.completed_ids()
+        # At most this many prompts are read ahead of the workers
+        slots = threading.BoundedSemaphore(self.workers * 2)
+        start = time.perf_counter()
+
+        sink = open(self.output_path, "a", encoding="utf-8")
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for record in read_prompts(input_path):
+                if record["id"] in done:
+                    self.skipped += 1
+                    continue
+                slots.acquire()
+                future = executor.submit(self._process, record, sink)
+                future.add_done_callback(lambda _: slots.release())
+        except KeyboardInterrupt:
+            console.print("\n[warning]Interrupted - waiting for in-flight prompts; rerun to resume")
+            executor.shutdown(wait=True, cancel_futures=True)
+        finally:
+            # Workers write to the sink, so they must be done before it is closed
+            executor.shutdown(wait=True)
+            self.wall_time = time.perf_counter() - start
+            with self._sink_lock:
+                sink.flush()
+                os.fsync(sink.fileno())
+                sink.close()
+
+        return self.report()
+
+    def _process(self, record, sink):
+        """Answer one prompt and append its result to the sink."""
+        task = record.get("task", "chat").lower()
+        started = time.perf_counter()
+        try:
+            if task == "code":
+                response = self.suite.code_generation(record["prompt"], record.get("language", "python"),
+                                                      use_history=False)
+            elif task == "summarize":
+                response = self.suite.document_summarization(record["prompt"], use_history=False)
+            elif task == "chat":
+                response = self.suite.generate_response(record["prompt"], model_name=record.get("model"),
+                                                        stream=False, system_prompt=record.get("system_prompt"),
+                                                        use_history=False)
+            else:
+                response = {"error": f"Unknown task '{task}', expected one of {', '.join(TASKS)}"}
+        except Exception as e:
+            response = {"error": f"Error processing prompt: {str(e)}"}
+        latency = time.perf_counter() - started
+
+        result = {"id": record["id"], "task": task, "latency": round(latency, 4)}
+        if "error" in response:
+            result["error"] = response["error"]
+        else:
+            result["model"] = response.get("model")
+            result["response"] = response.get("message", {}).get("content", "")
+            for key in ("eval_count", "prompt_eval_count", "total_duration"):
+                if key in response:
+                    result[key] = response[key]
+
+        line = json.dumps(result, ensure_ascii=False) + "\n"
+        with self._sink_lock:
+            sink.write(line)
+            sink.flush()
+        with self._stats_lock:
+            if "error" in result:
+                self.failed += 1
+            else:
+                self.completed += 1
+                self.latencies.append(latency)
+                self.tokens += result.get("eval_count") or 0
+            if self.fsync_every and (self.completed + self.failed) % self.fsync_every == 0:
+                with self._sink_lock:
+                    os.fsync(sink.fileno())
+
+    def report(self):
+        """Throughput and latency summary of the last run."""
+        latencies = sorted(self.latencies)
+        processed = self.completed + self.failed
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "wall_time": self.wall_time,
+            "throughput": processed / self.wall_time if self.wall_time else 0.0,
+            "tokens_per_second": self.tokens / self.wall_time if self.wall_time else 0.0,
+            "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+            "latency_p99": _percentile(latencies, 99),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+    def display_report(self, report=None):
+        """Display the run summary in a formatted table."""
+        report = report or self.report()
+        table = Table(title="Batch Run Summary")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="green")
+
+        table.add_row("Completed", str(report["completed"]))
+        table.add_row("Failed", str(report["failed"]))
+        table.add_row("Skipped (already done)", str(report["skipped"]))
+        table.add_row("Wall Time", f"{report['wall_time']:.2f} seconds")
+        table.add_row("Throughput", f"{report['throughput']:.2f} prompts/second")
+        table.add_row("Generation Rate", f"{report['tokens_per_second']:.1f} tokens/second")
+        table.add_row("Latency (mean)", f"{report['latency_mean']:.3f} seconds")
+        table.add_row("Latency (p50 / p95 / p99)",
+                      f"{report['latency_p50']:.3f} / {report['latency_p95']:.3f} / {report['latency_p99']:.3f} seconds")
+        table.add_row("Latency (max)", f"{report['latency_max']:.3f} seconds")
+
+        console.print(table)
+
+
+def main():
+    """Command-line entry point for batch runs."""
+    parser = argparse.ArgumentParser(description="Run a JSONL/CSV file of prompts through Ollama")
+    parser.add_argument("input", help="JSONL or CSV file of prompts")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL results file (also the resume checkpoint)")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Prompts processed concurrently")
+    parser.add_argument("-m", "--model", default="llama3.2", help="Default model")
+    args = parser.parse_args()
+
+    suite = OllamaInteractionSuite(default_model=args.model)
+    suite.quiet = True
+    suite.warm_up(background=False)
+    try:
+        runner = BatchRunner(suite, args.output, workers=args.workers)
+        report = runner.run(args.input)
+        runner.display_report(report)
+    finally:
+        suite.close()
+
+
+if __name__ == "__main__":
+    main()
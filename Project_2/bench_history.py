@@ -0,0 +1,172 @@
+"""
+Conversation History Benchmark
+---------------------------------------------------------
+Measures the memory the in-memory conversation model needs per 10k turns
+and the cost of exporting a long history. Three models are compared on the
+same turn contents:
+
+    dicts       the previous list of {"role", "content", "timestamp" (ISO string), "tokens"} dicts
+    records     every turn as a __slots__ Turn with an interned role and an epoch timestamp
+    turn store  a TurnStore keeping a bounded window in memory, the rest in the history file
+
+Memory is traced with tracemalloc and reported with and without the turn
+contents; exports write the whole history to Markdown and JSON.
+
+    python bench_history.py -n 10000 --window 50
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from history_store import HistoryStore
+from turn_store import Turn, TurnStore
+
+WORDS = ["loop", "model", "token", "context", "python", "answer", "question", "stream", "memory", "history",
+         "server", "prompt", "summary", "window", "cache", "latency", "request", "the", "a", "of", "and", "to"]
+
+
+def make_contents(count, seed=0):
+    """Distinct turn texts of 10 to 60 words."""
+    rng = random.Random(seed)
+    return [f"{i}: " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 60))) for i in range(count)]
+
+
+def _traced(build):
+    """Bytes still allocated after build() and the peak while it ran; the result is kept alive until then."""
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def _roles(count):
+    # Built from parts so the dict model does not get interned constants for free
+    return ["".join(["us", "er"]) if i % 2 == 0 else "".join(["assis", "tant"]) for i in range(count)]
+
+
+def bench_memory(contents, window, path):
+    """
+    Memory of each model holding len(contents) turns.
+
+    Returns:
+        dict: Model -> {"bytes", "peak_bytes", "bytes_per_turn"}; the contents themselves are allocated
+        beforehand, so these are the per-turn overheads of the model (the turn store's figure includes
+        the window's share of contents that are copies read back from disk)
+    """
+    count = len(contents)
+    roles = _roles(count)
+    results = {}
+
+    def dicts():
+        return [{"role": roles[i], "content": contents[i], "timestamp": datetime.now().isoformat(), "tokens": 42}
+                for i in range(count)]
+
+    def records():
+        return [Turn(roles[i], contents[i], tokens=42) for i in range(count)]
+
+    store = HistoryStore(path, fsync_every=0, fsync_interval=3600)
+    turns = TurnStore(store, window)
+
+    def turn_store():
+        for i in range(count):
+            turns.append(Turn(roles[i], contents[i], tokens=42))
+        # The window as a fresh session sees it: read back from the history file
+        return turns.load()
+
+    for name, build in (("dicts", dicts), ("records", records), ("turn store", turn_store)):
+        current, peak = _traced(build)
+        results[name] = {"bytes": current, "peak_bytes": peak, "bytes_per_turn": current / count}
+    store.close()
+    return results
+
+
+def bench_export(store, legacy_store):
+    """
+    Seconds and peak traced memory to export the whole history, per format.
+
+    The streamed exports read the current format (epoch timestamps) from store, the
+    previous export paths read legacy_store (ISO timestamps) holding the same turns.
+    """
+    turns = TurnStore(store)
+    results = {}
+
+    def old_markdown(f):
+        # The previous export: re-parse every ISO timestamp
+        for record in legacy_store.iter_turns():
+            timestamp = record.get("timestamp", "Unknown time")
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"## {record['role'].title()} ({timestamp})\n\n{record['content']}\n\n---\n\n")
+
+    def old_json(f):
+        json.dump(list(legacy_store.iter_turns()), f, ensure_ascii=False, indent=2)
+
+    for name, export in (("markdown (streamed)", lambda f: turns.export_markdown(f, "Benchmark")),
+                         ("json (streamed)", turns.export_json),
+                         ("markdown (ISO re-parse)", old_markdown),
+                         ("json (json.dump of a list)", old_json)):
+        with open(os.devnull, "w", encoding="utf-8") as f:
+            start = time.perf_counter()
+            export(f)
+            seconds = time.perf_counter() - start
+            # Traced separately, tracemalloc slows allocation-heavy code down several times
+            _, peak = _traced(lambda: export(f))
+        results[name] = {"seconds": seconds, "peak_bytes": peak}
+    return results
+
+
+def write_legacy_history(path, contents):
+    """History file in the previous format (ISO timestamps) for the old export paths."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i, content in enumerate(contents):
+            f.write(json.dumps({"role": "user" if i % 2 == 0 else "assistant", "content": content,
+                                "timestamp": datetime.now().isoformat(), "tokens": 42}) + "\n")
+
+
+def run_benchmarks(count=10000, window=50):
+    """Memory per model and export costs for count turns."""
+    contents = make_contents(count)
+    workdir = tempfile.mkdtemp(prefix="history_bench_")
+    path = os.path.join(workdir, "history.jsonl")
+    memory = bench_memory(contents, window, path)
+    legacy_path = os.path.join(workdir, "legacy.jsonl")
+    write_legacy_history(legacy_path, contents)
+    export = bench_export(HistoryStore(path), HistoryStore(legacy_path))
+    shutil.rmtree(workdir, ignore_errors=True)
+    content_bytes = sum(len(content.encode("utf-8")) for content in contents)
+    return {"turns": count, "window": window, "content_bytes": content_bytes, "memory": memory, "export": export}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark conversation history memory and export")
+    parser.add_argument("-n", "--turns", type=int, default=10000, help="Turns in the history")
+    parser.add_argument("--window", type=int, default=50, help="Turns the turn store keeps in memory")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.turns, args.window)
+    per_10k = 10000 / results["turns"]
+    print(f"{results['turns']} turns, {results['content_bytes'] / 1024:.0f} KiB of content, window {results['window']}")
+    print(f"{'Model':<14}{'KiB per 10k turns':>19}{'Bytes per turn':>16}{'Peak KiB':>10}")
+    for name, r in results["memory"].items():
+        print(f"{name:<14}{r['bytes'] * per_10k / 1024:>19,.0f}{r['bytes_per_turn']:>16.0f}{r['peak_bytes'] / 1024:>10,.0f}")
+    print(f"\n{'Export':<28}{'Seconds':>9}{'Peak KiB':>10}")
+    for name, r in results["export"].items():
+        print(f"{name:<28}{r['seconds']:>9.3f}{r['peak_bytes'] / 1024:>10,.0f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
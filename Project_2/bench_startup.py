@@ -0,0 +1,177 @@
+"""
+Start-up Benchmark
+---------------------------------------------------------
+Tracks the cold-start latency of the suite's entry points. Every scenario is
+run in a fresh interpreter: import cost is taken from Python's
+-X importtime report, wall time from the subprocess itself, and the
+end-to-end scenarios send a prompt to a local mock Ollama server. Results use
+the same JSON baseline format as bench_suite.py:
+
+    python bench_startup.py --save-baseline startup_baseline.json
+    python bench_startup.py --baseline startup_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_suite import BASELINE_VERSION, compare, display_regressions
+from mock_ollama_server import MockOllamaServer
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LOWER_IS_BETTER = ("import_ms", "wall_ms", "modules")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Scenario name -> (interpreter arguments, stdin text)
+SCENARIOS = {
+    "import Ollama_elite": (["-c", "import Ollama_elite"], None),
+    "import ollama_oneshot": (["-c", "import ollama_oneshot"], None),
+    "import ollama": (["-c", "import ollama"], None),
+    "suite startup (lazy)": (["-c", "import Ollama_elite; Ollama_elite.OllamaInteractionSuite(lazy=True)"], None),
+    "suite startup": (["-c", "import Ollama_elite; Ollama_elite.OllamaInteractionSuite()"], None),
+    "oneshot prompt": ([os.path.join(PROJECT_DIR, "ollama_oneshot.py"), "Say hello"], None),
+    "Ollama_prj prompt": ([os.path.join(PROJECT_DIR, "Ollama_prj.py")], "Say hello\n"),
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse a -X importtime report.
+
+    Returns:
+        dict: module -> (self microseconds, cumulative microseconds, nesting depth)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules[name] = (int(own), int(cumulative), len(indent) // 2)
+    return modules
+
+
+def run_scenario(args, stdin, env, cwd):
+    """Run one scenario in a fresh interpreter; returns (wall seconds, importtime report)."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], input=stdin, capture_output=True,
+                            text=True, env=env, cwd=cwd, timeout=120)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {result.returncode}: {result.stderr[-500:]}")
+    return wall, parse_importtime(result.stderr)
+
+
+def run_benchmarks(repeat=5, scenarios=None, top=8):
+    """
+    Run every scenario repeat times against a mock server.
+
+    Args:
+        repeat (int): Runs per scenario (medians are reported)
+        scenarios (list, optional): Names of scenarios to run, all if omitted
+        top (int): Slowest top-level imports to list per scenario
+
+    Returns:
+        dict: Benchmark results in the baseline format
+    """
+    server = MockOllamaServer(tokens_per_second=0, first_token_latency=0, reply="Hello!").start()
+    env = dict(os.environ, OLLAMA_HOST=server.url, PYTHONPATH=PROJECT_DIR)
+    env.pop("OLLAMA_HOSTS", None)
+    workdir = tempfile.mkdtemp(prefix="ollama_startup_")
+    results = {}
+    try:
+        for name, (args, stdin) in SCENARIOS.items():
+            if scenarios and name not in scenarios:
+                continue
+            walls, imports, reports = [], [], []
+            for _ in range(repeat):
+                wall, report = run_scenario(args, stdin, env, workdir)
+                walls.append(wall)
+                # Total import time is the sum of the top-level (depth 0) imports
+                imports.append(sum(cumulative for _, cumulative, depth in report.values() if depth == 0))
+                reports.append(report)
+            slowest = sorted(((module, cumulative) for module, (_, cumulative, depth) in reports[-1].items()
+                              if depth == 0), key=lambda item: item[1], reverse=True)[:top]
+            results[name] = {
+                "runs": repeat,
+                "wall_ms": statistics.median(walls) * 1000,
+                "import_ms": statistics.median(imports) / 1000,
+                "modules": len(reports[-1]),
+                "slowest_imports": {module: cumulative / 1000 for module, cumulative in slowest},
+            }
+    finally:
+        server.stop()
+
+    return {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "settings": {"repeat": repeat},
+        "workloads": results,
+    }
+
+
+def display_results(results, regressions=(), show_imports=False):
+    """Display start-up timings (and regressions) as tables."""
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Start-up Benchmark (medians)")
+    table.add_column("Scenario", style="cyan")
+    table.add_column("Wall (ms)", style="green", justify="right")
+    table.add_column("Imports (ms)", style="yellow", justify="right")
+    table.add_column("Modules", style="magenta", justify="right")
+    table.add_column("Slowest imports (ms)", style="dim")
+    for name, r in results["workloads"].items():
+        slowest = ", ".join(f"{module} {ms:.0f}" for module, ms in list(r["slowest_imports"].items())[:3])
+        table.add_row(name, f"{r['wall_ms']:.1f}", f"{r['import_ms']:.1f}", str(r["modules"]), slowest)
+    console.print(table)
+
+    if show_imports:
+        for name, r in results["workloads"].items():
+            table = Table(title=f"Top-level imports: {name}")
+            table.add_column("Module", style="cyan")
+            table.add_column("Cumulative (ms)", style="green", justify="right")
+            for module, ms in r["slowest_imports"].items():
+                table.add_row(module, f"{ms:.1f}")
+            console.print(table)
+    display_regressions(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold-start latency of the Ollama suite entry points")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Runs per scenario")
+    parser.add_argument("-s", "--scenario", action="append", help="Only run this scenario (repeatable)")
+    parser.add_argument("--imports", action="store_true", help="Show the slowest top-level imports per scenario")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.repeat, args.scenario)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, LOWER_IS_BETTER)
+    display_results(results, regressions, args.imports)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Client-Side Benchmark Suite
+---------------------------------------------------------
+Measures the overhead of OllamaInteractionSuite itself - rendering, history
+persistence, file output and message construction - against a local mock
+Ollama server, so regressions can be caught without a GPU or a real model.
+
+Each workload drives the suite through a scripted sequence of calls and
+reports throughput, client-side latency percentiles, client overhead (wall
+time not spent in the mock server) and peak Python memory. Results can be
+saved as a JSON baseline and later runs compared against it:
+
+    python bench_suite.py --save-baseline bench_baseline.json
+    python bench_suite.py --baseline bench_baseline.json --tolerance 0.25
+"""
+
+import argparse
+import io
+import json
+import logging
+import math
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from mock_ollama_server import MockOllamaServer
+
+BASELINE_VERSION = 1
+
+# Metrics where a larger value is a regression (everything else: smaller is worse)
+LOWER_IS_BETTER = ("latency_p50", "latency_p95", "overhead_p50", "overhead_p95", "peak_memory_kb")
+
+CODE_REPLY = (
+    "Here is the implementation:\n\n```python\ndef fibonacci(n):\n    a, b = 0, 1\n"
+    "    for _ in range(n):\n        a, b = b, a + b\n    return a\n```\n\n"
+    "Call `fibonacci(10)` to get 55."
+)
+
+DOCUMENT = "\n\n".join(
+    f"Section {i}. " + " ".join(f"Sentence {j} of section {i} describes the benchmark document." for j in range(12))
+    for i in range(40)
+)
+
+
+def _reply(messages):
+    """Mock reply: a fenced code block for code generation prompts, filler otherwise."""
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    if "developer" in system:
+        return CODE_REPLY
+    return " ".join(["Benchmark reply token"] * 20)
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def _workloads(iterations):
+    """Scripted workloads: name -> (number of calls, callable(suite, i))."""
+    return {
+        "chat": (iterations, lambda suite, i: suite.generate_response(f"Benchmark prompt {i}", stream=False)),
+        "chat_stream": (iterations, lambda suite, i: suite.generate_response(f"Streamed prompt {i}", stream=True)),
+        "code_generation": (max(1, iterations // 2), lambda suite, i: suite.code_generation(f"Fibonacci {i}")),
+        "summarization": (max(1, iterations // 10), lambda suite, i: suite.document_summarization(
+            DOCUMENT + f"\n\nRevision {i}.", use_history=False)),
+    }
+
+
+def run_benchmarks(iterations=50, tokens_per_second=0.0, first_token_latency=0.0, workloads=None):
+    """
+    Run every workload against a fresh mock server and suite.
+
+    Args:
+        iterations (int): Calls per chat workload (fewer for heavier workloads)
+        tokens_per_second (float): Mock generation rate, 0 for no pacing (pure client overhead)
+        first_token_latency (float): Mock delay before the first token, in seconds
+        workloads (list, optional): Names of workloads to run, all if omitted
+
+    Returns:
+        dict: Benchmark results in the baseline format
+    """
+    server = MockOllamaServer(tokens_per_second=tokens_per_second, first_token_latency=first_token_latency,
+                              reply=_reply).start()
+    os.environ["OLLAMA_HOST"] = server.url
+    workdir = tempfile.mkdtemp(prefix="ollama_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        # Imported here so the suite's ollama client picks up OLLAMA_HOST
+        import Ollama_elite
+
+        # Per-request INFO logging would dominate the measurement
+        logging.disable(logging.INFO)
+        # Render to an in-memory terminal so rendering cost is measured but not shown
+        Ollama_elite.console.file = io.StringIO()
+        results = {}
+        for name, (calls, action) in _workloads(iterations).items():
+            if workloads and name not in workloads:
+                continue
+            suite = Ollama_elite.OllamaInteractionSuite()
+            suite.warm_up(background=False)
+            results[name] = _run_workload(suite, calls, action)
+            suite.close()
+            Ollama_elite.console.file.seek(0)
+            Ollama_elite.console.file.truncate()
+    finally:
+        logging.disable(logging.NOTSET)
+        os.chdir(cwd)
+        server.stop()
+
+    return {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "settings": {
+            "iterations": iterations,
+            "tokens_per_second": tokens_per_second,
+            "first_token_latency": first_token_latency,
+        },
+        "workloads": results,
+    }
+
+
+def _run_workload(suite, calls, action):
+    """Time one workload and collect latency, overhead and memory figures."""
+    latencies, overheads = [], []
+    errors = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(calls):
+        call_start = time.perf_counter()
+        response = action(suite, i)
+        wall = time.perf_counter() - call_start
+        latencies.append(wall)
+        if "error" in response:
+            errors += 1
+        elif response.get("total_duration"):
+            overheads.append(max(0.0, wall - response["total_duration"] / 1e9))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "errors": errors,
+        "throughput": calls / elapsed if elapsed else 0.0,
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+        "overhead_p50": _percentile(overheads, 50),
+        "overhead_p95": _percentile(overheads, 95),
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def compare(results, baseline, tolerance=0.2, lower_is_better=LOWER_IS_BETTER):
+    """
+    Compare results against a baseline.
+
+    Args:
+        results (dict): Output of run_benchmarks()
+        baseline (dict): Previously saved results
+        tolerance (float): Allowed relative slowdown before a metric counts as a regression
+        lower_is_better (tuple): Metrics where an increase is a regression (a decrease for all others)
+
+    Returns:
+        list: (workload, metric, baseline value, current value, relative change) for each regression
+    """
+    regressions = []
+    for name, current in results["workloads"].items():
+        previous = baseline.get("workloads", {}).get(name)
+        if not previous:
+            continue
+        for metric, base_value in previous.items():
+            if metric in ("calls", "errors", "runs") or not isinstance(base_value, (int, float)) \
+                    or metric not in current or not base_value:
+                continue
+            change = (current[metric] - base_value) / base_value
+            worse = change > tolerance if metric in lower_is_better else change < -tolerance
+            if worse:
+                regressions.append((name, metric, base_value, current[metric], change))
+    return regressions
+
+
+def display_results(results, regressions=()):
+    """Display benchmark results (and regressions) as tables."""
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title="Client-Side Benchmark")
+    table.add_column("Workload", style="cyan")
+    table.add_column("Calls/s", style="green", justify="right")
+    table.add_column("p50 / p95 latency (ms)", style="green", justify="right")
+    table.add_column("p50 / p95 overhead (ms)", style="yellow", justify="right")
+    table.add_column("Peak memory (KB)", style="magenta", justify="right")
+    table.add_column("Errors", style="red", justify="right")
+    for name, r in results["workloads"].items():
+        table.add_row(
+            name,
+            f"{r['throughput']:.1f}",
+            f"{r['latency_p50'] * 1000:.2f} / {r['latency_p95'] * 1000:.2f}",
+            f"{r['overhead_p50'] * 1000:.2f} / {r['overhead_p95'] * 1000:.2f}",
+            f"{r['peak_memory_kb']:.0f}",
+            str(r["errors"]),
+        )
+    console.print(table)
+    display_regressions(regressions)
+
+
+def display_regressions(regressions):
+    """Display regressions found by compare(), if any."""
+    from rich.console import Console
+    from rich.table import Table
+
+    if not regressions:
+        return
+    table = Table(title="Regressions", style="red")
+    table.add_column("Workload")
+    table.add_column("Metric")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+    for name, metric, base_value, value, change in regressions:
+        table.add_row(name, metric, f"{base_value:.4g}", f"{value:.4g}", f"{change * 100:+.1f}%")
+    Console().print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Ollama suite against a mock server")
+    parser.add_argument("-n", "--iterations", type=int, default=50, help="Calls per chat workload")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Mock generation rate (0 = unpaced)")
+    parser.add_argument("--first-token-latency", type=float, default=0.0, help="Mock first-token delay in seconds")
+    parser.add_argument("-w", "--workload", action="append", help="Only run this workload (repeatable)")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.iterations, args.tokens_per_second, args.first_token_latency, args.workload)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    display_results(results, regressions)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
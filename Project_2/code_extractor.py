@@ -0,0 +1,169 @@
+"""
+Code Extractor
+---------------------------------------------------------
+Incremental parser for fenced Markdown code blocks. Content is fed in as it
+streams from the model; each block is handed to a callback the moment its
+closing fence arrives, so generated files can be written and syntax-checked
+while generation continues. Every block of a response is extracted, whatever
+its language tag, and tags are mapped to canonical language names ("py",
+"python3" -> "python", "c++" -> "cpp", ...).
+"""
+
+import json
+import re
+
+LANGUAGE_ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "py3": "python",
+    "js": "javascript",
+    "node": "javascript",
+    "jsx": "javascript",
+    "ts": "typescript",
+    "tsx": "typescript",
+    "c++": "cpp",
+    "cxx": "cpp",
+    "cc": "cpp",
+    "hpp": "cpp",
+    "h": "c",
+    "c#": "csharp",
+    "cs": "csharp",
+    "golang": "go",
+    "rs": "rust",
+    "rb": "ruby",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+    "console": "bash",
+    "ps1": "powershell",
+    "pwsh": "powershell",
+    "kt": "kotlin",
+    "htm": "html",
+    "mysql": "sql",
+    "postgresql": "sql",
+    "sqlite": "sql",
+}
+
+# Compiled once at import; a fence may be indented by up to three spaces
+OPENING_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})[ \t]*([^\s`]*)")
+CLOSING_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})[ \t]*$")
+
+
+def canonical_language(name):
+    """Canonical lower-case language name for a fence tag or user-given language."""
+    name = (name or "").strip().lower()
+    return LANGUAGE_ALIASES.get(name, name)
+
+
+def check_syntax(code, language):
+    """
+    Syntax-check a code block where a checker is available.
+
+    Returns:
+        tuple: (valid, error); valid is None for languages that are not checked
+    """
+    language = canonical_language(language)
+    try:
+        if language == "python":
+            compile(code, "<generated>", "exec")
+        elif language == "json":
+            json.loads(code)
+        else:
+            return None, None
+    except SyntaxError as e:
+        return False, f"line {e.lineno}: {e.msg}"
+    except ValueError as e:
+        return False, str(e)
+    return True, None
+
+
+class CodeBlockExtractor:
+    """Extracts fenced code blocks from text fed in arbitrary fragments."""
+
+    def __init__(self, default_language=None, on_block=None, check=True):
+        """
+        Args:
+            default_language (str, optional): Language of blocks whose fence has no tag
+            on_block (callable, optional): Called with each block dict as soon as it is complete
+            check (bool): Syntax-check blocks as they complete
+        """
+        self.default_language = canonical_language(default_language)
+        self.on_block = on_block
+        self.check = check
+        self.blocks = []
+        self.received = 0  # Characters fed so far
+        self._partial = ""  # Incomplete last line
+        self._fence = None  # Opening fence of the block being read
+        self._language = None
+        self._lines = []
+
+    def feed(self, chunk):
+        """
+        Consume a fragment of the response.
+
+        Returns:
+            list: Blocks completed by this fragment
+        """
+        if not chunk:
+            return []
+        self.received += len(chunk)
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        completed = []
+        for line in lines:
+            block = self._line(line)
+            if block is not None:
+                completed.append(block)
+        return completed
+
+    def close(self):
+        """
+        Finish the input. A block left open by a truncated response is kept,
+        marked as incomplete.
+
+        Returns:
+            list: Blocks completed by closing
+        """
+        completed = []
+        if self._partial:
+            block = self._line(self._partial)
+            self._partial = ""
+            if block is not None:
+                completed.append(block)
+        if self._fence is not None:
+            completed.append(self._finish(complete=False))
+        return completed
+
+    def _line(self, line):
+        """Process one complete line; returns a block if the line closed one."""
+        line = line.rstrip("\r")
+        if self._fence is None:
+            match = OPENING_FENCE.match(line)
+            if match:
+                self._fence = match.group(1)
+                self._language = canonical_language(match.group(2)) or self.default_language
+                self._lines = []
+            return None
+
+        match = CLOSING_FENCE.match(line)
+        if match and match.group(1)[0] == self._fence[0] and len(match.group(1)) >= len(self._fence):
+            return self._finish()
+        self._lines.append(line)
+        return None
+
+    def _finish(self, complete=True):
+        block = {
+            "index": len(self.blocks),
+            "language": self._language or "text",
+            "code": "\n".join(self._lines),
+            "complete": complete,
+        }
+        if self.check:
+            block["valid"], block["error"] = check_syntax(block["code"], block["language"])
+        self._fence = None
+        self._language = None
+        self._lines = []
+        self.blocks.append(block)
+        if self.on_block is not None:
+            self.on_block(block)
+        return block
@@ -0,0 +1,214 @@
+"""
+Context Window Manager
+---------------------------------------------------------
+Token-budgeted selection of conversation history. Turns are read from the
+TurnStore's in-memory window rather than kept in a second copy, so the
+store's window size bounds the turns considered. Every turn carries a token count
+(the server's eval_count for assistant turns, a calibrated estimate
+otherwise) that is computed once, and the prompt is packed with the most
+recent turns that fit the model's context budget.
+Turns that fall out of the window can optionally be folded into a rolling
+summary that is refreshed in the background and sent in their place.
+
+In stable-prefix mode the window is not re-slid on every request: history is
+only appended to until it no longer fits, at which point the window is
+compacted once. Between compaction points every request starts with the
+same messages, so the server can reuse its cached prompt prefix (KV cache)
+instead of re-evaluating the whole prompt.
+"""
+
+import logging
+import threading
+
+from token_budget import estimate_tokens
+
+# Template overhead per message (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+class ContextWindow:
+    """Packs the recent turns of a TurnStore into a token budget."""
+
+    def __init__(self, turns, reserve_tokens=512, summarizer=None, stable_prefix=False, compact_ratio=0.5):
+        """
+        Args:
+            turns (TurnStore): Recent turns to select from, oldest first
+            reserve_tokens (int): Tokens left free in the context for the model's reply
+            summarizer (callable, optional): summarizer(previous_summary, turns) -> str,
+                enables rolling summaries of turns that no longer fit
+            stable_prefix (bool): Only move the start of the window at compaction points
+            compact_ratio (float): Fraction of the budget the window is shrunk to when compacting
+        """
+        self.turns = turns
+        self.reserve_tokens = reserve_tokens
+        self.summarizer = summarizer
+        self.stable_prefix = stable_prefix
+        self.compact_ratio = compact_ratio
+        self.compactions = 0
+        self.estimate_ratio = 1.0  # Calibrated actual/estimated token ratio
+        self._lock = threading.Lock()
+        self._summary = None  # (text, tokens, last seq covered)
+        self._summary_thread = None
+        self._generation = 0  # Bumped by clear() so stale background summaries are dropped
+        self._window_start = 0  # First turn sent in stable-prefix mode
+        self._prefix_summary = None  # Summary frozen at the last compaction point
+
+    def __len__(self):
+        return len(self.turns)
+
+    def _entries(self):
+        """
+        Snapshot of the turns as (seq, message, tokens), oldest first.
+
+        Turns without a token count (older history records) get their
+        estimate recorded on the turn, so it is only computed once.
+        """
+        entries = []
+        for turn in self.turns:
+            if not turn.tokens:
+                turn.tokens = self.estimate(turn.content)
+            entries.append((turn.seq, {"role": turn.role, "content": turn.content}, turn.tokens))
+        return entries
+
+    def clear(self):
+        """Forget the rolling summary and compaction point, e.g. after the turns were cleared or reloaded."""
+        with self._lock:
+            self._summary = None
+            self._prefix_summary = None
+            self._window_start = 0
+            self._generation += 1
+
+    def estimate(self, text):
+        """Token estimate for text, corrected by the observed calibration ratio."""
+        return int(estimate_tokens(text) * self.estimate_ratio) + MESSAGE_OVERHEAD_TOKENS
+
+    def observe(self, estimated_prompt_tokens, prompt_eval_count):
+        """
+        Calibrate estimates against the prompt size the server reported.
+
+        Counts much smaller than the estimate are ignored: they come from the
+        server reusing a cached prompt prefix and only evaluating the suffix.
+        """
+        if not estimated_prompt_tokens or not prompt_eval_count:
+            return
+        ratio = prompt_eval_count / estimated_prompt_tokens
+        if 0.5 <= ratio <= 2.0:
+            self.estimate_ratio = 0.8 * self.estimate_ratio + 0.2 * (self.estimate_ratio * ratio)
+
+    def select(self, budget):
+        """
+        Pick the most recent turns that fit within budget tokens.
+
+        Args:
+            budget (int): Tokens available for history
+
+        Returns:
+            tuple: (messages oldest first, tokens used)
+        """
+        entries = self._entries()
+        with self._lock:
+            summary = self._prefix_summary if self.stable_prefix else self._summary
+
+        if self.stable_prefix:
+            window, summary = self._stable_window(entries, summary, budget)
+        else:
+            window = []
+            available = budget - self._summary_tokens(summary, budget)
+            used = 0
+            for entry in reversed(entries):
+                if used + entry[2] > available:
+                    break
+                window.append(entry)
+                used += entry[2]
+            window.reverse()
+
+        summary_tokens = self._summary_tokens(summary, budget)
+        selected = [message for _, message, _ in window]
+        used = sum(tokens for _, _, tokens in window)
+        first_seq = window[0][0] if window else None
+
+        # Turns older than the window are represented by the rolling summary
+        evicted = [e for e in entries if first_seq is None or e[0] < first_seq]
+        if evicted and self.summarizer is not None:
+            if summary_tokens:
+                selected.insert(0, {"role": "system", "content": SUMMARY_PREFIX + summary[0]})
+                used += summary_tokens
+            latest = self._summary
+            if latest is None or latest[2] < evicted[-1][0]:
+                self._refresh_summary(latest, evicted)
+        return selected, used
+
+    def _summary_tokens(self, summary, budget):
+        """Tokens set aside for the rolling summary, capped at a quarter of the budget."""
+        if self.summarizer is not None and summary is not None and summary[1] <= budget // 4:
+            return summary[1]
+        return 0
+
+    def _stable_window(self, entries, summary, budget):
+        """
+        Append-only window that is only re-sliced at compaction points.
+
+        Returns:
+            tuple: (window entries, summary to send with them)
+        """
+        window = [entry for entry in entries if entry[0] >= self._window_start]
+        available = budget - self._summary_tokens(summary, budget)
+        used = sum(tokens for _, _, tokens in window)
+        if used <= available:
+            return window, summary
+
+        # Compaction point: drop the oldest turns so the window can grow again for a while
+        target = int(available * self.compact_ratio)
+        while window and used > target:
+            used -= window.pop(0)[2]
+        with self._lock:
+            self._window_start = window[0][0] if window else entries[-1][0] + 1
+            self._prefix_summary = self._summary
+            self.compactions += 1
+            summary = self._prefix_summary
+        return window, summary
+
+    def messages_for(self, model_context, system_prompt, prompt):
+        """
+        Build the history messages for a request.
+
+        Args:
+            model_context (int): The model's context window in tokens
+            system_prompt (str, optional): System prompt that will precede the history
+            prompt (str): The new user prompt
+
+        Returns:
+            tuple: (history messages, estimated prompt tokens including system prompt and prompt)
+        """
+        fixed = self.estimate(prompt) + (self.estimate(system_prompt) if system_prompt else 0)
+        budget = max(0, model_context - self.reserve_tokens - fixed)
+        history, used = self.select(budget)
+        return history, fixed + used
+
+    def _refresh_summary(self, summary, evicted):
+        """Fold newly evicted turns into the rolling summary on a background thread."""
+        if self._summary_thread is not None and self._summary_thread.is_alive():
+            return
+        covered = summary[2] if summary else 0
+        new_turns = [message for seq, message, _ in evicted if seq > covered]
+        if not new_turns:
+            return
+        last_seq = evicted[-1][0]
+        previous = summary[0] if summary else None
+        generation = self._generation
+
+        def work():
+            try:
+                text = self.summarizer(previous, new_turns)
+            except Exception as e:
+                logging.warning(f"Could not update rolling conversation summary: {str(e)}")
+                return
+            with self._lock:
+                if generation != self._generation:
+                    return
+                self._summary = (text, self.estimate(SUMMARY_PREFIX + text), last_seq)
+
+        self._summary_thread = threading.Thread(target=work, daemon=True)
+        self._summary_thread.start()
@@ -0,0 +1,305 @@
+"""
+Conversation History Store
+---------------------------------------------------------
+Append-only JSON Lines backend for the interaction suite's conversation
+history. Each turn is written as a single line, the recent tail is read
+lazily from the end of the file, durability is controlled through batched
+fsync calls, and the legacy single-document conversation_history.json
+format is migrated on first use.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+
+class HistoryStore:
+    """Append-only, lazily loaded conversation history persisted as JSON Lines."""
+
+    READ_BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, path="conversation_history.jsonl", legacy_path=None,
+                 fsync_every=16, fsync_interval=5.0):
+        """
+        Initialize the store and migrate a legacy history file if present.
+
+        Args:
+            path (str): JSON Lines file holding one turn per line
+            legacy_path (str, optional): Old conversation_history.json to migrate from
+            fsync_every (int): Force data to disk after this many appends (0 disables)
+            fsync_interval (float): Force data to disk if this many seconds passed since the last sync
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._count = None
+        self._pending_sync = 0
+        self._last_sync = time.monotonic()
+
+        if legacy_path:
+            self.migrate(legacy_path)
+
+    def _open(self):
+        """Open the file for appending, repairing a torn final line left by a crash."""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            if self._file.tell() > 0:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._file.write(b"\n")
+        return self._file
+
+    def append(self, turn):
+        """
+        Append a single turn to the end of the history.
+
+        Args:
+            turn (dict): JSON-serializable turn record
+
+        Returns:
+            int: Byte offset at which the turn was written
+        """
+        line = (json.dumps(turn, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            f = self._open()
+            offset = f.tell()
+            f.write(line)
+            f.flush()
+            if self._count is not None:
+                self._count += 1
+            self._pending_sync += 1
+            if (self.fsync_every and self._pending_sync >= self.fsync_every) or \
+                    time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_locked()
+            return offset
+
+    def _sync_locked(self):
+        if self._file is not None and self._pending_sync:
+            os.fsync(self._file.fileno())
+        self._pending_sync = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """Force any appended turns to disk."""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self):
+        """Sync and release the underlying file handle."""
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def tail(self, n):
+        """
+        Read the last n turns without loading the rest of the file.
+
+        Args:
+            n (int): Number of turns to return
+
+        Returns:
+            list: Up to n turns, oldest first
+        """
+        if n <= 0 or not os.path.exists(self.path):
+            return []
+
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                data = b""
+                # Read backwards until we have seen enough complete lines
+                while position > 0 and data.count(b"\n") <= n:
+                    step = min(self.READ_BLOCK_SIZE, position)
+                    position -= step
+                    f.seek(position)
+                    data = f.read(step) + data
+
+        lines = data.split(b"\n")
+        if position > 0:
+            lines = lines[1:]  # First line may be partial
+
+        turns = []
+        for line in reversed(lines):
+            turn = self._parse(line)
+            if turn is not None:
+                turns.append(turn)
+                if len(turns) == n:
+                    break
+        turns.reverse()
+        return turns
+
+    def read_at(self, offset):
+        """
+        Read the turn stored at a byte offset returned by append().
+
+        Args:
+            offset (int): Byte offset of the start of the line
+
+        Returns:
+            dict: The turn, or None if the offset does not hold a valid record
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(offset)
+                    return self._parse(f.readline())
+            except OSError:
+                return None
+
+    def iter_turns(self):
+        """Stream every stored turn from the start of the file, oldest first."""
+        if not os.path.exists(self.path):
+            return
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        with open(self.path, "rb") as f:
+            for line in f:
+                turn = self._parse(line)
+                if turn is not None:
+                    yield turn
+
+    def iter_records(self):
+        """Stream (byte offset, turn) for every stored turn, oldest first."""
+        if not os.path.exists(self.path):
+            return
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                turn = self._parse(line)
+                if turn is not None:
+                    yield offset, turn
+                offset += len(line)
+
+    def __len__(self):
+        """Number of stored turns, counted once and then tracked incrementally."""
+        with self._lock:
+            if self._count is None:
+                self._count = 0
+                if os.path.exists(self.path):
+                    if self._file is not None:
+                        self._file.flush()
+                    with open(self.path, "rb") as f:
+                        for line in f:
+                            if line.strip():
+                                self._count += 1
+            return self._count
+
+    def clear(self):
+        """Remove all stored turns."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            open(self.path, "wb").close()
+            self._count = 0
+            self._pending_sync = 0
+
+    def compact(self, keep_last=None):
+        """
+        Rewrite the file, dropping malformed lines and optionally old turns.
+
+        The new file is written next to the old one and atomically swapped in,
+        so an interrupted compaction never loses the existing history.
+
+        Args:
+            keep_last (int, optional): Keep only this many most recent turns
+
+        Returns:
+            dict: Mapping of old byte offset -> new byte offset for every kept turn
+        """
+        if not os.path.exists(self.path):
+            return {}
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            records = []
+            with open(self.path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if self._parse(line) is not None:
+                        records.append((offset, line.rstrip(b"\n") + b"\n"))
+                    offset += len(line)
+            if keep_last is not None:
+                records = records[-keep_last:] if keep_last > 0 else []
+
+            tmp_path = self.path + ".tmp"
+            mapping = {}
+            with open(tmp_path, "wb") as f:
+                for old_offset, line in records:
+                    mapping[old_offset] = f.tell()
+                    f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+            self._count = len(records)
+            self._pending_sync = 0
+            return mapping
+
+    def migrate(self, legacy_path):
+        """
+        Convert a legacy JSON array history file into the JSON Lines format.
+
+        Migration only runs when the JSON Lines file does not exist yet; the
+        legacy file is renamed with a .migrated suffix afterwards.
+
+        Args:
+            legacy_path (str): Path to the old conversation_history.json
+
+        Returns:
+            int: Number of turns migrated
+        """
+        if os.path.exists(self.path) or not os.path.exists(legacy_path):
+            return 0
+
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                turns = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not migrate legacy history {legacy_path}: {str(e)}")
+            return 0
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for turn in turns:
+                f.write((json.dumps(turn, ensure_ascii=False) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        os.replace(legacy_path, legacy_path + ".migrated")
+
+        with self._lock:
+            self._count = len(turns)
+        logging.info(f"Migrated {len(turns)} turns from {legacy_path} to {self.path}")
+        return len(turns)
+
+    @staticmethod
+    def _parse(line):
+        """Decode one JSON line, returning None for blank or torn lines."""
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            turn = json.loads(line)
+        except ValueError:
+            return None
+        return turn if isinstance(turn, dict) else None
@@ -0,0 +1,428 @@
+"""
+Ollama Host Pool
+---------------------------------------------------------
+Spreads requests over several Ollama servers. Each host gets its own
+ollama.Client (and an ollama.AsyncClient per event loop for the asyncio
+suite); requests are routed to the host with the lowest
+latency-weighted number of outstanding requests among the hosts that have
+the requested model. Hosts are health-checked through /api/tags (which also
+refreshes the per-host model lists) and guarded by a circuit breaker: after
+repeated failures a host is skipped for a cool-down period and failed
+requests are retried on the next best host.
+
+Hosts are taken from the OLLAMA_HOSTS environment variable (comma separated),
+falling back to OLLAMA_HOST / the local default, parsed by ollama_hosts.py as
+in the one-shot CLI. The ollama package (and httpx underneath it) is only
+imported when the first client is needed, as it dominates the import time of
+the suite.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ollama_hosts import configured_hosts
+
+
+def _model_names(listing):
+    """Model names from an ollama.list() response (name or model field depending on version)."""
+    names = set()
+    for model in listing.get("models", []):
+        name = model.get("model") or model.get("name")
+        if name:
+            names.add(name)
+            if name.endswith(":latest"):
+                names.add(name[: -len(":latest")])
+    return names
+
+
+class HostState:
+    """Client, load and circuit-breaker state of one Ollama host."""
+
+    def __init__(self, host, timeout=None):
+        self.host = host
+        self.timeout = timeout
+        self._client = None
+        self._async_client = None
+        self._async_loop = None  # Event loop the async client is bound to
+        self.models = set()
+        self.listing = {"models": []}  # Last /api/tags response
+        self.healthy = False
+        self.outstanding = 0
+        self.latency = None  # EWMA of time until the response starts arriving, in seconds
+        self.requests = 0
+        self.failures = 0  # Total failed requests
+        self.consecutive_failures = 0
+        self.open_until = 0.0  # Circuit breaker is open (host skipped) until this time
+        self.last_error = None
+
+    @property
+    def name(self):
+        return self.host or "default"
+
+    @property
+    def client(self):
+        """ollama.Client for this host, created on first use."""
+        if self._client is None:
+            import ollama
+
+            self._client = ollama.Client(host=self.host, timeout=self.timeout)
+        return self._client
+
+    @property
+    def async_client(self):
+        """
+        ollama.AsyncClient for this host on the running event loop.
+
+        Async clients are tied to the loop they were first used on, so a new
+        one is created when the host is used from another loop.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            import ollama
+
+            self._async_client = ollama.AsyncClient(host=self.host, timeout=self.timeout)
+            self._async_loop = loop
+        return self._async_client
+
+
+class HostPool:
+    """Routes ollama calls across several hosts with health checks and failover."""
+
+    def __init__(self, hosts=None, failure_threshold=3, cooldown=30.0, health_interval=15.0, timeout=None):
+        """
+        Args:
+            hosts (list, optional): Host URLs, from OLLAMA_HOSTS / OLLAMA_HOST if omitted
+            failure_threshold (int): Consecutive failures that open a host's circuit breaker
+            cooldown (float): Seconds a host is skipped once its breaker opens
+            health_interval (float): Seconds between background health checks
+            timeout (float, optional): Per-request client timeout in seconds
+        """
+        self.hosts = [HostState(host, timeout) for host in configured_hosts(hosts)]
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.health_interval = health_interval
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._stop = threading.Event()
+
+    def __len__(self):
+        return len(self.hosts)
+
+    # Health checks
+
+    def check(self, state):
+        """Query /api/tags on one host, refreshing its model list and health."""
+        try:
+            listing = state.client.list()
+            listing = listing.model_dump() if hasattr(listing, "model_dump") else dict(listing)
+        except Exception as e:
+            with self._lock:
+                state.healthy = False
+                state.last_error = str(e)
+                state.open_until = time.time() + self.cooldown
+            return False
+        with self._lock:
+            state.listing = listing
+            state.models = _model_names(listing)
+            state.healthy = True
+            state.consecutive_failures = 0
+            state.open_until = 0.0
+            state.last_error = None
+        return True
+
+    def check_all(self):
+        """
+        Health-check every host in parallel.
+
+        Returns:
+            int: Number of healthy hosts
+        """
+        with ThreadPoolExecutor(max_workers=len(self.hosts)) as executor:
+            return sum(executor.map(self.check, self.hosts))
+
+    def start_health_checks(self):
+        """Re-check all hosts periodically on a background thread."""
+        if self._health_thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(self.health_interval):
+                self.check_all()
+
+        self._health_thread = threading.Thread(target=loop, daemon=True)
+        self._health_thread.start()
+
+    def stop(self):
+        """Stop background health checks."""
+        self._stop.set()
+
+    @property
+    def healthy_count(self):
+        return sum(1 for state in self.hosts if state.healthy)
+
+    def models(self):
+        """
+        Models available across all healthy hosts.
+
+        Returns:
+            dict: ollama.list()-shaped {"models": [...]}, each entry tagged with its "hosts"
+        """
+        merged = {}
+        with self._lock:
+            for state in self.hosts:
+                if not state.healthy:
+                    continue
+                for model in state.listing.get("models", []):
+                    name = model.get("model") or model.get("name")
+                    entry = merged.setdefault(name, dict(model, hosts=[]))
+                    entry["hosts"].append(state.name)
+        return {"models": list(merged.values())}
+
+    def hosts_for(self, model):
+        """Healthy hosts that have model (every healthy host if none reports it)."""
+        with self._lock:
+            healthy = [state for state in self.hosts if state.healthy]
+            having = [state for state in healthy if model in state.models]
+        return having or healthy
+
+    # Routing
+
+    def _pick(self, model, tried):
+        """Best available host for model that has not been tried yet, or None."""
+        now = time.time()
+        with self._lock:
+            available = [s for s in self.hosts if s not in tried and s.open_until <= now]
+            having = [s for s in available if model is None or model in s.models]
+            candidates = having or available
+            if not candidates:
+                return None
+            known = [s.latency for s in candidates if s.latency]
+            default_latency = min(known) if known else 1.0
+            # Latency-weighted least outstanding requests; ties go to the less used host
+            state = min(candidates, key=lambda s: ((s.outstanding + 1) * (s.latency or default_latency), s.requests))
+            state.outstanding += 1
+            state.requests += 1
+        return state
+
+    def _succeeded(self, state, latency):
+        with self._lock:
+            state.outstanding -= 1
+            state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+            state.consecutive_failures = 0
+            state.healthy = True
+
+    def _failed(self, state, error, count=True):
+        """Record a failure; returns True if the request should be retried on another host."""
+        with self._lock:
+            state.outstanding -= 1
+            state.last_error = str(error)
+            if not count:
+                return True
+            state.failures += 1
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= self.failure_threshold:
+                state.open_until = time.time() + self.cooldown
+                state.healthy = False
+                logging.warning(f"Ollama host {state.name} disabled for {self.cooldown:.0f}s: {error}")
+        return True
+
+    def _retryable(self, state, model, error):
+        """Whether error on state should fail over; missing models are unlearned without tripping the breaker."""
+        import httpx
+        import ollama
+
+        if isinstance(error, ollama.ResponseError):
+            if error.status_code == 404:
+                with self._lock:
+                    state.models.discard(model)
+                return self._failed(state, error, count=False)
+            if error.status_code < 500:
+                self._failed(state, error, count=False)
+                return False
+            return self._failed(state, error)
+        if isinstance(error, (ConnectionError, httpx.TransportError)):
+            return self._failed(state, error)
+        self._failed(state, error, count=False)
+        return False
+
+    def call(self, method, model=None, **kwargs):
+        """
+        Call a client method on the best host, failing over to others on errors.
+
+        Args:
+            method (str): ollama.Client method name, e.g. "chat" or "generate"
+            model (str, optional): Model the request needs (used for routing)
+            **kwargs: Arguments for the client method
+
+        Returns:
+            The client method's result
+        """
+        if model is not None:
+            kwargs["model"] = model
+        tried = []
+        error = None
+        while True:
+            state = self._pick(model, tried)
+            if state is None:
+                raise error or ConnectionError("No healthy Ollama host available")
+            tried.append(state)
+            start = time.time()
+            try:
+                result = getattr(state.client, method)(**kwargs)
+            except Exception as e:
+                error = e
+                if not self._retryable(state, model, e):
+                    raise
+                continue
+            self._succeeded(state, time.time() - start)
+            return result
+
+    def stream(self, method, model=None, **kwargs):
+        """
+        Streaming variant of call().
+
+        Failover happens until the first chunk arrives; a host failing
+        mid-stream is recorded but the error is raised to the caller.
+
+        Yields:
+            Response chunks
+        """
+        if model is not None:
+            kwargs["model"] = model
+        tried = []
+        error = None
+        while True:
+            state = self._pick(model, tried)
+            if state is None:
+                raise error or ConnectionError("No healthy Ollama host available")
+            tried.append(state)
+            start = time.time()
+            try:
+                chunks = getattr(state.client, method)(stream=True, **kwargs)
+                first = next(chunks)
+            except StopIteration:
+                self._succeeded(state, time.time() - start)
+                return
+            except Exception as e:
+                error = e
+                if not self._retryable(state, model, e):
+                    raise
+                continue
+            break
+
+        latency = time.time() - start
+        try:
+            yield first
+            yield from chunks
+        except GeneratorExit:
+            self._succeeded(state, latency)
+            raise
+        except Exception as e:
+            self._retryable(state, model, e)
+            raise
+        self._succeeded(state, latency)
+
+    async def acall(self, method, model=None, **kwargs):
+        """
+        Asynchronous variant of call(), awaiting the method of the host's AsyncClient.
+
+        Routing, failover and circuit breaking are shared with the synchronous calls.
+        """
+        if model is not None:
+            kwargs["model"] = model
+        tried = []
+        error = None
+        while True:
+            state = self._pick(model, tried)
+            if state is None:
+                raise error or ConnectionError("No healthy Ollama host available")
+            tried.append(state)
+            start = time.time()
+            try:
+                result = await getattr(state.async_client, method)(**kwargs)
+            except Exception as e:
+                error = e
+                if not self._retryable(state, model, e):
+                    raise
+                continue
+            self._succeeded(state, time.time() - start)
+            return result
+
+    async def astream(self, method, model=None, **kwargs):
+        """
+        Asynchronous variant of stream(); failover happens until the first chunk arrives.
+
+        Yields:
+            Response chunks
+        """
+        import asyncio
+
+        if model is not None:
+            kwargs["model"] = model
+        tried = []
+        error = None
+        while True:
+            state = self._pick(model, tried)
+            if state is None:
+                raise error or ConnectionError("No healthy Ollama host available")
+            tried.append(state)
+            start = time.time()
+            chunks = None
+            try:
+                chunks = await getattr(state.async_client, method)(stream=True, **kwargs)
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                self._succeeded(state, time.time() - start)
+                return
+            except Exception as e:
+                error = e
+                if chunks is not None:
+                    await chunks.aclose()
+                if not self._retryable(state, model, e):
+                    raise
+                continue
+            except asyncio.CancelledError:
+                self._failed(state, "cancelled", count=False)
+                if chunks is not None:
+                    await chunks.aclose()
+                raise
+            break
+
+        latency = time.time() - start
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            self._succeeded(state, latency)
+            raise
+        except Exception as e:
+            self._retryable(state, model, e)
+            raise
+        finally:
+            # Closes the HTTP stream, which stops generation on the server
+            await chunks.aclose()
+        self._succeeded(state, latency)
+
+    def stats(self):
+        """Per-host routing and health figures."""
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "host": state.name,
+                    "healthy": state.healthy,
+                    "circuit_open": state.open_until > now,
+                    "models": len(state.models),
+                    "outstanding": state.outstanding,
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "latency": state.latency,
+                    "last_error": state.last_error,
+                }
+                for state in self.hosts
+            ]
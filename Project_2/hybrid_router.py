@@ -0,0 +1,210 @@
+"""
+Hybrid Router
+---------------------------------------------------------
+Tiered answering for plain prompts. The rule-based keyword chatbot from
+Project 1 answers in well under a millisecond, so it is tried first; only
+when it has no intent for the prompt, or its confidence is below a threshold,
+is the prompt escalated to Ollama. Per-tier hit rates and latencies are
+tracked, together with an estimate of the LLM time the rule tier saved.
+
+Confidence is the keyword match score, scaled down for long prompts (the
+canned answers explain a single keyword, they do not answer detailed
+requests) and halved when several different keywords match ("for vs while").
+The keywords are also everyday English words ("a book for me", "take a
+break"), so a match only counts when the prompt is about programming: it
+mentions a programming word (PROGRAMMING_WORDS), contains code, or is a bare
+"what is X" / "how does X work" question about the keyword itself. Anything
+else is escalated.
+The chatbot (and spaCy) is loaded on a background thread; until it is ready
+every prompt goes to the LLM. aroute() serves the asyncio suite, where the
+escalated request is awaited.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+# Project 1 lives next to this project unless NLP_CHATBOT_PATH points elsewhere
+CHATBOT_PATH = os.environ.get(
+    "NLP_CHATBOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Project_1"))
+
+RULES_MODEL = "rule-based"
+
+# Words that put a keyword match in a programming context
+PROGRAMMING_WORDS = frozenset({
+    "java", "code", "coding", "program", "programming", "syntax", "compile", "compiler",
+    "loop", "loops", "statement", "statements", "keyword", "keywords", "conditional",
+    "iterate", "iteration", "method", "methods", "function", "functions", "variable", "variables",
+    "array", "arrays",
+})
+
+# Code in the prompt: braces, semicolons, calls, comparison and increment operators
+CODE_PATTERN = re.compile(r"[{};]|\w\(|==|!=|<=|>=|\+\+|&&|\|\|")
+
+# A whole prompt asking what a single word is or does: "what is break?", "how does return work?"
+QUESTION_PATTERN = re.compile(
+    r"^\s*(?:what\s+(?:is|are|does)|what's|how\s+(?:does|do|is)|explain|define)\s+(?:an?\s+|the\s+)?"
+    r"[`'\"]?([a-z]+)[`'\"]?(?:\s+(?:do|does|mean|means|work|works))?\s*[?.!]*\s*$",
+    re.IGNORECASE,
+)
+
+
+class HybridRouter:
+    """Routes prompts to the keyword chatbot first and to the LLM on a miss."""
+
+    def __init__(self, suite, bot=None, threshold=0.75, max_words=10, background=True):
+        """
+        Args:
+            suite (OllamaInteractionSuite): Suite that answers escalated prompts
+            bot (Chatbot, optional): Keyword chatbot, loaded from CHATBOT_PATH if omitted
+            threshold (float): Minimum confidence for a rule-based answer
+            max_words (int): Prompts longer than this lose confidence proportionally
+            background (bool): Load the chatbot on a background thread
+        """
+        self.suite = suite
+        self.bot = bot
+        self.threshold = threshold
+        self.max_words = max_words
+        self.tiers = {"rules": {"requests": 0, "seconds": 0.0}, "llm": {"requests": 0, "seconds": 0.0}}
+        self.load_error = None
+        self._lock = threading.Lock()
+        self._loader = None
+        if bot is None:
+            if background:
+                self._loader = threading.Thread(target=self._load_bot, daemon=True)
+                self._loader.start()
+            else:
+                self._load_bot()
+
+    def _load_bot(self):
+        try:
+            if CHATBOT_PATH not in sys.path:
+                sys.path.append(CHATBOT_PATH)
+            from NLP import Chatbot
+
+            self.bot = Chatbot()
+        except Exception as e:
+            self.load_error = str(e)
+            logging.warning(f"Rule-based chatbot unavailable, every prompt goes to the LLM: {str(e)}")
+
+    def wait(self, timeout=None):
+        """Wait until the chatbot is loaded; returns whether it is available."""
+        if self._loader is not None:
+            self._loader.join(timeout)
+        return self.bot is not None
+
+    def classify(self, prompt):
+        """
+        Rule-based intent for a prompt with the router's confidence in it.
+
+        Returns:
+            tuple: (intent, confidence); ("default", 0.0) if no keyword matched
+                or the chatbot is not loaded, and confidence 0.0 if the prompt
+                is not about programming
+        """
+        if self.bot is None:
+            return "default", 0.0
+        candidates = self.bot.candidates(prompt)
+        if not candidates:
+            return "default", 0.0
+        intent, score = candidates[0]
+        if not self._about_programming(prompt, intent):
+            return intent, 0.0
+        confidence = score * min(1.0, self.max_words / max(len(prompt.split()), 1))
+        if len(candidates) > 1:
+            confidence *= 0.5
+        return intent, confidence
+
+    def _about_programming(self, prompt, intent):
+        """Whether a prompt matching intent asks about programming rather than using the word in passing."""
+        if PROGRAMMING_WORDS.intersection(re.findall(r"[a-z]+", prompt.lower())):
+            return True
+        if CODE_PATTERN.search(prompt):
+            return True
+        question = QUESTION_PATTERN.match(prompt)
+        return question is not None and any(
+            candidate == intent for candidate, _ in self.bot.candidates(question.group(1))
+        )
+
+    def route(self, prompt, use_history=True, **kwargs):
+        """
+        Answer a prompt from the cheapest tier that is confident enough.
+
+        Args:
+            prompt (str): User prompt
+            use_history (bool): Record the exchange in the conversation history
+            **kwargs: Passed on to generate_response() when escalating
+
+        Returns:
+            dict: Response data; "tier" is "rules" or "llm"
+        """
+        start_time = time.time()
+        response = self._answer_from_rules(prompt, use_history, start_time)
+        if response is not None:
+            return response
+
+        response = self.suite.generate_response(prompt, use_history=use_history, **kwargs)
+        response["tier"] = "llm"
+        self._count("llm", time.time() - start_time)
+        return response
+
+    async def aroute(self, prompt, use_history=True, **kwargs):
+        """route() for the asyncio suite, whose generate_response() is a coroutine."""
+        start_time = time.time()
+        # Recording the rule-based answer writes the history file, which stays off the event loop
+        response = await asyncio.to_thread(self._answer_from_rules, prompt, use_history, start_time)
+        if response is not None:
+            return response
+
+        response = await self.suite.generate_response(prompt, use_history=use_history, **kwargs)
+        response["tier"] = "llm"
+        self._count("llm", time.time() - start_time)
+        return response
+
+    def _answer_from_rules(self, prompt, use_history, start_time):
+        """Rule-based response recorded like an LLM one, or None if the prompt must be escalated."""
+        intent, confidence = self.classify(prompt)
+        if intent != "default" and confidence >= self.threshold:
+            elapsed = time.time() - start_time
+            response = {
+                "model": RULES_MODEL,
+                "message": {"role": "assistant", "content": self.bot.answer_for(intent)},
+                "total_duration": int(elapsed * 1e9),
+                "ttft": elapsed,
+                "tier": "rules",
+                "intent": intent,
+                "confidence": confidence,
+            }
+            with self.suite._state_lock:
+                self.suite.interaction_count += 1
+            self.suite._finalize_response(prompt, response, start_time, record_history=use_history)
+            self._count("rules", time.time() - start_time)
+            return response
+        return None
+
+    def _count(self, tier, seconds):
+        with self._lock:
+            self.tiers[tier]["requests"] += 1
+            self.tiers[tier]["seconds"] += seconds
+
+    def stats(self):
+        """
+        Per-tier hit rates and latencies, and the LLM time saved by the rule tier.
+
+        The saving is estimated from the average latency of escalated prompts
+        and is None until at least one prompt went to the LLM.
+        """
+        with self._lock:
+            tiers = {name: dict(values) for name, values in self.tiers.items()}
+        total = sum(tier["requests"] for tier in tiers.values())
+        for tier in tiers.values():
+            tier["hit_rate"] = tier["requests"] / total if total else 0.0
+            tier["avg_seconds"] = tier["seconds"] / tier["requests"] if tier["requests"] else 0.0
+        saved = None
+        if tiers["llm"]["requests"]:
+            saved = tiers["rules"]["requests"] * tiers["llm"]["avg_seconds"] - tiers["rules"]["seconds"]
+        return {"requests": total, "tiers": tiers, "saved_seconds": saved, "available": self.bot is not None}
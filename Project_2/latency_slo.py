@@ -0,0 +1,353 @@
+"""
+Latency SLO
+---------------------------------------------------------
+Hedged requests and hard limits for model calls. Every request streams from
+its primary model on a worker thread; if no token has arrived when the hedge
+deadline passes (or the primary fails first), the same request is sent to a
+second, typically smaller or more heavily quantized, model. Whichever stream
+produces a token first wins and is passed on; the other one is cancelled.
+
+Cancellation closes the loser's HTTP stream, which makes Ollama stop
+generating. A loser still waiting for its first token cannot be interrupted
+mid-read, so it is closed as soon as that token arrives; the time it took is
+used to measure the latency the hedge saved.
+
+Each command ("chat", "code", "summarize") has a hard timeout for the whole
+response and an optional cap on generated tokens (sent as num_predict). The
+timeout is checked on every chunk, so a response that streams steadily past
+its limit is still cut off.
+
+astream() is the asyncio variant used by the asynchronous suite. Racers run
+as tasks there, and a beaten racer is cancelled at once instead of at its
+first token; the latency a hedge saved is therefore only measured for
+synchronous requests.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+DEFAULT_LIMITS = {
+    "chat": {"timeout": 120.0, "max_tokens": None},
+    "code": {"timeout": 300.0, "max_tokens": None},
+    "summarize": {"timeout": 180.0, "max_tokens": 1024},
+}
+
+_END = object()
+
+
+def collect(chunks):
+    """Assemble streamed chat chunks into a non-streamed response dict."""
+    parts = []
+    final = {}
+    for chunk in chunks:
+        parts.append(chunk.get("message", {}).get("content", ""))
+        if chunk.get("done"):
+            final = chunk
+    response = {key: value for key, value in final.items() if key != "message"}
+    response["message"] = {"role": "assistant", "content": "".join(parts)}
+    return response
+
+
+class _Racer:
+    """One request of a race, streamed on its own thread."""
+
+    def __init__(self, role, model):
+        self.role = role  # "primary" or "hedge"
+        self.model = model
+        self.cancelled = threading.Event()
+        self.beaten_at = None  # perf_counter time the winner's first token arrived, if this racer lost
+        self.failed = False
+
+
+class LatencySLO:
+    """Races a primary and a hedge model and enforces per-command limits."""
+
+    def __init__(self, hedge_model=None, deadline=2.0, limits=None):
+        """
+        Args:
+            hedge_model (str, optional): Model raced against slow primaries; only limits apply if omitted
+            deadline (float): Seconds without a first token before the hedge request is sent
+            limits (dict, optional): Command -> {"timeout": seconds, "max_tokens": n}, merged over DEFAULT_LIMITS
+        """
+        self.hedge_model = hedge_model
+        self.deadline = deadline
+        self.limits = {command: dict(values) for command, values in DEFAULT_LIMITS.items()}
+        for command, values in (limits or {}).items():
+            self.set_limit(command, **values)
+        self.requests = 0
+        self.hedged = 0
+        self.wins = {"primary": 0, "hedge": 0}
+        self.fallbacks = 0  # Hedges sent because the primary failed
+        self.timeouts = 0
+        self.saved_seconds = 0.0
+        self.saved_samples = 0
+        self._lock = threading.Lock()
+
+    def set_limit(self, command, timeout=None, max_tokens=None):
+        """
+        Set the hard timeout and token cap of a command; None removes the limit.
+
+        Args:
+            command (str): "chat", "code", "summarize" or any other command name
+            timeout (float, optional): Seconds the whole response may take
+            max_tokens (int, optional): Maximum tokens generated (num_predict)
+        """
+        self.limits[command] = {"timeout": timeout, "max_tokens": max_tokens}
+
+    def limits_for(self, command):
+        return self.limits.get(command) or self.limits.get("chat") or {}
+
+    def options_for(self, command, options=None):
+        """Per-call options with the command's token cap applied (an explicit num_predict wins)."""
+        max_tokens = self.limits_for(command).get("max_tokens")
+        if max_tokens is None:
+            return options
+        return dict({"num_predict": max_tokens}, **(options or {}))
+
+    def stream(self, open_stream, model, command="chat"):
+        """
+        Stream a response, hedging to the hedge model if the primary is slow.
+
+        Args:
+            open_stream (callable): open_stream(model) -> iterator of chunk dicts
+            model (str): Primary model
+            command (str): Command whose limits apply
+
+        Yields:
+            Chunk dicts of the winning stream; the final chunk is tagged with
+            "hedged" (whether a hedge was sent) and "winner" ("primary" or "hedge")
+
+        Raises:
+            TimeoutError: The response did not complete within the command's timeout
+        """
+        timeout = self.limits_for(command).get("timeout")
+        start = time.perf_counter()
+        hard_deadline = start + timeout if timeout else None
+        can_hedge = self.hedge_model is not None and self.hedge_model != model
+        hedge_at = start + self.deadline if can_hedge else None
+        events = queue.Queue()
+        racers = [self._launch(_Racer("primary", model), open_stream, events)]
+        winner = None
+        error = None
+        with self._lock:
+            self.requests += 1
+
+        try:
+            while True:
+                now = time.perf_counter()
+                self._check_deadline(hard_deadline, now, timeout, winner or racers[0])
+                if winner is None and hedge_at is not None and now >= hedge_at:
+                    racers.append(self._hedge(open_stream, events))
+                    hedge_at = None
+                wake_at = [t for t in (hedge_at if winner is None else None, hard_deadline) if t is not None]
+                try:
+                    racer, item = events.get(timeout=max(0.0, min(wake_at) - now) if wake_at else None)
+                except queue.Empty:
+                    continue
+                # Chunks may keep arriving faster than they are consumed; the limit still applies to them
+                self._check_deadline(hard_deadline, time.perf_counter(), timeout, winner or racers[0])
+
+                if winner is not None and racer is not winner:
+                    continue
+                if isinstance(item, Exception):
+                    if racer is winner:
+                        raise item
+                    racer.failed = True
+                    error = item
+                    if can_hedge and len(racers) == 1:
+                        logging.warning(f"{model} failed, falling back to {self.hedge_model}: {str(item)}")
+                        with self._lock:
+                            self.fallbacks += 1
+                        racers.append(self._hedge(open_stream, events))
+                        hedge_at = None
+                    elif all(r.failed for r in racers):
+                        raise error
+                    continue
+
+                if winner is None:
+                    winner = self._crown(racer, racers)
+                if item is _END:
+                    return
+                if item.get("done"):
+                    item = dict(item, hedged=len(racers) > 1, winner=winner.role)
+                yield item
+        finally:
+            for racer in racers:
+                racer.cancelled.set()
+
+    async def astream(self, open_stream, model, command="chat"):
+        """
+        asyncio variant of stream().
+
+        Args:
+            open_stream (callable): open_stream(model) -> async iterator of chunk dicts
+            model (str): Primary model
+            command (str): Command whose limits apply
+
+        Yields:
+            Chunk dicts of the winning stream, the final one tagged as in stream()
+
+        Raises:
+            TimeoutError: The response did not complete within the command's timeout
+        """
+        timeout = self.limits_for(command).get("timeout")
+        start = time.perf_counter()
+        hard_deadline = start + timeout if timeout else None
+        can_hedge = self.hedge_model is not None and self.hedge_model != model
+        hedge_at = start + self.deadline if can_hedge else None
+        events = asyncio.Queue()
+        tasks = {}
+        primary = _Racer("primary", model)
+        tasks[primary] = asyncio.create_task(self._arun(primary, open_stream, events))
+        racers = [primary]
+        winner = None
+        error = None
+        with self._lock:
+            self.requests += 1
+
+        def hedge():
+            with self._lock:
+                self.hedged += 1
+            racer = _Racer("hedge", self.hedge_model)
+            tasks[racer] = asyncio.create_task(self._arun(racer, open_stream, events))
+            racers.append(racer)
+
+        try:
+            while True:
+                now = time.perf_counter()
+                self._check_deadline(hard_deadline, now, timeout, winner or primary)
+                if winner is None and hedge_at is not None and now >= hedge_at:
+                    hedge()
+                    hedge_at = None
+                wake_at = [t for t in (hedge_at if winner is None else None, hard_deadline) if t is not None]
+                try:
+                    racer, item = await asyncio.wait_for(events.get(),
+                                                         max(0.0, min(wake_at) - now) if wake_at else None)
+                except asyncio.TimeoutError:
+                    continue
+                self._check_deadline(hard_deadline, time.perf_counter(), timeout, winner or primary)
+
+                if winner is not None and racer is not winner:
+                    continue
+                if isinstance(item, Exception):
+                    if racer is winner:
+                        raise item
+                    racer.failed = True
+                    error = item
+                    if can_hedge and len(racers) == 1:
+                        logging.warning(f"{model} failed, falling back to {self.hedge_model}: {str(item)}")
+                        with self._lock:
+                            self.fallbacks += 1
+                        hedge()
+                        hedge_at = None
+                    elif all(r.failed for r in racers):
+                        raise error
+                    continue
+
+                if winner is None:
+                    winner = racer
+                    with self._lock:
+                        self.wins[winner.role] += 1
+                    for other, task in tasks.items():
+                        if other is not winner:
+                            task.cancel()
+                if item is _END:
+                    return
+                if item.get("done"):
+                    item = dict(item, hedged=len(racers) > 1, winner=winner.role)
+                yield item
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    def _check_deadline(self, hard_deadline, now, timeout, racer):
+        """Raise TimeoutError once the command's hard timeout has passed."""
+        if hard_deadline is not None and now >= hard_deadline:
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"No complete response from {racer.model} within {timeout:g} seconds")
+
+    def _hedge(self, open_stream, events):
+        with self._lock:
+            self.hedged += 1
+        return self._launch(_Racer("hedge", self.hedge_model), open_stream, events)
+
+    def _launch(self, racer, open_stream, events):
+        threading.Thread(target=self._run, args=(racer, open_stream, events), daemon=True).start()
+        return racer
+
+    def _crown(self, winner, racers):
+        """Make racer the winner and cancel the others."""
+        now = time.perf_counter()
+        with self._lock:
+            self.wins[winner.role] += 1
+        for racer in racers:
+            if racer is not winner:
+                racer.beaten_at = now
+                racer.cancelled.set()
+        return winner
+
+    def _run(self, racer, open_stream, events):
+        """Worker thread: forward one stream's chunks until it ends or is cancelled."""
+        chunks = None
+        first = True
+        try:
+            chunks = open_stream(racer.model)
+            for chunk in chunks:
+                if first:
+                    first = False
+                    self._lost(racer)
+                if racer.cancelled.is_set():
+                    break
+                events.put((racer, chunk))
+            events.put((racer, _END))
+        except Exception as e:
+            self._lost(racer)
+            events.put((racer, e))
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    async def _arun(self, racer, open_stream, events):
+        """Task: forward one async stream's chunks until it ends or the task is cancelled."""
+        chunks = None
+        try:
+            chunks = open_stream(racer.model)
+            async for chunk in chunks:
+                events.put_nowait((racer, chunk))
+            events.put_nowait((racer, _END))
+        except Exception as e:
+            events.put_nowait((racer, e))
+        finally:
+            # Closing the HTTP stream makes Ollama stop generating for a cancelled racer
+            close = getattr(chunks, "aclose", None)
+            if close is not None:
+                await close()
+
+    def _lost(self, racer):
+        """Record how much earlier the winning hedge answered than the primary it beat."""
+        if racer.role == "primary" and racer.beaten_at is not None:
+            with self._lock:
+                self.saved_seconds += time.perf_counter() - racer.beaten_at
+                self.saved_samples += 1
+
+    def stats(self):
+        """Request, hedge, win and timeout counters, and the measured latency saved by hedges."""
+        with self._lock:
+            decided = self.wins["primary"] + self.wins["hedge"]
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "wins": dict(self.wins),
+                "hedge_win_rate": self.wins["hedge"] / decided if decided else 0.0,
+                "fallbacks": self.fallbacks,
+                "timeouts": self.timeouts,
+                "saved_seconds": self.saved_seconds,
+                "saved_samples": self.saved_samples,
+                "hedge_model": self.hedge_model,
+                "deadline": self.deadline,
+            }
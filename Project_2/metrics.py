@@ -0,0 +1,225 @@
+"""
+Latency and Throughput Metrics
+---------------------------------------------------------
+Per-call instrumentation for the interaction suite. Every completed request
+is broken down into time to first token, inter-token latency, prompt-eval
+and eval throughput, model load time and client-side overhead. Samples are
+kept in per-model histograms that report p50/p95/p99, are appended to a
+JSONL log as they happen, and can be exported in the Prometheus text format
+(as a file for the node_exporter textfile collector or over HTTP).
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+METRIC_HELP = {
+    "ttft_seconds": "Time from sending the request to the first generated token",
+    "inter_token_seconds": "Latency between consecutive generated tokens",
+    "prompt_eval_tokens_per_second": "Prompt evaluation throughput reported by the server",
+    "eval_tokens_per_second": "Generation throughput reported by the server",
+    "load_seconds": "Time the server spent loading the model",
+    "client_overhead_seconds": "Wall time not accounted for by the server's total_duration",
+    "total_seconds": "Wall time of the whole call as seen by the client",
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """Running count/sum with a bounded window of recent samples for percentiles."""
+
+    def __init__(self, max_samples=2048):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q):
+        """Nearest-rank percentile over the retained samples."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class MetricsRecorder:
+    """Collects per-model call metrics and exports them."""
+
+    def __init__(self, jsonl_path=None, max_samples=2048, prefix="ollama_suite"):
+        """
+        Args:
+            jsonl_path (str, optional): Append one JSON record per call to this file
+            max_samples (int): Recent samples kept per histogram for percentiles
+            prefix (str): Metric name prefix used in the Prometheus export
+        """
+        self.jsonl_path = jsonl_path
+        self.max_samples = max_samples
+        self.prefix = prefix
+        self.histograms = {}  # model -> metric -> Histogram
+        self.calls = {}  # model -> number of calls
+        self._lock = threading.Lock()
+        self._server = None
+        self._log_dir_missing = True  # Directory of jsonl_path is created on the first record
+
+    def _observe(self, model, metric, value):
+        if value is None or value < 0:
+            return
+        per_model = self.histograms.setdefault(model, {})
+        histogram = per_model.get(metric)
+        if histogram is None:
+            histogram = per_model[metric] = Histogram(self.max_samples)
+        histogram.add(value)
+
+    def record(self, model, wall_time, response, chunk_times=None):
+        """
+        Record the metrics of one completed call.
+
+        Args:
+            model (str): Model that served the call
+            wall_time (float): Client-side duration of the call in seconds
+            response (dict): Final response, including the server's duration fields
+            chunk_times (list, optional): Arrival times of streamed content chunks
+
+        Returns:
+            dict: The record written to the JSONL log
+        """
+        record = {"timestamp": time.time(), "model": model, "total_seconds": wall_time,
+                  "cached": bool(response.get("cached"))}
+        if response.get("ttft") is not None:
+            record["ttft_seconds"] = response["ttft"]
+
+        if not record["cached"]:
+            if response.get("load_duration") is not None:
+                record["load_seconds"] = response["load_duration"] / 1e9
+            if response.get("prompt_eval_count") and response.get("prompt_eval_duration"):
+                record["prompt_eval_tokens_per_second"] = \
+                    response["prompt_eval_count"] / (response["prompt_eval_duration"] / 1e9)
+            if response.get("eval_count") and response.get("eval_duration"):
+                record["eval_tokens_per_second"] = response["eval_count"] / (response["eval_duration"] / 1e9)
+            if response.get("total_duration"):
+                record["client_overhead_seconds"] = max(0.0, wall_time - response["total_duration"] / 1e9)
+
+        gaps = []
+        if chunk_times and len(chunk_times) > 1:
+            gaps = [later - earlier for earlier, later in zip(chunk_times, chunk_times[1:])]
+        elif not record["cached"] and response.get("eval_count", 0) > 1 and response.get("eval_duration"):
+            gaps = [response["eval_duration"] / 1e9 / response["eval_count"]]
+        if gaps:
+            record["inter_token_seconds"] = sum(gaps) / len(gaps)
+
+        with self._lock:
+            self.calls[model] = self.calls.get(model, 0) + 1
+            for metric in METRIC_HELP:
+                if metric == "inter_token_seconds":
+                    for gap in gaps:
+                        self._observe(model, metric, gap)
+                else:
+                    self._observe(model, metric, record.get(metric))
+            if self.jsonl_path:
+                if self._log_dir_missing:
+                    os.makedirs(os.path.dirname(self.jsonl_path) or ".", exist_ok=True)
+                    self._log_dir_missing = False
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def summary(self):
+        """
+        Percentiles per model and metric.
+
+        Returns:
+            dict: model -> metric -> {"count", "mean", "p50", "p95", "p99"}
+        """
+        with self._lock:
+            return {
+                model: {
+                    metric: dict(
+                        count=histogram.count,
+                        mean=histogram.mean,
+                        **{f"p{q}": histogram.percentile(q) for q in PERCENTILES},
+                    )
+                    for metric, histogram in metrics.items()
+                }
+                for model, metrics in self.histograms.items()
+            }
+
+    def to_prometheus(self):
+        """Render all histograms in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for metric, help_text in METRIC_HELP.items():
+                name = f"{self.prefix}_{metric}"
+                series = [(model, metrics[metric]) for model, metrics in self.histograms.items() if metric in metrics]
+                if not series:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} summary")
+                for model, histogram in series:
+                    label = model.replace("\\", "\\\\").replace('"', '\\"')
+                    for q in PERCENTILES:
+                        lines.append(f'{name}{{model="{label}",quantile="{q / 100}"}} {histogram.percentile(q):.6g}')
+                    lines.append(f'{name}_sum{{model="{label}"}} {histogram.total:.6g}')
+                    lines.append(f'{name}_count{{model="{label}"}} {histogram.count}')
+            name = f"{self.prefix}_calls_total"
+            lines.append(f"# HELP {name} Completed calls per model")
+            lines.append(f"# TYPE {name} counter")
+            for model, calls in self.calls.items():
+                label = model.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{name}{{model="{label}"}} {calls}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomically write the Prometheus text file (safe for textfile collectors)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Expose /metrics over HTTP on a background thread."""
+        if self._server is not None:
+            return self._server.server_address
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address
+
+    def stop(self):
+        """Stop the HTTP endpoint if it is running."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
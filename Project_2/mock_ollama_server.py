@@ -0,0 +1,325 @@
+"""
+Mock Ollama Server
+---------------------------------------------------------
+A local stand-in for the Ollama HTTP API used to benchmark the client side of
+the interaction suite without a GPU or a real model. Implements /api/chat
+(streaming and non-streaming), /api/generate, /api/tags, /api/show and
+/api/embed with configurable token rates and latencies.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_MODELS = {
+    "llama3.2": {"size": 2_019_393_189, "quantization": "Q4_K_M", "context_length": 131072},
+    "llama3.2:1b": {"size": 1_321_098_329, "quantization": "Q8_0", "context_length": 131072},
+    "nomic-embed-text": {"size": 274_302_450, "quantization": "F16", "context_length": 8192},
+}
+
+FILLER = ("The quick brown fox jumps over the lazy dog while the model keeps "
+          "producing deterministic filler tokens for benchmarking purposes. ")
+
+
+class MockOllamaServer:
+    """Threaded HTTP server that imitates the subset of the Ollama API the suite uses."""
+
+    def __init__(self, host="127.0.0.1", port=0, tokens_per_second=200.0,
+                 first_token_latency=0.05, load_latency=0.0, response_tokens=64,
+                 models=None, reply=None, embedding_dim=64, model_latency=None):
+        """
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind, 0 picks a free one
+            tokens_per_second (float): Simulated generation rate, 0 disables pacing
+            first_token_latency (float): Seconds before the first token is emitted
+            load_latency (float): Extra seconds added when a model is cold
+            response_tokens (int): Tokens generated per reply
+            models (dict, optional): Model name -> metadata served by /api/tags
+            reply (str or callable, optional): Fixed reply text, or reply(messages) -> str,
+                instead of filler tokens
+            embedding_dim (int): Dimension of vectors returned by /api/embed
+            model_latency (dict, optional): Model name -> first-token latency overriding
+                first_token_latency, to simulate a slow model next to a fast one
+        """
+        self.tokens_per_second = tokens_per_second
+        self.first_token_latency = first_token_latency
+        self.load_latency = load_latency
+        self.response_tokens = response_tokens
+        self.models = dict(models or DEFAULT_MODELS)
+        self.reply = reply
+        self.embedding_dim = embedding_dim
+        self.model_latency = dict(model_latency or {})
+        self.request_counts = {}
+        self._loaded = set()
+        self._connections = set()  # Open client sockets, closed on stop() like a dead host
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL suitable for OLLAMA_HOST or ollama.Client(host=...)."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down, drop open keep-alive connections and release the port."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, path):
+        with self._lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+
+    def _load_delay(self, model):
+        with self._lock:
+            if model in self._loaded:
+                return 0.0
+            self._loaded.add(model)
+        return self.load_latency
+
+    def _tokens(self, messages):
+        """Produce the reply as a list of token strings."""
+        if self.reply is not None:
+            reply = self.reply(messages) if callable(self.reply) else self.reply
+            words = reply.split(" ")
+            return [w + (" " if i < len(words) - 1 else "") for i, w in enumerate(words)]
+        words = FILLER.split(" ")
+        return [words[i % len(words)] + " " for i in range(self.response_tokens)]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Small header/body writes must not wait on delayed ACKs
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server._connections.add(self.connection)
+
+            def finish(self):
+                with server._lock:
+                    server._connections.discard(self.connection)
+                super().finish()
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                return json.loads(body or b"{}")
+
+            def _send_json(self, payload, status=200):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                server._count(self.path)
+                if self.path == "/api/tags":
+                    self._send_json({"models": [
+                        {
+                            "name": name,
+                            "model": name,
+                            "modified_at": "2025-03-26T21:42:36Z",
+                            "size": meta["size"],
+                            "digest": hashlib.sha256(name.encode()).hexdigest(),
+                            "details": {
+                                "format": "gguf",
+                                "family": "llama",
+                                "parameter_size": "3.2B",
+                                "quantization_level": meta["quantization"],
+                            },
+                        }
+                        for name, meta in server.models.items()
+                    ]})
+                elif self.path in ("/", "/api/version"):
+                    self._send_json({"version": "0.0.0-mock"})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                server._count(self.path)
+                try:
+                    body = self._read_json()
+                except ValueError:
+                    self._send_json({"error": "invalid JSON"}, status=400)
+                    return
+                model = body.get("model", "")
+                if self.path in ("/api/chat", "/api/generate", "/api/show", "/api/embed") \
+                        and model not in server.models:
+                    self._send_json({"error": f"model '{model}' not found"}, status=404)
+                    return
+                if self.path == "/api/chat":
+                    self._chat(body, model, chat=True)
+                elif self.path == "/api/generate":
+                    self._chat(body, model, chat=False)
+                elif self.path == "/api/show":
+                    meta = server.models[model]
+                    self._send_json({
+                        "modelfile": f"FROM {model}",
+                        "parameters": f"num_ctx {meta['num_ctx']}" if meta.get("num_ctx") else "",
+                        "template": "{{ .Prompt }}",
+                        "details": {
+                            "format": "gguf",
+                            "family": "llama",
+                            "parameter_size": "3.2B",
+                            "quantization_level": meta["quantization"],
+                        },
+                        "model_info": {"llama.context_length": meta["context_length"]},
+                    })
+                elif self.path == "/api/embed":
+                    inputs = body.get("input", "")
+                    if isinstance(inputs, str):
+                        inputs = [inputs]
+                    self._send_json({
+                        "model": model,
+                        "embeddings": [server.embed(text) for text in inputs],
+                    })
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _chat(self, body, model, chat):
+                start = time.perf_counter()
+                messages = body.get("messages") or [{"role": "user", "content": body.get("prompt", "")}]
+                load = server._load_delay(model)
+                tokens = server._tokens(messages) if (messages and any(m.get("content") for m in messages)) else []
+                num_predict = (body.get("options") or {}).get("num_predict")
+                if num_predict is not None and num_predict >= 0:
+                    tokens = tokens[:num_predict]
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+                first_token_latency = server.model_latency.get(model, server.first_token_latency)
+                time.sleep(load + (first_token_latency if tokens else 0))
+                prompt_done = time.perf_counter()
+                interval = 1.0 / server.tokens_per_second if server.tokens_per_second else 0.0
+
+                def chunk(content, done=False):
+                    payload = {
+                        "model": model,
+                        "created_at": datetime.now(timezone.utc).isoformat(),
+                        "done": done,
+                    }
+                    if chat:
+                        payload["message"] = {"role": "assistant", "content": content}
+                    else:
+                        payload["response"] = content
+                    return payload
+
+                def final(content):
+                    end = time.perf_counter()
+                    payload = chunk(content, done=True)
+                    payload.update({
+                        "done_reason": "stop",
+                        "total_duration": int((end - start) * 1e9),
+                        "load_duration": int(load * 1e9),
+                        "prompt_eval_count": prompt_tokens,
+                        "prompt_eval_duration": int((prompt_done - start - load) * 1e9),
+                        "eval_count": len(tokens),
+                        "eval_duration": int((end - prompt_done) * 1e9),
+                    })
+                    return payload
+
+                if body.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    try:
+                        for i, token in enumerate(tokens):
+                            if i and interval:
+                                time.sleep(interval)
+                            self._write_chunk(chunk(token))
+                        self._write_chunk(final(""))
+                        self.wfile.write(b"0\r\n\r\n")
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+                else:
+                    if interval and tokens:
+                        time.sleep(interval * (len(tokens) - 1))
+                    self._send_json(final("".join(tokens)))
+
+            def _write_chunk(self, payload):
+                data = (json.dumps(payload) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def embed(self, text):
+        """Deterministic bag-of-words embedding so similar texts land close together."""
+        vector = [0.0] * self.embedding_dim
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            vector[digest[0] % self.embedding_dim] += 1.0 if digest[1] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+def main():
+    """Run the mock server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Ollama HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--load-latency", type=float, default=0.0)
+    parser.add_argument("--response-tokens", type=int, default=64)
+    args = parser.parse_args()
+
+    server = MockOllamaServer(
+        host=args.host,
+        port=args.port,
+        tokens_per_second=args.tokens_per_second,
+        first_token_latency=args.first_token_latency,
+        load_latency=args.load_latency,
+        response_tokens=args.response_tokens,
+    )
+    print(f"Mock Ollama server listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
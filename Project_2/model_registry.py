@@ -0,0 +1,170 @@
+"""
+Model Registry
+---------------------------------------------------------
+Cached view of the models available on the Ollama hosts. The listing is
+refreshed in the background once it is older than its time-to-live, so
+callers never block on /api/tags after the first load. Names are indexed for
+O(1) validation (with and without the ":latest" tag), close matches are
+suggested for typos, and per-model metadata from ollama.show (size,
+quantization, family, context length, num_ctx) is fetched once and cached.
+"""
+
+import difflib
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+
+
+def _normalize(name):
+    """Registry key for a model name: "llama3.2" and "llama3.2:latest" are the same model."""
+    name = name.strip()
+    return name[: -len(":latest")] if name.endswith(":latest") else name
+
+
+def _modified(value):
+    """Modification time from a listing entry (datetime, ISO string or epoch seconds)."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return None
+
+
+class ModelRegistry:
+    """TTL-cached, background-refreshed index of available models and their metadata."""
+
+    def __init__(self, pool, ttl=300.0):
+        """
+        Args:
+            pool (HostPool): Hosts whose listings are merged into the registry
+            ttl (float): Seconds before the listing is refreshed in the background
+        """
+        self.pool = pool
+        self.ttl = ttl
+        self.refreshed_at = 0.0
+        self._models = {}  # normalized name -> listing entry
+        self._metadata = {}  # normalized name -> ollama.show() details
+        self._lock = threading.Lock()
+        self._refreshing = None  # Thread running a background refresh
+        self._loaded = threading.Event()  # Set once the first refresh finished
+
+    def __contains__(self, name):
+        return _normalize(name) in self._models
+
+    def __len__(self):
+        return len(self._models)
+
+    @property
+    def stale(self):
+        return time.time() - self.refreshed_at > self.ttl
+
+    def refresh(self, background=False):
+        """
+        Re-query every host and rebuild the index.
+
+        Args:
+            background (bool): Refresh on a daemon thread and return immediately
+
+        Returns:
+            int: Number of healthy hosts (None when refreshing in the background)
+        """
+        if background:
+            with self._lock:
+                if self._refreshing is not None and self._refreshing.is_alive():
+                    return None
+                self._refreshing = threading.Thread(target=self.refresh, daemon=True)
+                self._refreshing.start()
+            return None
+
+        healthy = self.pool.check_all()
+        models = {}
+        for entry in self.pool.models()["models"]:
+            name = entry.get("model") or entry.get("name")
+            if name:
+                models[_normalize(name)] = dict(entry, name=name,
+                                                modified=_modified(entry.get("modified_at") or entry.get("modified")))
+        with self._lock:
+            if healthy or not self._models:
+                self._models = models
+            self.refreshed_at = time.time()
+        self._loaded.set()
+        return healthy
+
+    def wait(self, timeout=None):
+        """Wait for the first refresh; returns False if it did not finish in time."""
+        return self._loaded.wait(timeout)
+
+    def models(self):
+        """
+        Cached listing, refreshed in the background when older than the TTL.
+
+        Returns:
+            list: Listing entries sorted by name
+        """
+        if self.stale:
+            self.refresh(background=True)
+        with self._lock:
+            return [self._models[name] for name in sorted(self._models)]
+
+    def resolve(self, name):
+        """Listing entry for a model name, or None if no host has it."""
+        return self._models.get(_normalize(name))
+
+    def suggest(self, name, limit=3):
+        """Known model names closest to a (probably misspelled) name."""
+        with self._lock:
+            names = list(self._models)
+        return difflib.get_close_matches(_normalize(name), names, n=limit, cutoff=0.5)
+
+    def metadata(self, name):
+        """
+        Size, quantization, family and context sizes of a model.
+
+        The ollama.show() call is made once per model and cached.
+
+        Returns:
+            dict: Metadata, or None if the model could not be queried
+        """
+        key = _normalize(name)
+        with self._lock:
+            if key in self._metadata:
+                return self._metadata[key]
+
+        try:
+            shown = self.pool.call("show", model=name)
+            shown = shown.model_dump() if hasattr(shown, "model_dump") else dict(shown)
+        except Exception as e:
+            logging.warning(f"Could not query metadata for {name}: {str(e)}")
+            return None
+
+        details = shown.get("details") or {}
+        model_info = shown.get("modelinfo") or shown.get("model_info") or {}
+        context = next((value for key_name, value in model_info.items()
+                        if key_name.endswith(".context_length")), None)
+        num_ctx = re.search(r"^\s*num_ctx\s+(\d+)", shown.get("parameters") or "", re.MULTILINE)
+        entry = self.resolve(name) or {}
+        metadata = {
+            "name": name,
+            "size": entry.get("size"),
+            "modified": entry.get("modified"),
+            "family": details.get("family"),
+            "parameter_size": details.get("parameter_size"),
+            "quantization": details.get("quantization_level"),
+            "context_length": int(context) if context else None,  # Maximum the model supports
+            "num_ctx": int(num_ctx.group(1)) if num_ctx else None,  # Configured in the Modelfile
+            "hosts": entry.get("hosts", []),
+        }
+        with self._lock:
+            self._metadata[key] = metadata
+        return metadata
+
+    def cached_metadata(self, name):
+        """Metadata if already fetched, without querying the server."""
+        return self._metadata.get(_normalize(name))
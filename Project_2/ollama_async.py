@@ -0,0 +1,261 @@
+"""
+Asynchronous Ollama Interaction Suite
+---------------------------------------------------------
+asyncio-based variant of the interaction suite built on ollama.AsyncClient.
+Many prompts can be in flight at once, bounded by a concurrency limit that
+matches the server's OLLAMA_NUM_PARALLEL setting, while history, file output
+and token accounting stay consistent with the synchronous suite. Requests go
+through the suite's HostPool, so they are spread over every configured host
+with the same health checks and failover as synchronous calls. In latency
+SLO mode the per-command timeouts and token caps apply and slow requests are
+hedged, as in the synchronous suite (see LatencySLO.astream).
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from Ollama_elite import OllamaInteractionSuite, _as_dict, console
+from response_cache import ResponseCache, replay_chunks
+from token_budget import context_length, estimate_tokens
+
+
+def default_concurrency():
+    """Concurrency limit matching the server's OLLAMA_NUM_PARALLEL (default 4)."""
+    try:
+        return max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", "4")))
+    except ValueError:
+        return 4
+
+
+class AsyncOllamaInteractionSuite(OllamaInteractionSuite):
+    """Interaction suite whose requests run concurrently on an asyncio event loop."""
+
+    def __init__(self, default_model='llama3.2', max_concurrency=None, host=None, hosts=None, history_window=50):
+        """
+        Initialize the asynchronous suite.
+
+        Args:
+            default_model (str): Model used when none is given per request
+            max_concurrency (int, optional): Maximum requests in flight, defaults to OLLAMA_NUM_PARALLEL
+            host (str, optional): Ollama server URL, defaults to OLLAMA_HOST
+            hosts (list, optional): Ollama host URLs to balance across, instead of host
+            history_window (int): Most recent turns kept in memory and considered for the context window
+        """
+        super().__init__(default_model, hosts=hosts or ([host] if host else None), history_window=history_window)
+        self.max_concurrency = max_concurrency or default_concurrency()
+        self._semaphore = None
+        self._bound_loop = None
+
+    def _bind_loop(self):
+        """
+        Create the concurrency semaphore for the running event loop.
+
+        It is tied to the loop it was first used on, so a suite reused across
+        several asyncio.run() calls gets a fresh one for each loop (the host
+        pool does the same for its async clients).
+        """
+        loop = asyncio.get_running_loop()
+        if self._bound_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._bound_loop = loop
+        return self._semaphore
+
+    async def generate_response(self, prompt, model_name=None, stream=None, system_prompt=None,
+                                use_history=True, use_cache=True, on_chunk=None, command="chat", quiet=None):
+        """
+        Generate a response without blocking the event loop.
+
+        Args:
+            prompt (str): User query to process
+            model_name (str, optional): Model to use, defaults to instance default
+            stream (bool): Whether to use the streaming API
+            system_prompt (str, optional): System prompt to guide model behavior
+            use_history (bool): Send recent turns as context and record this exchange in the history
+            use_cache (bool): Serve from and store into the response cache when it is enabled
+            on_chunk (callable, optional): Called with each streamed content fragment
+            command (str): "chat", "code" or "summarize"; selects the limits of the latency SLO mode
+            quiet (bool, optional): Suppress the saved-file notice for this call, defaults to the suite's setting
+
+        Returns:
+            dict: Response data with content and metrics
+        """
+        await asyncio.to_thread(self._ensure_started)
+        model = model_name or self.default_model
+        stream = self.stream_mode if stream is None else stream
+
+        async with self._bind_loop():
+            start_time = time.time()
+            with self._state_lock:
+                self.interaction_count += 1
+
+            try:
+                messages = await asyncio.to_thread(
+                    self._build_messages, prompt, system_prompt, use_history, model
+                )
+                chunk_times = None
+                slo = self.latency_slo
+                request_options = slo.options_for(command) if slo is not None else None
+                options, keep_alive = self._request_settings(model, request_options)
+                cache = self.response_cache if use_cache else None
+                key = ResponseCache.make_key(model, messages, options) if cache is not None else None
+                cached = cache.get(key) if cache is not None else None
+
+                if cached is not None:
+                    response = dict(cached, cached=True)
+                    if stream and on_chunk:
+                        for chunk in replay_chunks(response):
+                            if chunk["message"]["content"]:
+                                on_chunk(chunk["message"]["content"])
+                elif stream or slo is not None:
+                    # The SLO races streams, so its responses are streamed even when not displayed as such
+                    response = {"message": {"content": ""}}
+                    parts = []
+                    chunk_times = []
+                    async for chunk in self._chat_stream(model, messages, options, keep_alive, request_options,
+                                                         command):
+                        chunk = _as_dict(chunk)
+                        content = chunk.get("message", {}).get("content", "")
+                        if content:
+                            chunk_times.append(time.time())
+                            if not parts:
+                                response["ttft"] = chunk_times[0] - start_time
+                            parts.append(content)
+                            if on_chunk and stream:
+                                on_chunk(content)
+                        if chunk.get("done"):
+                            response.update({k: v for k, v in chunk.items() if k != "message"})
+                    response["message"]["content"] = "".join(parts)
+                    if not stream:
+                        chunk_times = None
+                else:
+                    response = _as_dict(await self.pool.acall("chat", model, messages=messages, options=options,
+                                                              keep_alive=keep_alive))
+
+                # An answer from a hedge model is not stored under the primary model's key
+                if cache is not None and cached is None and "message" in response \
+                        and response.get("winner", "primary") == "primary":
+                    cache.put(key, response)
+
+                # Accounting and file output run off the event loop
+                await asyncio.to_thread(self._finalize_response, prompt, response, start_time, stream, use_history,
+                                        messages, model, chunk_times, quiet)
+                return response
+
+            except Exception as e:
+                error_msg = f"Error generating response: {str(e)}"
+                logging.error(error_msg)
+                return {"error": error_msg}
+
+    def _chat_stream(self, model, messages, options, keep_alive, request_options=None, command="chat"):
+        """Async iterator of chat chunks from the host pool, through the latency SLO when it is enabled."""
+        slo = self.latency_slo
+        if slo is None:
+            return self.pool.astream("chat", model, messages=messages, options=options, keep_alive=keep_alive)
+
+        def open_stream(racer_model):
+            racer_options, racer_keep_alive = self._request_settings(racer_model, request_options)
+            return (_as_dict(chunk) async for chunk in self.pool.astream(
+                "chat", racer_model, messages=messages, options=racer_options, keep_alive=racer_keep_alive))
+
+        return slo.astream(open_stream, model, command)
+
+    async def _achat(self, model, messages, command="chat"):
+        """
+        _chat() for the event loop: one non-streamed request, bounded by max_concurrency.
+
+        Nothing is cached, recorded in the history or written to the output
+        directory; errors are raised.
+        """
+        async with self._bind_loop():
+            slo = self.latency_slo
+            request_options = slo.options_for(command) if slo is not None else None
+            options, keep_alive = self._request_settings(model, request_options)
+            if slo is None:
+                return _as_dict(await self.pool.acall("chat", model, messages=messages, options=options,
+                                                      keep_alive=keep_alive))
+            # The SLO races streams, so its response is assembled from chunks
+            parts = []
+            final = {}
+            async for chunk in self._chat_stream(model, messages, options, keep_alive, request_options, command):
+                chunk = _as_dict(chunk)
+                parts.append(chunk.get("message", {}).get("content", ""))
+                if chunk.get("done"):
+                    final = chunk
+            response = {key: value for key, value in final.items() if key != "message"}
+            response["message"] = {"role": "assistant", "content": "".join(parts)}
+            return response
+
+    async def gather(self, prompts, model_name=None, system_prompt=None, use_history=True):
+        """
+        Fan out many prompts concurrently, bounded by max_concurrency.
+
+        Args:
+            prompts (iterable): Prompts to process
+            model_name (str, optional): Model to use for every prompt
+            system_prompt (str, optional): System prompt shared by every prompt
+            use_history (bool): Send recent turns as context and record each exchange
+
+        Returns:
+            list: Response dicts in the same order as the prompts
+        """
+        return await asyncio.gather(*(
+            self.generate_response(prompt, model_name=model_name, stream=False, system_prompt=system_prompt,
+                                   use_history=use_history)
+            for prompt in prompts
+        ))
+
+    async def code_generation(self, prompt, language="python", use_history=True):
+        """Generate code based on user requirements without blocking the event loop."""
+        response = await self.generate_response(prompt, stream=False, system_prompt=self._code_system_prompt(language),
+                                                use_history=use_history, command="code")
+
+        if "error" in response:
+            return response
+
+        await asyncio.to_thread(self._save_code_blocks, response, language)
+        return response
+
+    async def ask(self, prompt, **kwargs):
+        """Answer a plain prompt, through the hybrid router when routing is enabled."""
+        if self.router is not None:
+            return await self.router.aroute(prompt, **kwargs)
+        return await self.generate_response(prompt, **kwargs)
+
+    async def document_summarization(self, text, use_history=True):
+        """Summarize a document or long text without blocking the event loop, chunked if it is long."""
+        if estimate_tokens(text) > context_length(self.default_model) // 2:
+            return await self._get_summarizer().asummarize_text(text, use_history=use_history)
+        return await self.generate_response(
+            self._summary_prompt(text), stream=False, system_prompt=self.SUMMARY_SYSTEM_PROMPT,
+            use_history=use_history, command="summarize"
+        )
+
+    async def summarize_file(self, path, use_history=True):
+        """Summarize a text file of any size without blocking the event loop."""
+        try:
+            return await self._get_summarizer().asummarize_file(path, use_history=use_history)
+        except OSError as e:
+            return {"error": f"Could not read {path}: {str(e)}"}
+
+
+async def _demo(prompts):
+    suite = AsyncOllamaInteractionSuite()
+    console.print(f"[info]Sending {len(prompts)} prompts with up to {suite.max_concurrency} in flight...")
+    start = time.time()
+    try:
+        responses = await suite.gather(prompts)
+        for prompt, response in zip(prompts, responses):
+            console.print(f"[prompt]{prompt}")
+            suite.format_response(response)
+        console.print(f"[metrics]{len(prompts)} prompts in {time.time() - start:.2f} seconds")
+        suite.display_session_stats()
+    finally:
+        await asyncio.to_thread(suite.close)
+
+
+if __name__ == "__main__":
+    import sys
+
+    asyncio.run(_demo(sys.argv[1:] or ["What is a for loop?", "What is a while loop?"]))
@@ -0,0 +1,47 @@
+"""
+Ollama Host Configuration
+---------------------------------------------------------
+Which Ollama servers to talk to, shared by the suite's HostPool and the
+one-shot CLI so both read the same settings the same way: explicit hosts
+first, then the OLLAMA_HOSTS environment variable (comma separated), then
+OLLAMA_HOST, then the local default. Every value is normalized to a base URL
+following the ollama client's rules. Standard library only, so the one-shot
+CLI can use it without importing the ollama package.
+"""
+
+import os
+
+DEFAULT_PORT = 11434
+
+
+def base_url(host):
+    """
+    Normalize an OLLAMA_HOST style value into a base URL.
+
+    Accepts "host", "host:port", "scheme://host[:port][/path]"; the scheme
+    defaults to http and the port to 11434 (443 for https).
+    """
+    host = (host or "").strip() or f"127.0.0.1:{DEFAULT_PORT}"
+    if "://" not in host:
+        host = "http://" + host
+    scheme, rest = host.split("://", 1)
+    netloc, _, path = rest.partition("/")
+    if ":" not in netloc.rsplit("]", 1)[-1]:
+        netloc += ":443" if scheme == "https" else f":{DEFAULT_PORT}"
+    path = path.rstrip("/")
+    return f"{scheme}://{netloc}" + (f"/{path}" if path else "")
+
+
+def configured_hosts(hosts=None):
+    """
+    Base URLs of the hosts to use, in order of preference.
+
+    Args:
+        hosts (list, optional): Explicit hosts; OLLAMA_HOSTS, then OLLAMA_HOST if omitted or empty
+
+    Returns:
+        list: At least one base URL
+    """
+    if not hosts:
+        hosts = [h.strip() for h in os.environ.get("OLLAMA_HOSTS", "").split(",") if h.strip()]
+    return [base_url(host) for host in hosts or [os.environ.get("OLLAMA_HOST", "")]]
@@ -0,0 +1,127 @@
+"""
+Ollama One-Shot CLI
+---------------------------------------------------------
+Fast, non-interactive path for scripted use: send one prompt, write the
+answer to stdout and exit. Unlike the interactive suite it imports neither
+rich nor the ollama package and keeps no history, so start-up cost is little
+more than the interpreter itself. Talks to the Ollama HTTP API directly and
+falls over to the next host in OLLAMA_HOSTS if one is unreachable; hosts are
+read the same way as by the suite (see ollama_hosts.py).
+
+    python ollama_oneshot.py "Explain list comprehensions"
+    echo "Summarize this" | python ollama_oneshot.py -m llama3.2:1b
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+from ollama_hosts import configured_hosts
+
+DEFAULT_MODEL = "llama3.2"
+
+
+def chat(prompt, model=DEFAULT_MODEL, system_prompt=None, stream=True, host=None, timeout=300, out=None):
+    """
+    Send one chat request and write the answer to out as it arrives.
+
+    Args:
+        prompt (str): User prompt
+        model (str): Model name
+        system_prompt (str, optional): System prompt
+        stream (bool): Write tokens as they are generated
+        host (str, optional): Ollama host, OLLAMA_HOSTS / OLLAMA_HOST if omitted
+        timeout (float): Socket timeout in seconds
+        out (file, optional): Where to write the answer, nothing is written if omitted
+
+    Returns:
+        dict: The final response with the complete message content
+    """
+    messages = [{"role": "user", "content": prompt}]
+    if system_prompt:
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    payload = json.dumps({"model": model, "messages": messages, "stream": stream}).encode("utf-8")
+
+    error = None
+    for candidate in configured_hosts([host] if host else None):
+        request = urllib.request.Request(candidate + "/api/chat", data=payload,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            response = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", "replace")
+            try:
+                detail = json.loads(detail).get("error", detail)
+            except ValueError:
+                pass
+            raise RuntimeError(f"Ollama returned {e.code}: {detail}") from None
+        except (urllib.error.URLError, OSError) as e:
+            error = e
+            continue
+        with response:
+            return _read_response(response, stream, out)
+    raise ConnectionError(f"Could not reach Ollama: {getattr(error, 'reason', error)}")
+
+
+def _read_response(response, stream, out):
+    """Read a (streamed) chat response, echoing content to out."""
+    if not stream:
+        result = json.loads(response.read())
+        if out is not None:
+            out.write(result.get("message", {}).get("content", ""))
+        return result
+
+    parts = []
+    result = {}
+    for line in response:
+        if not line.strip():
+            continue
+        chunk = json.loads(line)
+        if chunk.get("error"):
+            raise RuntimeError(chunk["error"])
+        content = chunk.get("message", {}).get("content", "")
+        if content:
+            parts.append(content)
+            if out is not None:
+                out.write(content)
+                out.flush()
+        if chunk.get("done"):
+            result = chunk
+    result["message"] = {"role": "assistant", "content": "".join(parts)}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send one prompt to Ollama and print the answer")
+    parser.add_argument("prompt", nargs="*", help="Prompt text (read from stdin if omitted)")
+    parser.add_argument("-m", "--model", default=os.environ.get("OLLAMA_MODEL", DEFAULT_MODEL), help="Model name")
+    parser.add_argument("-s", "--system", help="System prompt")
+    parser.add_argument("--host", help="Ollama host (default: OLLAMA_HOSTS / OLLAMA_HOST)")
+    parser.add_argument("--no-stream", action="store_true", help="Print the answer only once it is complete")
+    parser.add_argument("--json", action="store_true", help="Print the full response as JSON instead of text")
+    parser.add_argument("--timeout", type=float, default=300, help="Request timeout in seconds")
+    args = parser.parse_args(argv)
+
+    prompt = " ".join(args.prompt) if args.prompt else sys.stdin.read()
+    if not prompt.strip():
+        parser.error("no prompt given")
+
+    try:
+        response = chat(prompt, args.model, args.system, stream=not (args.no_stream or args.json),
+                        host=args.host, timeout=args.timeout, out=None if args.json else sys.stdout)
+    except (ConnectionError, RuntimeError, OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(response, ensure_ascii=False))
+    else:
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
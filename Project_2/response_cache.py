@@ -0,0 +1,205 @@
+"""
+Response Cache
+---------------------------------------------------------
+Content-addressed cache for chat responses. Entries are keyed on a hash of
+(model, options, messages) and kept in two tiers: an in-memory LRU and an
+optional SQLite file on disk, both with size limits and a time-to-live.
+Cached responses can be replayed as a stream of chunks so streaming callers
+render them through the same code path as live responses.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache of chat responses with TTL eviction."""
+
+    def __init__(self, max_entries=256, ttl=24 * 3600, disk_path=None, max_disk_entries=10_000):
+        """
+        Args:
+            max_entries (int): Maximum responses kept in memory
+            ttl (float): Seconds an entry stays valid (0 or None disables expiry)
+            disk_path (str, optional): SQLite file for the on-disk tier, memory only if omitted
+            max_disk_entries (int): Maximum responses kept on disk
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._puts_since_evict = 0
+
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model, messages, options=None):
+        """Hash the parts of a request that determine its response."""
+        payload = json.dumps(
+            {"model": model, "options": options or {}, "messages": messages},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created, now):
+        return bool(self.ttl) and now - created > self.ttl
+
+    def get(self, key):
+        """
+        Look up a response, checking memory first and then disk.
+
+        Args:
+            key (str): Key from make_key()
+
+        Returns:
+            dict: The cached response, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created = row
+                    if not self._expired(created, now):
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        value = json.loads(value)
+                        self._remember(key, created, value)
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Store a response in both tiers.
+
+        Args:
+            key (str): Key from make_key()
+            value (dict): JSON-serializable response
+        """
+        now = time.time()
+        value = {k: v for k, v in value.items() if k not in ("cached", "ttft")}
+        with self._lock:
+            self._remember(key, now, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now),
+                )
+                self._puts_since_evict += 1
+                if self._puts_since_evict >= 32:
+                    self._evict_disk(now)
+                self._db.commit()
+
+    def _remember(self, key, created, value):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        """Drop expired rows, then the least recently used rows beyond the size limit."""
+        self._puts_since_evict = 0
+        if self.ttl:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self):
+        """Apply pending evictions and close the disk tier."""
+        with self._lock:
+            if self._db is not None:
+                self._evict_disk(time.time())
+                self._db.commit()
+                self._db.close()
+                self._db = None
+
+    def stats(self):
+        """Hit/miss counters and current sizes."""
+        with self._lock:
+            disk_entries = 0
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+
+def replay_chunks(response, chunk_chars=24):
+    """
+    Replay a cached response as a sequence of streamed chunks.
+
+    Content is split into small pieces on whitespace so it renders like a
+    live stream; the final chunk carries the stored metrics and done=True.
+
+    Args:
+        response (dict): Cached response
+        chunk_chars (int): Approximate characters per chunk
+
+    Yields:
+        dict: Chunks shaped like ollama.chat(stream=True) output
+    """
+    content = response.get("message", {}).get("content", "")
+    model = response.get("model")
+    start = 0
+    while start < len(content):
+        end = min(len(content), start + chunk_chars)
+        split = content.rfind(" ", start + 1, end)
+        if end < len(content) and split > start:
+            end = split + 1
+        yield {"model": model, "message": {"role": "assistant", "content": content[start:end]}, "done": False}
+        start = end
+
+    final = {key: value for key, value in response.items() if key != "message"}
+    final["message"] = {"role": "assistant", "content": ""}
+    final["done"] = True
+    yield final
@@ -0,0 +1,418 @@
+"""
+Semantic Memory
+---------------------------------------------------------
+Embedding-based recall of earlier conversation turns. Each turn is embedded
+once, right after it is written, on a background thread. Vectors are
+L2-normalized and appended to a float32 matrix file next to the history
+file, with a parallel file holding each turn's byte offset in the
+HistoryStore, so the index survives restarts and only ever grows by the new
+turns. Recall memory-maps the matrix and scores every stored turn with a
+single matrix-vector product; with lsh_bits set, random-hyperplane hashing
+narrows the candidates first for very long histories. When the history file
+is compacted the offsets are remapped and dropped turns removed, without
+re-embedding anything.
+
+Embedding the query is the one network call on the prompt's path, so it is
+bounded by recall_timeout (recall is skipped when the embedder is slower)
+and recent query vectors are cached.
+"""
+
+import concurrent.futures
+import json
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+META_VERSION = 1
+
+_STOP = object()
+
+
+class SemanticMemory:
+    """Memory-mapped embedding index over the turns of a HistoryStore."""
+
+    def __init__(self, history_store, embed, model="nomic-embed-text", batch_size=16, lsh_bits=0,
+                 lsh_tables=4, lsh_min_rows=4096, seed=0, recall_timeout=2.0, query_cache_size=128):
+        """
+        Args:
+            history_store (HistoryStore): Store whose turns are indexed; index files are kept next to it
+            embed (callable): embed(model, texts) -> one vector per text
+            model (str): Embedding model
+            batch_size (int): Maximum turns embedded per call
+            lsh_bits (int): Hyperplanes per hash table of the approximate index, 0 for exact search only
+            lsh_tables (int): Hash tables of the approximate index
+            lsh_min_rows (int): Below this many rows search is always exact
+            seed (int): Seed of the random hyperplanes
+            recall_timeout (float, optional): Seconds recall() waits for the query embedding, None to wait indefinitely
+            query_cache_size (int): Query embeddings kept for repeated prompts
+        """
+        self.store = history_store
+        self.embed = embed
+        self.model = model
+        self.batch_size = batch_size
+        self.lsh_bits = lsh_bits
+        self.lsh_tables = lsh_tables
+        self.lsh_min_rows = lsh_min_rows
+        self.seed = seed
+        self.recall_timeout = recall_timeout
+        self.query_cache_size = query_cache_size
+        self.vectors_path = history_store.path + ".vectors"
+        self.offsets_path = history_store.path + ".offsets"
+        self.meta_path = history_store.path + ".vectors.json"
+        self.dim = None
+        self.embedded = 0
+        self.failures = 0
+        self.recall_timeouts = 0
+        self._count = 0
+        self._view = None  # (count, vectors, offsets) mapped from disk
+        self._files = None  # (vectors file, offsets file) opened for appending
+        self._planes = None
+        self._buckets = None  # One {signature: [row, ...]} per hash table
+        self._generation = 0  # Bumped by clear()/remap() so in-flight embeddings of old offsets are dropped
+        self._lock = threading.RLock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._queries = OrderedDict()  # text -> query vector, least recently used first
+        self._query_executor = None
+        self._load()
+
+    def __len__(self):
+        return self._count
+
+    def _load(self):
+        """Open an existing index, discarding it if it was built with another model."""
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+        if not meta or meta.get("version") != META_VERSION or meta.get("model") != self.model:
+            if meta:
+                logging.info(f"Discarding semantic index built with {meta.get('model')}, now using {self.model}")
+            self._reset_files()
+            return
+        self.dim = meta["dim"]
+        try:
+            rows = os.path.getsize(self.vectors_path) // (4 * self.dim)
+            # A crash between the two appends leaves one file longer; the shorter one wins
+            self._count = min(rows, os.path.getsize(self.offsets_path) // 8)
+        except OSError:
+            self._reset_files()
+
+    def _reset_files(self):
+        self._close_files()
+        for path in (self.vectors_path, self.offsets_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.dim = None
+        self._count = 0
+        self._view = None
+        self._planes = None
+        self._buckets = None
+
+    def _close_files(self):
+        if self._files is not None:
+            for f in self._files:
+                f.close()
+            self._files = None
+
+    def _open_files(self):
+        if self._files is None:
+            vectors, offsets = open(self.vectors_path, "ab"), open(self.offsets_path, "ab")
+            # Drop a torn tail so both files describe the same rows
+            vectors.truncate(self._count * 4 * self.dim)
+            offsets.truncate(self._count * 8)
+            self._files = (vectors, offsets)
+        return self._files
+
+    def add(self, offset, text):
+        """Queue a turn (by its HistoryStore offset) to be embedded in the background."""
+        if not text or not text.strip():
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+        self._queue.put((self._generation, offset, text))
+
+    def backfill(self):
+        """
+        Queue every stored turn that is not indexed yet (turns from before the
+        memory was enabled). Runs on a background thread.
+        """
+        def work():
+            _, offsets = self._matrix()
+            indexed = set(offsets.tolist())
+            for offset, turn in self.store.iter_records():
+                if offset not in indexed:
+                    self.add(offset, turn.get("content", ""))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(entry is _STOP for entry in batch)
+            batch = [entry for entry in batch if entry is not _STOP]
+            if batch:
+                self._embed_batch(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _embed_batch(self, batch):
+        try:
+            vectors = np.asarray(self.embed(self.model, [text for _, _, text in batch]), dtype=np.float32)
+        except Exception as e:
+            self.failures += len(batch)
+            logging.warning(f"Could not embed {len(batch)} conversation turns: {str(e)}")
+            return
+        with self._lock:
+            current = [i for i, (generation, _, _) in enumerate(batch) if generation == self._generation]
+            if current:
+                self._append([batch[i][1] for i in current], vectors[current])
+
+    def _append(self, offsets, vectors):
+        """Append normalized rows for offsets to both index files."""
+        if vectors.ndim != 2 or not len(vectors):
+            return
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"version": META_VERSION, "model": self.model, "dim": self.dim}, f)
+        if vectors.shape[1] != self.dim:
+            self.failures += len(vectors)
+            logging.warning(f"Embedding size changed from {self.dim} to {vectors.shape[1]}; turns not indexed")
+            return
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        vectors_file, offsets_file = self._open_files()
+        vectors_file.write(vectors.astype(np.float32).tobytes())
+        vectors_file.flush()
+        offsets_file.write(np.asarray(offsets, dtype=np.int64).tobytes())
+        offsets_file.flush()
+        first_row = self._count
+        self._count += len(vectors)
+        self.embedded += len(vectors)
+        if self._buckets is not None:
+            self._hash_rows(vectors, first_row)
+
+    def _matrix(self):
+        """
+        Memory-mapped (vectors, offsets) of the indexed rows.
+
+        The mapping is reused until rows are added.
+        """
+        with self._lock:
+            if self._view is not None and self._view[0] == self._count:
+                return self._view[1], self._view[2]
+            if not self._count:
+                return np.zeros((0, self.dim or 1), dtype=np.float32), np.zeros(0, dtype=np.int64)
+            if self._files is not None:
+                for f in self._files:
+                    f.flush()
+            vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._count, self.dim))
+            offsets = np.memmap(self.offsets_path, dtype=np.int64, mode="r", shape=(self._count,))
+            self._view = (self._count, vectors, offsets)
+            return vectors, offsets
+
+    def _signatures(self, vectors):
+        """One integer hash per row and table: the signs of the projections onto the hyperplanes."""
+        weights = 1 << np.arange(self.lsh_bits, dtype=np.int64)
+        projections = np.einsum("nd,tbd->tnb", vectors, self._planes)
+        return ((projections > 0) * weights).sum(axis=2)  # (tables, rows)
+
+    def _hash_rows(self, vectors, first_row):
+        for table, signatures in zip(self._buckets, self._signatures(vectors)):
+            for row, signature in enumerate(signatures.tolist(), first_row):
+                table.setdefault(signature, []).append(row)
+
+    def _candidates(self, query, vectors):
+        """Rows sharing a hash bucket with the query, or None to search every row."""
+        if not self.lsh_bits or len(vectors) < self.lsh_min_rows:
+            return None
+        with self._lock:
+            if self._buckets is None:
+                rng = np.random.default_rng(self.seed)
+                self._planes = rng.standard_normal((self.lsh_tables, self.lsh_bits, self.dim)).astype(np.float32)
+                self._buckets = [{} for _ in range(self.lsh_tables)]
+                self._hash_rows(np.asarray(vectors), 0)
+            rows = set()
+            for table, signature in zip(self._buckets, self._signatures(query[None, :])[:, 0].tolist()):
+                rows.update(table.get(signature, ()))
+        return np.fromiter((row for row in rows if row < len(vectors)), dtype=np.int64)
+
+    def search(self, query, k=4):
+        """
+        Indexed turns most similar to a query vector.
+
+        Args:
+            query (array-like): Query embedding
+            k (int): Number of results
+
+        Returns:
+            list: (offset, cosine similarity) pairs, most similar first
+        """
+        vectors, offsets = self._matrix()
+        if not len(vectors) or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        rows = self._candidates(query, vectors)
+        if rows is not None and len(rows) >= k:
+            scores = vectors[rows] @ query
+        else:
+            rows = None
+            scores = vectors @ query  # One vectorized pass over every stored turn
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        if rows is not None:
+            return [(int(offsets[rows[i]]), float(scores[i])) for i in top]
+        return [(int(offsets[i]), float(scores[i])) for i in top]
+
+    def _remember_query(self, text, vector):
+        with self._lock:
+            self._queries[text] = vector
+            self._queries.move_to_end(text)
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+
+    def _query_vector(self, text):
+        """
+        Embedding of a query, from the cache or the embedder within recall_timeout.
+
+        A late embedding is still cached, so asking again does not wait a second time.
+
+        Returns:
+            The vector, or None if the embedder did not answer in time
+        """
+        with self._lock:
+            vector = self._queries.get(text)
+            if vector is not None:
+                self._queries.move_to_end(text)
+                return vector
+            if self._query_executor is None:
+                self._query_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="semantic-recall"
+                )
+        def embed_query():
+            vector = self.embed(self.model, [text])[0]
+            self._remember_query(text, vector)
+            return vector
+
+        future = self._query_executor.submit(embed_query)
+        try:
+            return future.result(self.recall_timeout)
+        except concurrent.futures.TimeoutError:
+            self.recall_timeouts += 1
+            logging.warning(f"Embedding the prompt took over {self.recall_timeout:g}s; recall skipped")
+            return None
+
+    def recall(self, text, k=4, exclude=(), min_score=0.3):
+        """
+        Earlier turns relevant to a text.
+
+        Args:
+            text (str): Usually the new prompt
+            k (int): Maximum turns returned
+            exclude (collection): Contents to skip, e.g. turns already in the context window
+            min_score (float): Minimum cosine similarity
+
+        Returns:
+            list: (score, turn) pairs, most relevant first; empty if the prompt was not embedded in time
+        """
+        if not self._count:
+            return []
+        query = self._query_vector(text)
+        if query is None:
+            return []
+        recalled = []
+        seen = set()  # A turn appended while a backfill ran may be indexed twice
+        for offset, score in self.search(query, 2 * k + len(exclude)):
+            if score < min_score:
+                break
+            if offset in seen:
+                continue
+            seen.add(offset)
+            turn = self.store.read_at(offset)
+            if turn is not None and turn.get("content") not in exclude:
+                recalled.append((score, turn))
+                if len(recalled) == k:
+                    break
+        return recalled
+
+    def remap(self, mapping):
+        """
+        Follow a HistoryStore compaction: rewrite offsets, drop rows of removed turns.
+
+        Args:
+            mapping (dict): Old byte offset -> new byte offset, from HistoryStore.compact()
+        """
+        self.flush()
+        with self._lock:
+            self._generation += 1
+            vectors, offsets = self._matrix()
+            keep = np.fromiter((offset in mapping for offset in offsets.tolist()), dtype=bool, count=len(offsets))
+            new_vectors = np.array(vectors[keep])
+            new_offsets = np.fromiter((mapping[offset] for offset in offsets[keep].tolist()), dtype=np.int64,
+                                      count=int(keep.sum()))
+            self._view = None
+            del vectors, offsets
+            self._close_files()
+            for path, data in ((self.vectors_path, new_vectors), (self.offsets_path, new_offsets)):
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data.tobytes())
+                os.replace(tmp_path, path)
+            self._count = len(new_offsets)
+            self._buckets = None
+            return self._count
+
+    def clear(self):
+        """Forget every embedding."""
+        with self._lock:
+            self._generation += 1
+            self._reset_files()
+
+    def flush(self):
+        """Wait until every queued turn has been embedded."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Embed what is queued, stop the worker and close the index files."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._close_files()
+            if self._query_executor is not None:
+                self._query_executor.shutdown(wait=False, cancel_futures=True)
+                self._query_executor = None
+
+    def stats(self):
+        """Index size and embedding counters."""
+        return {
+            "rows": self._count,
+            "dim": self.dim,
+            "pending": self._queue.unfinished_tasks,
+            "embedded": self.embedded,
+            "failures": self.failures,
+            "recall_timeouts": self.recall_timeouts,
+            "approximate": bool(self.lsh_bits) and self._count >= self.lsh_min_rows,
+        }
@@ -0,0 +1,121 @@
+"""
+Streaming Renderer
+---------------------------------------------------------
+Low-overhead terminal rendering of streamed responses. Chunks are buffered
+and the display is refreshed at a fixed frame rate through rich.live.Live
+instead of writing to the terminal once per token. Output is rendered as
+Markdown incrementally: blocks that are complete (ended by a blank line
+outside a code fence) are printed once and frozen above the live region, so
+each frame only re-renders the block still being written.
+"""
+
+import time
+
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.text import Text
+
+
+def _split_point(text):
+    """Offset just past the last blank line that is not inside a code fence (0 if none)."""
+    index = text.rfind("\n\n")
+    while index > 0:
+        if text.count("```", 0, index) % 2 == 0:
+            return index + 2
+        index = text.rfind("\n\n", 0, index)
+    return 0
+
+
+class StreamRenderer:
+    """Buffers streamed text and renders it as Markdown at a bounded frame rate."""
+
+    def __init__(self, console=None, refresh_per_second=12, markdown=True, status=None):
+        """
+        Args:
+            console (Console, optional): Console to render to, buffer only if omitted
+            refresh_per_second (float): Maximum display refreshes per second
+            markdown (bool): Render Markdown, plain text otherwise
+            status (Status, optional): Spinner shown until the first chunk arrives
+        """
+        self.console = console
+        self.interval = 1.0 / refresh_per_second if refresh_per_second else 0.0
+        self.markdown = markdown
+        self.status = status
+        self.chunks = 0
+        self.frames = 0
+        self.render_seconds = 0.0  # Time spent building and drawing frames
+        self._parts = []  # Chunks received since the last frame
+        self._blocks = []  # Completed blocks already printed above the live region
+        self._pending = ""  # Text of the block still being written
+        self._live = None
+        self._last_frame = 0.0
+
+    def __enter__(self):
+        if self.status is not None:
+            self.status.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def text(self):
+        """Everything received so far."""
+        return "".join(self._blocks) + self._pending + "".join(self._parts)
+
+    def feed(self, content):
+        """Buffer a chunk of content, refreshing the display if a frame is due."""
+        if not content:
+            return
+        self._parts.append(content)
+        self.chunks += 1
+        if self.console is None:
+            return
+        now = time.perf_counter()
+        if self._live is None or now - self._last_frame >= self.interval:
+            self._frame(now)
+
+    def _renderable(self, text):
+        return Markdown(text) if self.markdown else Text(text)
+
+    def _frame(self, now, final=False):
+        """Fold buffered chunks into the pending block, print completed blocks and redraw."""
+        self._pending += "".join(self._parts)
+        self._parts.clear()
+
+        if self._live is None:
+            if self.status is not None:
+                self.status.stop()
+                self.status = None
+            self._live = Live(console=self.console, auto_refresh=False, vertical_overflow="visible")
+            self._live.start()
+
+        split = len(self._pending) if final else _split_point(self._pending)
+        if split and self.markdown:
+            done, self._pending = self._pending[:split], self._pending[split:]
+            self._blocks.append(done)
+            self._live.update(Text(""))
+            self._live.console.print(self._renderable(done))
+        self._live.update(self._renderable(self._pending), refresh=True)
+        self.frames += 1
+        self.render_seconds += time.perf_counter() - now
+        self._last_frame = time.perf_counter()
+
+    def close(self):
+        """
+        Render whatever is still buffered and stop the live display.
+
+        Returns:
+            str: The complete text
+        """
+        if self.status is not None:
+            self.status.stop()
+            self.status = None
+        if self.console is not None and (self._parts or self._live is not None):
+            now = time.perf_counter()
+            self._frame(now, final=True)
+            start = time.perf_counter()
+            self._live.stop()
+            self._live = None
+            self.render_seconds += time.perf_counter() - start
+        return self.text
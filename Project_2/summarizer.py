@@ -0,0 +1,338 @@
+"""
+Chunked Document Summarization
+---------------------------------------------------------
+Map-reduce summarization for documents larger than the model's context
+window. Text is split on paragraph and sentence boundaries into chunks that
+fit a per-model token budget, the chunks are summarized concurrently, and
+the partial summaries are reduced recursively until they fit into a single
+final request. Chunks are produced lazily and handed to the workers as they
+free up, so only the chunks in flight and the (much shorter) summaries are
+held in memory. Chunk and reduce requests go straight to the model; only the
+final summary is recorded like any other response. Chunk summaries are
+cached by content, so re-summarizing an edited document only recomputes the
+chunks that changed. The asummarize_* methods run the same pipeline for the
+asyncio suite.
+"""
+
+import asyncio
+import itertools
+import logging
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from response_cache import ResponseCache
+from token_budget import context_length, estimate_tokens
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+CHUNK_SYSTEM_PROMPT = """You are summarizing one section of a longer document.
+        Summarize the section faithfully and concisely, keeping names, numbers,
+        definitions and conclusions. Do not add an introduction or refer to
+        "this section"; the summaries of all sections will be combined later.
+        """
+
+REDUCE_PROMPT = "The following are summaries of consecutive parts of one document. Combine them:\n\n{text}"
+
+
+def iter_paragraphs(lines):
+    """
+    Group a stream of lines into paragraphs separated by blank lines.
+
+    Args:
+        lines (iterable): Lines of text, e.g. an open file
+
+    Yields:
+        str: One paragraph at a time
+    """
+    current = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            current.append(line)
+        elif current:
+            yield "\n".join(current)
+            current = []
+    if current:
+        yield "\n".join(current)
+
+
+def _split_oversized(paragraph, budget):
+    """Split a paragraph that exceeds the budget on sentence, then word, boundaries."""
+    pieces = []
+    for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+        if estimate_tokens(sentence) <= budget:
+            pieces.append(sentence)
+            continue
+        words, current = sentence.split(" "), []
+        for word in words:
+            if current and estimate_tokens(" ".join(current + [word])) > budget:
+                pieces.append(" ".join(current))
+                current = []
+            current.append(word)
+        if current:
+            pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_paragraphs(paragraphs, budget):
+    """
+    Pack paragraphs greedily into chunks of at most budget tokens.
+
+    Args:
+        paragraphs (iterable): Paragraph strings, consumed lazily
+        budget (int): Maximum estimated tokens per chunk
+
+    Yields:
+        str: Chunks of text
+    """
+    current, current_tokens = [], 0
+    for paragraph in paragraphs:
+        pieces = [paragraph] if estimate_tokens(paragraph) <= budget else _split_oversized(paragraph, budget)
+        for piece in pieces:
+            tokens = estimate_tokens(piece) + 1
+            if current and current_tokens + tokens > budget:
+                yield "\n\n".join(current)
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        yield "\n\n".join(current)
+
+
+class ChunkedSummarizer:
+    """Summarize arbitrarily long text with concurrent map-reduce over chunks."""
+
+    def __init__(self, suite, model=None, chunk_tokens=None, max_workers=4,
+                 cache_path="summary_cache.sqlite", max_levels=6):
+        """
+        Args:
+            suite (OllamaInteractionSuite): Suite used to run each summarization request
+            model (str, optional): Model to use, defaults to the suite's default model
+            chunk_tokens (int, optional): Token budget per chunk, defaults to half the model's context
+            max_workers (int): Chunks summarized concurrently
+            cache_path (str, optional): SQLite file for cached chunk summaries, memory only if None
+            max_levels (int): Maximum number of reduce passes before forcing the final request
+        """
+        self.suite = suite
+        self.model = model
+        self.chunk_tokens = chunk_tokens
+        self.max_workers = max_workers
+        self.max_levels = max_levels
+        self.cache = ResponseCache(max_entries=1024, ttl=None, disk_path=cache_path)
+        self.chunks_summarized = 0
+        self.chunks_from_cache = 0
+
+    def _model(self):
+        return self.model or self.suite.default_model
+
+    def _budget(self):
+        """Per-chunk token budget, leaving room for the system prompt and the reply."""
+        return self.chunk_tokens or max(256, context_length(self._model()) // 2)
+
+    def summarize_file(self, path, encoding="utf-8", use_history=True):
+        """Summarize a text file, streaming it in paragraph by paragraph."""
+        with open(path, "r", encoding=encoding) as f:
+            return self.summarize_paragraphs(iter_paragraphs(f), use_history=use_history)
+
+    def summarize_text(self, text, use_history=True):
+        """Summarize a string of any length."""
+        return self.summarize_paragraphs(iter_paragraphs(text.splitlines()), use_history=use_history)
+
+    def summarize_paragraphs(self, paragraphs, use_history=True):
+        """
+        Run the map-reduce pipeline over a stream of paragraphs.
+
+        Args:
+            paragraphs (iterable): Paragraph strings
+            use_history (bool): Record the final summary request in the conversation history
+
+        Returns:
+            dict: Response of the final summarization request, with "chunks" and
+            "reduce_levels" describing the work done
+        """
+        budget = self._budget()
+        start = time.time()
+        stream = chunk_paragraphs(paragraphs, budget)
+        chunks = list(itertools.islice(stream, 2))  # Two chunks tell whether map-reduce is needed at all
+        chunk_count = len(chunks)
+        levels = 0
+
+        try:
+            if len(chunks) > 1:
+                summaries = self._map(itertools.chain(chunks, stream))
+                chunk_count = len(summaries)
+                levels = 1
+                chunks = self._reduce(summaries, budget)
+            while len(chunks) > 1 and levels < self.max_levels:
+                summaries = self._map(chunks, reduce=True)
+                levels += 1
+                chunks = self._reduce(summaries, budget)
+        except Exception as e:
+            error_msg = f"Error summarizing document chunks: {str(e)}"
+            logging.error(error_msg)
+            return {"error": error_msg}
+
+        response = self.suite.generate_response(self._final_prompt(chunks, levels), model_name=self.model,
+                                                stream=False, system_prompt=self.suite.SUMMARY_SYSTEM_PROMPT,
+                                                use_history=use_history, command="summarize")
+        return self._annotate(response, chunk_count, levels, start)
+
+    async def asummarize_file(self, path, encoding="utf-8", use_history=True):
+        """summarize_file() for the asyncio suite; the file is read and chunked off the event loop."""
+        start = time.time()
+        f = await asyncio.to_thread(open, path, "r", encoding=encoding)
+        try:
+            return await self.asummarize_paragraphs(iter_paragraphs(f), use_history, start)
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def asummarize_text(self, text, use_history=True):
+        """summarize_text() for the asyncio suite."""
+        return await self.asummarize_paragraphs(iter_paragraphs(text.splitlines()), use_history)
+
+    async def asummarize_paragraphs(self, paragraphs, use_history=True, start=None):
+        """
+        summarize_paragraphs() for the asyncio suite.
+
+        The paragraph stream is consumed (and chunked) on worker threads, so it may read a file.
+        """
+        budget = self._budget()
+        start = start or time.time()
+        stream = chunk_paragraphs(paragraphs, budget)
+        chunks = await asyncio.to_thread(lambda: list(itertools.islice(stream, 2)))
+        chunk_count = len(chunks)
+        levels = 0
+
+        try:
+            if len(chunks) > 1:
+                summaries = await self._amap(itertools.chain(chunks, stream))
+                chunk_count = len(summaries)
+                levels = 1
+                chunks = self._reduce(summaries, budget)
+            while len(chunks) > 1 and levels < self.max_levels:
+                summaries = await self._amap(chunks, reduce=True)
+                levels += 1
+                chunks = self._reduce(summaries, budget)
+        except Exception as e:
+            error_msg = f"Error summarizing document chunks: {str(e)}"
+            logging.error(error_msg)
+            return {"error": error_msg}
+
+        response = await self.suite.generate_response(self._final_prompt(chunks, levels), model_name=self.model,
+                                                      stream=False, system_prompt=self.suite.SUMMARY_SYSTEM_PROMPT,
+                                                      use_history=use_history, command="summarize")
+        return self._annotate(response, chunk_count, levels, start)
+
+    @staticmethod
+    def _reduce(summaries, budget):
+        """The next level's chunks: the summaries combined if they fit the budget, else repacked."""
+        combined = "\n\n".join(summaries)
+        if estimate_tokens(combined) <= budget:
+            return [combined]
+        return list(chunk_paragraphs(summaries, budget))
+
+    def _final_prompt(self, chunks, levels):
+        text = "\n\n".join(chunks)
+        return REDUCE_PROMPT.format(text=text) if levels else self.suite._summary_prompt(text)
+
+    @staticmethod
+    def _annotate(response, chunk_count, levels, start):
+        if "error" not in response:
+            response["chunks"] = chunk_count
+            response["reduce_levels"] = levels
+            response["summarization_time"] = time.time() - start
+        return response
+
+    def _map(self, chunks, reduce=False):
+        """
+        Summarize chunks concurrently, reusing cached summaries of unchanged chunks.
+
+        The next chunk is only taken from the iterable once fewer than
+        2 * max_workers are queued or running, so a chunk stream is never read ahead.
+        """
+        summaries = []
+        pending = deque()
+        with self.suite._status("[info]Combining summaries..." if reduce else "[info]Summarizing chunks..."):
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                try:
+                    for chunk in chunks:
+                        if len(pending) >= 2 * self.max_workers:
+                            summaries.append(pending.popleft().result())
+                        pending.append(executor.submit(self._summarize_chunk, chunk, reduce))
+                    while pending:
+                        summaries.append(pending.popleft().result())
+                except BaseException:
+                    for future in pending:
+                        future.cancel()
+                    raise
+        return summaries
+
+    async def _amap(self, chunks, reduce=False):
+        """_map() on the event loop, with at most max_workers chunk requests in flight."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        chunks = iter(chunks)
+        tasks = []
+
+        async def summarize(chunk):
+            try:
+                return await self._asummarize_chunk(chunk, reduce)
+            finally:
+                semaphore.release()
+
+        try:
+            while True:
+                await semaphore.acquire()
+                # Pulling the next chunk may read the file, which stays off the event loop
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    semaphore.release()
+                    break
+                tasks.append(asyncio.create_task(summarize(chunk)))
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def _chunk_request(self, chunk, reduce):
+        """Messages and cache key of a chunk, and its cached summary if there is one."""
+        prompt = REDUCE_PROMPT.format(text=chunk) if reduce else self.suite._summary_prompt(chunk)
+        messages = [
+            {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+        key = ResponseCache.make_key(self._model(), messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.chunks_from_cache += 1
+            return messages, key, cached["summary"]
+        return messages, key, None
+
+    def _store_chunk(self, key, response):
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        summary = response["message"]["content"].strip()
+        self.cache.put(key, {"summary": summary})
+        self.chunks_summarized += 1
+        return summary
+
+    def _summarize_chunk(self, chunk, reduce):
+        # Intermediate requests bypass generate_response(): no history, output file or metrics record
+        messages, key, summary = self._chunk_request(chunk, reduce)
+        if summary is not None:
+            return summary
+        response = self.suite._chat(self._model(), messages, use_cache=False, command="summarize")
+        return self._store_chunk(key, response)
+
+    async def _asummarize_chunk(self, chunk, reduce):
+        messages, key, summary = self._chunk_request(chunk, reduce)
+        if summary is not None:
+            return summary
+        response = await self.suite._achat(self._model(), messages, command="summarize")
+        return self._store_chunk(key, response)
+
+    def close(self):
+        """Release the chunk summary cache."""
+        self.cache.close()
@@ -0,0 +1,83 @@
+"""
+Hybrid Router Tests
+---------------------------------------------------------
+Routes prompts through the Project 1 keyword chatbot with a stand-in suite
+that records which prompts were escalated to the LLM.
+
+Run with: python -m pytest -q test_hybrid_router.py
+"""
+
+import threading
+import unittest
+
+from hybrid_router import HybridRouter
+
+
+class StubSuite:
+    """The parts of OllamaInteractionSuite the router uses; escalated prompts are recorded."""
+
+    def __init__(self):
+        self._state_lock = threading.Lock()
+        self.interaction_count = 0
+        self.escalated = []
+
+    def generate_response(self, prompt, use_history=True, **kwargs):
+        self.escalated.append(prompt)
+        return {"model": "llm", "message": {"role": "assistant", "content": "From the LLM"}}
+
+    def _finalize_response(self, prompt, response, start_time, record_history=True):
+        return response
+
+
+class HybridRouterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.router = HybridRouter(None, background=False)
+        if cls.router.bot is None:
+            raise unittest.SkipTest(f"Keyword chatbot unavailable: {cls.router.load_error}")
+
+    def setUp(self):
+        self.suite = StubSuite()
+        self.router.suite = self.suite
+
+    def test_programming_questions_are_answered_by_rules(self):
+        prompts = {
+            "How does a for loop work?": "for",
+            "What is a switch statement?": "switch",
+            "what is break?": "break",
+            "How does return work?": "return",
+            "What does the continue keyword do in Java?": "continue",
+            "for (int i = 0; i < n; i++)": "for",
+        }
+        for prompt, intent in prompts.items():
+            with self.subTest(prompt=prompt):
+                response = self.router.route(prompt, use_history=False)
+                self.assertEqual(response["tier"], "rules")
+                self.assertEqual(response["intent"], intent)
+        self.assertEqual(self.suite.escalated, [])
+
+    def test_everyday_prompts_with_java_keywords_are_escalated(self):
+        prompts = [
+            "Can you recommend a good book for me?",
+            "What if it rains tomorrow?",
+            "Should I take a break now?",
+            "How do I return a package to Amazon?",
+            "What is the best book for me?",
+            "I'll be back for dinner, else call me",
+        ]
+        for prompt in prompts:
+            with self.subTest(prompt=prompt):
+                intent, confidence = self.router.classify(prompt)
+                self.assertNotEqual(intent, "default")  # The keyword does match...
+                self.assertEqual(confidence, 0.0)  # ...but not in a programming context
+                self.assertEqual(self.router.route(prompt, use_history=False)["tier"], "llm")
+        self.assertEqual(self.suite.escalated, prompts)
+
+    def test_prompts_without_keywords_are_escalated(self):
+        self.assertEqual(self.router.classify("Tell me about Java generics"), ("default", 0.0))
+        self.assertEqual(self.router.route("Tell me about Java generics", use_history=False)["tier"], "llm")
+
+
+if __name__ == "__main__":
+    unittest.main()
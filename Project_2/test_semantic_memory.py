@@ -0,0 +1,145 @@
+"""
+Semantic Memory Tests
+---------------------------------------------------------
+Exercises SemanticMemory with a deterministic bag-of-words embedder instead of
+an embedding model, so the expected rankings are known exactly.
+
+Run with: python -m pytest -q test_semantic_memory.py
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from history_store import HistoryStore
+from semantic_memory import SemanticMemory
+
+VOCABULARY = ["java", "loop", "class", "pizza", "cheese", "rain", "weather"]
+
+
+class WordCountEmbedder:
+    """embed(model, texts) counting vocabulary words; records every text it was asked to embed."""
+
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, model, texts):
+        self.texts.extend(texts)
+        return [[text.lower().split().count(word) for word in VOCABULARY] for text in texts]
+
+
+class SemanticMemoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = HistoryStore(os.path.join(self.directory, "history.jsonl"))
+        self.embed = WordCountEmbedder()
+        self.memory = SemanticMemory(self.store, self.embed, model="test-embed")
+
+    def tearDown(self):
+        self.memory.close()
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def remember(self, memory, *contents):
+        for content in contents:
+            memory.add(self.store.append({"role": "user", "content": content}), content)
+        memory.flush()
+
+    def test_incremental_append(self):
+        self.remember(self.memory, "java loop", "pizza cheese")
+        self.assertEqual(len(self.memory), 2)
+        self.remember(self.memory, "rain weather")
+
+        self.assertEqual(len(self.memory), 3)
+        # Each turn is embedded exactly once, earlier turns are not re-embedded
+        self.assertEqual(self.embed.texts, ["java loop", "pizza cheese", "rain weather"])
+        self.assertEqual(os.path.getsize(self.memory.vectors_path), 3 * len(VOCABULARY) * 4)
+        self.assertEqual(os.path.getsize(self.memory.offsets_path), 3 * 8)
+
+    def test_reload_maps_existing_index(self):
+        self.remember(self.memory, "java loop", "pizza cheese", "rain weather")
+        self.memory.close()
+
+        embed = WordCountEmbedder()
+        reloaded = SemanticMemory(self.store, embed, model="test-embed")
+        try:
+            self.assertEqual(len(reloaded), 3)
+            self.assertEqual(reloaded.stats()["dim"], len(VOCABULARY))
+            recalled = reloaded.recall("cheese pizza", k=1)
+            self.assertEqual([turn["content"] for _, turn in recalled], ["pizza cheese"])
+            # Only the query was embedded; stored vectors came from the memory-mapped file
+            self.assertEqual(embed.texts, ["cheese pizza"])
+
+            self.remember(reloaded, "java class")
+            self.assertEqual(len(reloaded), 4)
+            self.assertEqual(embed.texts, ["cheese pizza", "java class"])
+        finally:
+            reloaded.close()
+
+    def test_reload_with_other_model_discards_index(self):
+        self.remember(self.memory, "java loop")
+        self.memory.close()
+
+        reloaded = SemanticMemory(self.store, WordCountEmbedder(), model="other-embed")
+        try:
+            self.assertEqual(len(reloaded), 0)
+            self.assertEqual(reloaded.recall("java loop"), [])
+        finally:
+            reloaded.close()
+
+    def test_recall_returns_top_k_most_similar(self):
+        self.remember(self.memory, "pizza cheese", "java loop class", "rain weather", "java loop", "java")
+
+        recalled = self.memory.recall("java loop", k=2)
+        self.assertEqual([turn["content"] for _, turn in recalled], ["java loop", "java loop class"])
+        scores = [score for score, _ in recalled]
+        self.assertAlmostEqual(scores[0], 1.0, places=5)
+        self.assertGreater(scores[0], scores[1])
+
+    def test_recall_skips_excluded_and_dissimilar_turns(self):
+        self.remember(self.memory, "java loop", "java class", "pizza cheese")
+
+        recalled = self.memory.recall("java loop", k=3, exclude={"java loop"})
+        # "pizza cheese" shares no words with the query and stays below min_score
+        self.assertEqual([turn["content"] for _, turn in recalled], ["java class"])
+
+    def test_recall_caches_query_embeddings(self):
+        self.remember(self.memory, "java loop", "pizza cheese")
+
+        first = self.memory.recall("java loop", k=1)
+        second = self.memory.recall("java loop", k=1)
+        self.assertEqual(first, second)
+        self.assertEqual(self.embed.texts.count("java loop"), 2)  # The stored turn and the first query
+
+    def test_slow_query_embedding_skips_recall(self):
+        self.remember(self.memory, "java loop")
+        release = threading.Event()
+
+        def slow_embed(model, texts):
+            release.wait(5)
+            return self.embed(model, texts)
+
+        self.memory.embed = slow_embed
+        self.memory.recall_timeout = 0.05
+        started = time.monotonic()
+        self.assertEqual(self.memory.recall("java loop"), [])
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(self.memory.stats()["recall_timeouts"], 1)
+
+        # The late embedding is cached once it arrives, so the next recall does not wait
+        release.set()
+        self.memory._query_executor.submit(lambda: None).result(5)
+        self.assertEqual([turn["content"] for _, turn in self.memory.recall("java loop")], ["java loop"])
+        self.assertEqual(self.memory.stats()["recall_timeouts"], 1)
+
+    def test_recall_on_empty_index_does_not_embed(self):
+        self.assertEqual(self.memory.recall("java loop"), [])
+        self.assertEqual(self.embed.texts, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Token Budgeting Helpers
+---------------------------------------------------------
+Cheap token-count estimates and per-model context window sizes used to keep
+prompts inside what the server will actually evaluate. Ollama truncates any
+prompt longer than the model's num_ctx setting, which defaults to 2048
+tokens unless overridden, so budgets are based on that rather than on the
+model's theoretical maximum context.
+"""
+
+import math
+import threading
+
+# Ollama's default num_ctx when a model does not override it
+DEFAULT_CONTEXT_TOKENS = 2048
+
+# Effective context window per model (num_ctx), updated at runtime when known
+MODEL_CONTEXT_TOKENS = {}
+
+# Average characters per token for English text with Llama-family tokenizers
+CHARS_PER_TOKEN = 4
+
+_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in text without running a tokenizer."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def context_length(model):
+    """Effective context window (tokens) for a model."""
+    if not model:
+        return DEFAULT_CONTEXT_TOKENS
+    with _lock:
+        if model in MODEL_CONTEXT_TOKENS:
+            return MODEL_CONTEXT_TOKENS[model]
+        # "llama3.2" also covers "llama3.2:latest" and vice versa
+        base = model.split(":")[0]
+        return MODEL_CONTEXT_TOKENS.get(base, DEFAULT_CONTEXT_TOKENS)
+
+
+def set_context_length(model, tokens):
+    """Record the effective context window for a model."""
+    with _lock:
+        MODEL_CONTEXT_TOKENS[model] = int(tokens)
@@ -0,0 +1,196 @@
+"""
+Conversation Turn Store
+---------------------------------------------------------
+Compact in-memory model of the conversation for long-lived sessions. Turns
+are __slots__ records with interned role strings and epoch-second
+timestamps, and only a bounded window of the most recent turns is kept in
+memory; every turn is appended to the HistoryStore as it is recorded, so
+older turns live on disk only. Exports stream turn by turn from the store,
+without building the document in memory.
+
+Records written before timestamps were numeric carry ISO strings; they are
+converted once when read.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class Turn:
+    """One conversation turn."""
+
+    __slots__ = ("role", "content", "timestamp", "tokens", "offset", "seq")
+
+    def __init__(self, role, content, timestamp=None, tokens=None, offset=None):
+        """
+        Args:
+            role (str): "user", "assistant" or "system" (interned)
+            content (str): Message text
+            timestamp (float, optional): Seconds since the epoch, now if omitted
+            tokens (int, optional): Token count of the content
+            offset (int, optional): Byte offset of the record in the HistoryStore
+        """
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.tokens = tokens
+        self.offset = offset
+        self.seq = None  # Position in the session, assigned when the turn enters a TurnStore window
+
+    @classmethod
+    def from_dict(cls, record, offset=None):
+        """Turn from a stored record, accepting legacy ISO timestamps."""
+        timestamp = record.get("timestamp")
+        if isinstance(timestamp, str):
+            try:
+                timestamp = datetime.fromisoformat(timestamp).timestamp()
+            except ValueError:
+                timestamp = 0.0
+        return cls(record.get("role", "user"), record.get("content", ""), timestamp or 0.0, record.get("tokens"),
+                   offset)
+
+    def to_dict(self):
+        """Record written to the HistoryStore."""
+        record = {"role": self.role, "content": self.content, "timestamp": round(self.timestamp, 3)}
+        if self.tokens is not None:
+            record["tokens"] = self.tokens
+        return record
+
+    def time_text(self, fmt="%Y-%m-%d %H:%M:%S"):
+        """Local time of the turn formatted with strftime, "Unknown time" if it has none."""
+        return time.strftime(fmt, time.localtime(self.timestamp)) if self.timestamp else "Unknown time"
+
+    # Read access by key, so turns work wherever turn dicts were used
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if isinstance(key, str) else None
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"Turn({self.role!r}, {self.content[:30]!r}, {self.timestamp:.3f})"
+
+
+class TurnStore:
+    """Bounded window of recent turns over a HistoryStore that holds all of them."""
+
+    def __init__(self, history_store, window=50):
+        """
+        Args:
+            history_store (HistoryStore): Persistent store every turn is appended to
+            window (int): Most recent turns kept in memory
+        """
+        self.history_store = history_store
+        self._turns = deque(maxlen=window)
+        self._seq = 0
+        self._lock = threading.Lock()  # Guards the window; readers take snapshots
+
+    @property
+    def window(self):
+        return self._turns.maxlen
+
+    def resize(self, window):
+        """Change how many recent turns are kept in memory."""
+        with self._lock:
+            self._turns = deque(self._turns, maxlen=window)
+
+    def __len__(self):
+        """Turns in the in-memory window (len(history_store) counts all of them)."""
+        return len(self._turns)
+
+    def __iter__(self):
+        """Iterate over a snapshot of the window, oldest first."""
+        with self._lock:
+            return iter(list(self._turns))
+
+    def __bool__(self):
+        return bool(self._turns)
+
+    def recent(self, n):
+        """The last n turns in memory, oldest first."""
+        if n <= 0:
+            return []
+        with self._lock:
+            return list(self._turns)[-n:]
+
+    def append(self, turn):
+        """
+        Record a turn in the window and append it to the history store.
+
+        The turn stays in the window even if writing it fails; the store's
+        exception is raised after the turn has been recorded in memory.
+
+        Returns:
+            int: Byte offset of the turn in the history store
+        """
+        self._remember(turn)
+        turn.offset = self.history_store.append(turn.to_dict())
+        return turn.offset
+
+    def load(self):
+        """Fill the window with the most recent stored turns."""
+        turns = [Turn.from_dict(record) for record in self.history_store.tail(self.window)]
+        with self._lock:
+            self._turns.clear()
+        for turn in turns:
+            self._remember(turn)
+        return self
+
+    def _remember(self, turn):
+        with self._lock:
+            self._seq += 1
+            turn.seq = self._seq
+            self._turns.append(turn)
+
+    def clear(self):
+        """Forget every turn, in memory and on disk."""
+        with self._lock:
+            self._turns.clear()
+        self.history_store.clear()
+
+    def iter_all(self):
+        """Stream every stored turn from the history store, oldest first."""
+        for offset, record in self.history_store.iter_records():
+            yield Turn.from_dict(record, offset)
+
+    def export_markdown(self, f, title, model=None):
+        """
+        Write the whole conversation as Markdown, one turn at a time.
+
+        Returns:
+            int: Turns written
+        """
+        f.write(f"# {title}\n\n")
+        if model:
+            f.write(f"Model: {model}\n\n")
+        count = 0
+        for turn in self.iter_all():
+            f.write(f"## {turn.role.title()} ({turn.time_text()})\n\n{turn.content}\n\n---\n\n")
+            count += 1
+        f.write(f"\n\n*Generated by Ollama Interaction Suite*\n")
+        return count
+
+    def export_json(self, f):
+        """
+        Write the whole conversation as a JSON array, one turn at a time.
+
+        Returns:
+            int: Turns written
+        """
+        f.write("[")
+        count = 0
+        for turn in self.iter_all():
+            record = turn.to_dict()
+            record["time"] = turn.time_text("%Y-%m-%dT%H:%M:%S")
+            f.write(("\n  " if count == 0 else ",\n  ") + json.dumps(record, ensure_ascii=False))
+            count += 1
+        f.write("\n]\n" if count else "]\n")
+        return count